@@ -47,17 +47,21 @@ def npp_mapping(
     # print("elements:", elements)
     # print("incoming:", incoming)
     # print("outgoing:", outgoing)
+    targets, coeffs, attrs_n, attrs_ts = [], [], [], []
     for i in incoming:
         for j in elements:
             if i[0] > j[0]:
                 idx_i = i[1][0]
                 idx_j = j[1][0]
-                coeff = -1.0 * i[1][1] * j[1][1]
-                model.add_interaction(
-                    target=(x[idx_i], x[idx_j]),
-                    coefficient=coeff,
-                    attributes={"n": str(j), "attn_ts": j[0]},  # metadata for affected number and timestamp for attenuation
-                )
+                targets.append((x[idx_i], x[idx_j]))
+                coeffs.append(-1.0 * i[1][1] * j[1][1])
+                attrs_n.append(str(j))
+                attrs_ts.append(j[0])
+    model.add_interactions(
+        targets=targets,
+        coefficients=coeffs,
+        attributes={"n": attrs_n, "attn_ts": attrs_ts},  # metadata for affected number and timestamp for attenuation
+    )
 
     for o in outgoing:
         idx = o[1][0]
@@ -19,5 +19,6 @@ from sawatabi.algorithm.delta import Delta
 from sawatabi.algorithm.incremental import Incremental
 from sawatabi.algorithm.partial import Partial
 from sawatabi.algorithm.window import Window
+from sawatabi.algorithm.model_coder import LogicalModelCoder
 
-__all__ = ["AbstractAlgorithm", "IO", "Attenuation", "Delta", "Incremental", "Partial", "Window"]
+__all__ = ["AbstractAlgorithm", "IO", "Attenuation", "Delta", "Incremental", "Partial", "Window", "LogicalModelCoder"]
@@ -12,16 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import inspect
 import traceback
 
 import apache_beam as beam
+import numpy as np
 from apache_beam import coders
 from apache_beam.options.pipeline_options import PipelineOptions
 from apache_beam.transforms.userstate import BagStateSpec, CombiningValueStateSpec
 
 import sawatabi
+from sawatabi.algorithm.model_coder import LogicalModelCoder
 from sawatabi.base_mixin import BaseMixin
-from sawatabi.solver import LocalSolver
+from sawatabi.solver import LocalSolver, SawatabiSolver
 
 
 class AbstractAlgorithm(BaseMixin):
@@ -45,7 +48,7 @@ class AbstractAlgorithm(BaseMixin):
     class SolveDoFn(beam.DoFn):
         PREV_TIMESTAMP = BagStateSpec(name="timestamp_state", coder=coders.PickleCoder())
         PREV_ELEMENTS = BagStateSpec(name="elements_state", coder=coders.PickleCoder())
-        PREV_MODEL = BagStateSpec(name="model_state", coder=coders.PickleCoder())
+        PREV_MODEL = BagStateSpec(name="model_state", coder=LogicalModelCoder())
         PREV_SAMPLESET = BagStateSpec(name="sampleset_state", coder=coders.PickleCoder())
 
         def process(
@@ -164,14 +167,15 @@ class AbstractAlgorithm(BaseMixin):
             # Attenuation: Update scale based on data timestamp.
             if algorithm == sawatabi.constants.ALGORITHM_ATTENUATION:
                 model.to_physical()  # Resolve removed interactions. TODO: Deal with placeholders.
-                ref_timestamp = model._interactions_array[algorithm_options["attenuation.key"]]
-                min_ts = min(ref_timestamp)
-                max_ts = max(ref_timestamp)
+                ref_timestamp = model._interactions_array[algorithm_options["attenuation.key"]].astype(np.float64)
+                min_ts = ref_timestamp.min()
+                max_ts = ref_timestamp.max()
                 min_scale = algorithm_options["attenuation.min_scale"]
                 if min_ts < max_ts:
-                    for i, t in enumerate(ref_timestamp):
-                        new_scale = (1.0 - min_scale) / (max_ts - min_ts) * (t - min_ts) + min_scale
-                        model._interactions_array["scale"][i] = new_scale
+                    # Rescale all interactions at once
+                    model._interactions_array["scale"][:] = (1.0 - min_scale) / (max_ts - min_ts) * (ref_timestamp - min_ts) + min_scale
+                    model._interactions_array["dirty"][:] = True
+                    model._interactions_version += 1
 
             # Solve and unmap to the solution
             try:
@@ -282,3 +286,88 @@ class AbstractAlgorithm(BaseMixin):
         # fmt: on
 
         return p
+
+    ################################
+    # Warm start
+    ################################
+
+    @classmethod
+    def initial_states_from_sampleset(cls, prev_sampleset, physical_model, num_reads=1, default=None, seed=None):
+        """
+        Maps the best samples of the previous sampleset onto the variables of the current physical model,
+        and returns them as initial states (a list of num_reads dicts) for solvers.
+        Samples are taken in order of energy, and repeated if there are fewer than num_reads.
+        Values are converted to the vartype of the model. Variables which are not in the previous samples are set to default,
+        or to random values if default is None.
+        """
+        cls._check_argument_type("physical_model", physical_model, sawatabi.model.PhysicalModel)
+        cls._check_argument_type("num_reads", num_reads, int)
+        if num_reads < 1:
+            raise ValueError("num_reads must be a positive integer.")
+
+        labels = [physical_model._index_to_label[i] for i in range(len(physical_model._index_to_label))]
+        if physical_model.get_mtype() == sawatabi.constants.MODEL_ISING:
+            values = [-1, 1]
+        else:
+            values = [0, 1]
+        if (default is not None) and (default not in values):
+            raise ValueError(f"default must be one of {values}.")
+
+        prev_samples = [dict(sample) for sample, in prev_sampleset.data(fields=["sample"], sorted_by="energy")]
+        if len(prev_samples) == 0:
+            raise ValueError("prev_sampleset must not be empty.")
+
+        rng = np.random.default_rng(seed)
+        initial_states = []
+        for r in range(num_reads):
+            prev_sample = prev_samples[r % len(prev_samples)]
+            random_values = rng.choice(values, size=len(labels)).tolist()
+            initial_state = {}
+            for label, random_value in zip(labels, random_values):
+                if label in prev_sample:
+                    # Either vartype is mapped by its sign: -1 / 0 -> the lower value, +1 -> the upper value
+                    initial_state[label] = values[1] if prev_sample[label] > 0 else values[0]
+                elif default is not None:
+                    initial_state[label] = default
+                else:
+                    initial_state[label] = random_value
+            initial_states.append(initial_state)
+        return initial_states
+
+    @classmethod
+    def warm_start_solve_fn(cls, solver_options=None, reverse_options=None, default=None, seed=None):
+        """
+        Returns a solve_fn which starts solving from the best samples of the previous window.
+        Consecutive windows differ only slightly, so the previous solution is a good starting point.
+
+        solver_options are passed to the solver. SawatabiSolver anneals reversely from the initial states with reverse_options,
+        which defaults to raising the temperature to a tenth of the initial temperature in the first tenth of the sweeps.
+        Other solvers (e.g. LocalSolver) just receive initial_states.
+        The first window, which has no previous sampleset, is solved normally.
+        """
+        if solver_options is not None:
+            cls._check_argument_type("solver_options", solver_options, dict)
+        if reverse_options is not None:
+            cls._check_argument_type("reverse_options", reverse_options, dict)
+
+        def warm_start_solving(solver, model, prev_sampleset, elements, incoming, outgoing):
+            physical_model = model.to_physical()
+            options = dict(solver_options or {})
+            if prev_sampleset is None:
+                return solver.solve(physical_model, **options)
+
+            options["initial_states"] = cls.initial_states_from_sampleset(
+                prev_sampleset, physical_model, num_reads=options.get("num_reads", 1), default=default, seed=seed
+            )
+            if isinstance(solver, SawatabiSolver):
+                if reverse_options is None:
+                    # Fall back to the defaults of SawatabiSolver.solve
+                    defaults = inspect.signature(SawatabiSolver.solve).parameters
+                    num_sweeps = options.get("num_sweeps", defaults["num_sweeps"].default)
+                    initial_temperature = options.get("initial_temperature", defaults["initial_temperature"].default)
+                    options["reverse_options"] = {"reverse_period": max(1, num_sweeps // 10), "reverse_temperature": initial_temperature / 10.0}
+                else:
+                    options["reverse_options"] = reverse_options
+            return solver.solve(physical_model, **options)
+
+        return warm_start_solving
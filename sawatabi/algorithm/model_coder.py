@@ -0,0 +1,40 @@
+# Copyright 2021 Kotaro Terada
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from apache_beam import coders
+
+from sawatabi.model import LogicalModel
+
+
+class LogicalModelCoder(coders.Coder):
+    """
+    Beam coder which encodes a LogicalModel in the sawatabi binary format.
+    The state for the incremental conversion to a physical model is encoded as well,
+    so that a decoded model (e.g. the model of the previous window) is converted incrementally.
+    """
+
+    def encode(self, value):
+        return value.to_bytes(with_conversion_state=True)
+
+    def decode(self, encoded):
+        return LogicalModel.from_bytes(encoded)
+
+    def is_deterministic(self):
+        return False
+
+    def to_type_hint(self):
+        return LogicalModel
+
+
+coders.registry.register_coder(LogicalModel, LogicalModelCoder)
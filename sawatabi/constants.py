@@ -39,3 +39,11 @@ ALGORITHM_WINDOW = "window"
 # Pick-up mode for Sawatabi Solver
 PICKUP_MODE_RANDOM = "random"
 PICKUP_MODE_SEQUENTIAL = "sequential"
+PICKUP_MODE_COLORED = "colored"
+
+# Stop reasons for Sawatabi Solver
+STOP_REASON_NUM_SWEEPS = "num_sweeps"
+STOP_REASON_TARGET_ENERGY = "target_energy"
+STOP_REASON_ZERO_ACCEPTANCE = "zero_acceptance"
+STOP_REASON_STAGNATION = "stagnation"
+STOP_REASON_TIME_LIMIT = "time_limit"
@@ -0,0 +1,378 @@
+# Copyright 2021 Kotaro Terada
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numbers
+
+import numpy as np
+
+import sawatabi.constants as constants
+
+
+class InteractionsArray:
+    """
+    Columnar storage of interactions in a logical model.
+
+    Numeric columns are held in growable typed NumPy arrays, and labels of variables (key_0 and key_1) are interned to integer ids.
+    Object columns are used only for columns which need Python objects (name, interacts, and attributes),
+    and for coefficient and scale only after a PyQUBO object (placeholder) is stored in them.
+
+    It behaves like a dict of columns: a column is returned as a NumPy array of the alive rows.
+    Numeric and object columns are views, so writing an element of them writes through to the storage.
+    key_0, key_1, and key are decoded from the label ids every time they are accessed.
+    """
+
+    DEFAULT_KEYS = ["body", "name", "key", "key_0", "key_1", "interacts", "coefficient", "scale", "timestamp", "dirty", "removed"]
+
+    _NUMERIC_DTYPES = {
+        "body": np.int8,
+        "coefficient": np.float64,
+        "scale": np.float64,
+        "timestamp": np.float64,
+        "dirty": np.bool_,
+        "removed": np.bool_,
+    }
+    _LABEL_KEYS = ["key_0", "key_1"]
+    _OBJECT_KEYS = ["name", "interacts"]
+    _PROMOTABLE_KEYS = ["coefficient", "scale"]
+    _NO_LABEL = -1
+    _INITIAL_CAPACITY = 16
+
+    def __init__(self):
+        self._length = 0
+        self._capacity = 0
+        self._columns = {}
+        for k, dtype in self._NUMERIC_DTYPES.items():
+            self._columns[k] = np.empty(0, dtype=dtype)
+        for k in self._LABEL_KEYS:
+            self._columns[k] = np.empty(0, dtype=np.int32)
+        for k in self._OBJECT_KEYS:
+            self._columns[k] = np.empty(0, dtype=object)
+        self._attribute_keys = []
+        self._labels = []
+        self._label_to_id = {}
+
+    @classmethod
+    def from_columns(cls, columns, labels, attribute_keys=()):
+        """
+        Creates an array from a dict of columns of the same length, with interned label ids in key_0 and key_1.
+        Columns are copied into the storage.
+        """
+        array = cls()
+        length = len(columns["body"])
+        array._length = array._capacity = length
+        for k, column in array._columns.items():
+            array._columns[k] = np.array(columns[k], dtype=column.dtype if k not in cls._PROMOTABLE_KEYS else None, copy=True)
+        for k in attribute_keys:
+            array._columns[k] = np.array(columns[k], dtype=object, copy=True)
+            array._attribute_keys.append(k)
+        array._labels = list(labels)
+        array._label_to_id = {label: i for i, label in enumerate(array._labels)}
+        return array
+
+    ################################
+    # Rows
+    ################################
+
+    def get_length(self):
+        """
+        Returns the number of rows (interactions).
+        """
+        return self._length
+
+    def get_attribute_keys(self):
+        """
+        Returns a list of keys of attribute columns, in order of addition.
+        """
+        return self._attribute_keys
+
+    def append(self, body, name, key, interacts, coefficient, scale, timestamp, attributes=None):
+        """
+        Appends an interaction as a new row, and returns the index of the row.
+        """
+        if self._length == self._capacity:
+            self._reserve(max(self._INITIAL_CAPACITY, self._capacity * 2))
+        idx = self._length
+
+        if body == constants.INTERACTION_LINEAR:
+            key_0, key_1 = self._intern(key), self._NO_LABEL
+        else:
+            key_0, key_1 = self._intern(key[0]), self._intern(key[1])
+
+        self._length += 1
+        self._columns["body"][idx] = body
+        self._columns["name"][idx] = name
+        self._columns["key_0"][idx] = key_0
+        self._columns["key_1"][idx] = key_1
+        self._columns["interacts"][idx] = interacts
+        self.set("coefficient", idx, coefficient)
+        self.set("scale", idx, scale)
+        self._columns["timestamp"][idx] = timestamp
+        self._columns["dirty"][idx] = True
+        self._columns["removed"][idx] = False
+        for attr in self._attribute_keys:
+            self._columns[attr][idx] = np.nan
+        if attributes is not None:
+            for k, v in attributes.items():
+                self.set(k, idx, v)
+        return idx
+
+    def append_rows(self, bodies, names, keys, interacts, coefficients, scales, timestamps, attributes=None):
+        """
+        Appends multiple interactions as new rows at once, and returns the index of the first row.
+        All arguments are sequences of the same length, except attributes which is a dict of sequences.
+        """
+        size = len(names)
+        start = self._length
+        length = start + size
+        if length > self._capacity:
+            self._reserve(max(self._INITIAL_CAPACITY, self._capacity * 2, length))
+        if attributes is None:
+            attributes = {}
+        for k in attributes.keys():
+            if k not in self._columns:
+                self._add_attribute_column(k)
+        for k, values in (("coefficient", coefficients), ("scale", scales)):
+            if (self._columns[k].dtype != object) and (not self._all_numeric(values)):
+                self._columns[k] = self._columns[k].astype(object)
+
+        bodies = np.asarray(bodies, dtype=np.int8)
+        key_0 = np.empty(size, dtype=np.int32)
+        key_1 = np.full(size, self._NO_LABEL, dtype=np.int32)
+        for i, (body, key) in enumerate(zip(bodies.tolist(), keys)):
+            if body == constants.INTERACTION_LINEAR:
+                key_0[i] = self._intern(key)
+            else:
+                key_0[i] = self._intern(key[0])
+                key_1[i] = self._intern(key[1])
+
+        self._length = length
+        self._columns["body"][start:length] = bodies
+        self._columns["key_0"][start:length] = key_0
+        self._columns["key_1"][start:length] = key_1
+        self._columns["timestamp"][start:length] = timestamps
+        self._columns["dirty"][start:length] = True
+        self._columns["removed"][start:length] = False
+        for k, values in (("name", names), ("interacts", interacts), ("coefficient", coefficients), ("scale", scales)):
+            self._set_rows(k, start, values)
+        for k in self._attribute_keys:
+            if k in attributes:
+                self._set_rows(k, start, attributes[k])
+            else:
+                self._columns[k][start:length] = np.nan
+        return start
+
+    @staticmethod
+    def _all_numeric(values):
+        if isinstance(values, np.ndarray) and (values.dtype.kind in "biuf"):
+            return True
+        return all(isinstance(v, numbers.Number) for v in values)
+
+    def _set_rows(self, key, start, values):
+        column = self._columns[key]
+        if column.dtype != object:
+            end = start + len(values)
+            column[start:end] = values
+            return
+        # Assign one by one, since NumPy would expand tuples (of variables) into another dimension
+        for i, v in enumerate(values, start):
+            column[i] = v
+
+    def set(self, key, idx, value):
+        """
+        Sets a value of the column at the given row.
+        A new attribute column is added if needed, and coefficient and scale are promoted to object columns for PyQUBO objects.
+        """
+        if key.startswith("attributes.") and (key not in self._columns):
+            self._add_attribute_column(key)
+        elif (key in self._PROMOTABLE_KEYS) and (not isinstance(value, numbers.Number)) and (self._columns[key].dtype != object):
+            self._columns[key] = self._columns[key].astype(object)
+        elif key in self._LABEL_KEYS or key == "key":
+            raise KeyError(f"Column '{key}' cannot be set directly.")
+        self._columns[key][idx] = value
+
+    def get_key(self, idx):
+        """
+        Returns the key of the interaction at the given row: a label for a linear one, and a tuple of labels for a quadratic one.
+        """
+        key_0 = self._labels[self._columns["key_0"][idx]]
+        key_1 = self._columns["key_1"][idx]
+        if key_1 == self._NO_LABEL:
+            return key_0
+        return (key_0, self._labels[key_1])
+
+    def get_label_ids(self, key):
+        """
+        Returns a read-only view of interned label ids of the column (key_0 or key_1). Missing labels are -1.
+        """
+        ids = self._columns[key][: self._length]
+        ids.flags.writeable = False
+        return ids
+
+    def get_labels(self):
+        """
+        Returns a list of interned labels, indexed by label ids.
+        """
+        return self._labels
+
+    def is_numeric(self, key):
+        """
+        Returns a bool array which tells whether each value of the column (coefficient or scale) is numeric.
+        """
+        column = self[key]
+        if column.dtype != object:
+            return np.ones(self._length, dtype=bool)
+        return np.fromiter((isinstance(v, numbers.Number) for v in column), dtype=bool, count=self._length)
+
+    def compress(self, mask):
+        """
+        Keeps only the rows where the mask is True, packing them to the head of the storage.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        for k, column in self._columns.items():
+            self._columns[k] = column[: self._length][mask]
+        self._length = self._capacity = int(np.count_nonzero(mask))
+
+        # Drop labels which are no longer referenced by any row, and renumber the rest
+        ids = np.concatenate([self._columns[k] for k in self._LABEL_KEYS])
+        used = np.unique(ids[ids != self._NO_LABEL])
+        remap = np.full(len(self._labels) + 1, self._NO_LABEL, dtype=np.int32)  # The last one is for missing labels (-1)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        for k in self._LABEL_KEYS:
+            self._columns[k] = remap[self._columns[k]]
+        self._labels = [self._labels[i] for i in used.tolist()]
+        self._label_to_id = {label: i for i, label in enumerate(self._labels)}
+
+    def extend(self, other):
+        """
+        Appends all rows of the other array. Labels are re-interned, and attribute columns are unioned.
+        """
+        start = self._length
+        length = start + other._length
+        self._reserve(max(length, self._capacity))
+        for k in other._attribute_keys:
+            if k not in self._columns:
+                self._add_attribute_column(k)
+        for k in self._PROMOTABLE_KEYS:
+            if (other._columns[k].dtype == object) and (self._columns[k].dtype != object):
+                self._columns[k] = self._columns[k].astype(object)
+
+        label_map = np.fromiter((self._intern(label) for label in other._labels), dtype=np.int32, count=len(other._labels))
+        for k in self._LABEL_KEYS:
+            ids = other._columns[k][: other._length]
+            self._columns[k][start:length] = np.where(ids == self._NO_LABEL, self._NO_LABEL, label_map[ids] if len(label_map) > 0 else ids)
+        for k in list(self._NUMERIC_DTYPES.keys()) + self._OBJECT_KEYS:
+            self._columns[k][start:length] = other._columns[k][: other._length]
+        for k in self._attribute_keys:
+            if k in other._columns:
+                self._columns[k][start:length] = other._columns[k][: other._length]
+            else:
+                self._columns[k][start:length] = np.nan
+        self._length = length
+
+    def _reserve(self, capacity):
+        if capacity <= self._capacity:
+            return
+        for k, column in self._columns.items():
+            expanded = np.empty(capacity, dtype=column.dtype)
+            expanded[: self._length] = column[: self._length]
+            self._columns[k] = expanded
+        self._capacity = capacity
+
+    def _add_attribute_column(self, key):
+        column = np.empty(self._capacity, dtype=object)
+        column[: self._length] = np.nan
+        self._columns[key] = column
+        self._attribute_keys.append(key)
+
+    def _intern(self, label):
+        label_id = self._label_to_id.get(label)
+        if label_id is None:
+            label_id = len(self._labels)
+            self._labels.append(label)
+            self._label_to_id[label] = label_id
+        return label_id
+
+    def _decode(self, key):
+        decoder = np.empty(len(self._labels) + 1, dtype=object)
+        decoder[:-1] = self._labels
+        decoder[-1] = np.nan  # for missing labels (-1)
+        return decoder[self._columns[key][: self._length]]
+
+    ################################
+    # Dict-like interface
+    ################################
+
+    def keys(self):
+        return self.DEFAULT_KEYS + self._attribute_keys
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def to_dict(self):
+        """
+        Returns a dict of copies of all columns.
+        """
+        return {k: np.array(v, copy=True) for k, v in self.items()}
+
+    def __getitem__(self, key):
+        if key == "key":
+            key_0 = self._decode("key_0")
+            key_1 = self._decode("key_1")
+            column = np.empty(self._length, dtype=object)
+            for i, quadratic in enumerate(self._columns["key_1"][: self._length] != self._NO_LABEL):
+                column[i] = (key_0[i], key_1[i]) if quadratic else key_0[i]
+            return column
+        if key in self._LABEL_KEYS:
+            return self._decode(key)
+        if key in self._columns:
+            return self._columns[key][: self._length]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return (key == "key") or (key in self._columns)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.DEFAULT_KEYS) + len(self._attribute_keys)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, InteractionsArray)
+            and (self._length == other._length)
+            and (self.keys() == other.keys())
+            and all(self._equal_columns(self[k], other[k]) for k in self.keys())
+        )
+
+    @staticmethod
+    def _equal_columns(a, b):
+        # Missing values (NaN) are regarded as equal to each other
+        return all((x == y) or ((x != x) and (y != y)) for x, y in zip(a.tolist(), b.tolist()))
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __getstate__(self):
+        # Trim unused capacity of the growable arrays
+        state = self.__dict__.copy()
+        state["_columns"] = {k: column[: self._length].copy() for k, column in self._columns.items()}
+        state["_capacity"] = self._length
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import collections
-import copy
 import numbers
 import pprint
 import warnings
@@ -25,6 +24,8 @@ import pyqubo
 import sawatabi.constants as constants
 from sawatabi.model.abstract_model import AbstractModel
 from sawatabi.model.constraint import AbstractConstraint
+from sawatabi.model.interactions_array import InteractionsArray
+from sawatabi.model.model_format import ModelFormat
 from sawatabi.model.physical_model import PhysicalModel
 from sawatabi.utils.functions import Functions
 from sawatabi.utils.time import current_time
@@ -42,9 +43,27 @@ class LogicalModel(AbstractModel):
         self._constraints = {}
         self._interactions = None
         self._default_keys = ["body", "name", "key", "key_0", "key_1", "interacts", "coefficient", "scale", "timestamp", "dirty", "removed"]
-        self._interactions_array = {k: [] for k in self._default_keys}
-        self._interactions_attrs = []
+        self._interactions_array = InteractionsArray()
         self._interactions_length = 0
+        # Version of the interaction arrays, which is bumped whenever they are modified.
+        # The interactions DataFrame is regenerated only when it is older than the arrays.
+        self._interactions_version = 0
+        self._interactions_dataframe_version = -1
+        # Hash index from an interaction name to its row in the interaction arrays.
+        # This must be kept in sync whenever rows are added, renamed, or physically removed.
+        self._name_to_index = {}
+        # Adjacency index from a variable label to a set of rows of the interactions which interact with the variable.
+        # Logically removed interactions remain in the index until they are physically removed.
+        self._label_to_rows = {}
+        # Cache of PyQUBO objects (coefficients, scales, and offset with placeholders) compiled into evaluators.
+        # Keys are ids of the objects, and values are tuples of the object itself and its evaluator.
+        self._placeholder_cache = {}
+        # Sums of coefficients grouped by keys and the contribution of each interaction to them in the previous physical model.
+        # They are used to convert the model incrementally, and None means that a full rebuild is needed.
+        self._physical_sums = None
+        self._physical_counts = None
+        self._physical_applied = {}
+        self._physical_symbolic = set()
         self._previous_physical_model = None
 
     def empty(self):
@@ -113,11 +132,10 @@ class LogicalModel(AbstractModel):
         raise ValueError(f"Format '{fmt}' is invalid.")
 
     def select_interactions_by_variable(self, target):
-        self._update_interactions_dataframe_from_arrays()
-
         # Find interactions which interacts with the given variable.
         self._check_argument_type("target", target, (pyqubo.Spin, pyqubo.Binary))
-        return self._interactions[(self._interactions["key_0"] == target.label) | (self._interactions["key_1"] == target.label)]["name"].values
+        rows = sorted(self._label_to_rows.get(target.label, ()))
+        return self._interactions_array["name"][rows]
 
     ################################
     # Add
@@ -145,6 +163,7 @@ class LogicalModel(AbstractModel):
         self._check_argument_type("timestamp", timestamp, (int, float))
 
         interaction_info = self._get_interaction_info_from_target(target)
+        self._warn_deleted_variables([interaction_info["key"]])
 
         body = interaction_info["body"]
         if name:
@@ -160,40 +179,132 @@ class LogicalModel(AbstractModel):
                 raise ValueError(f"An interaction named '{internal_name}' already exists. Cannot add the same name.")
             raise ValueError(f"An interaction named '{internal_name}' is already removed.")
 
-        if body == 1:
-            keys = (interaction_info["key"], np.nan)
-        elif body == 2:
-            keys = interaction_info["key"]
-
         # Adding a dict to Pandas DataFrame is slow.
         # We need to expand the internal arrays and generate a DataFrame based on them.
-        self._interactions_array["body"].append(body)
-        self._interactions_array["name"].append(internal_name)
-        self._interactions_array["key"].append(interaction_info["key"])
-        self._interactions_array["key_0"].append(keys[0])
-        self._interactions_array["key_1"].append(keys[1])
-        self._interactions_array["interacts"].append(interaction_info["interacts"])
-        self._interactions_array["coefficient"].append(coefficient)
-        self._interactions_array["scale"].append(scale)
-        self._interactions_array["timestamp"].append(timestamp)
         # Note: dirty flag (= modification flag) means this interaction has not converted to a physical model yet.
         # dirty flag will be False when the interaction is written to a physical model.
-        self._interactions_array["dirty"].append(True)
-        self._interactions_array["removed"].append(False)
+        idx = self._interactions_array.append(
+            body=body,
+            name=internal_name,
+            key=interaction_info["key"],
+            interacts=interaction_info["interacts"],
+            coefficient=coefficient,
+            scale=scale,
+            timestamp=timestamp,
+            attributes={f"attributes.{k}": v for k, v in attributes.items()},
+        )
+        self._name_to_index[internal_name] = idx
+        self._add_to_label_to_rows(interaction_info["key"], idx)
+        self._interactions_length += 1
+        self._interactions_version += 1
+
+    def add_interactions(
+        self,
+        targets,
+        names=None,
+        coefficients=0.0,
+        scales=1.0,
+        attributes=None,
+        timestamp=None,
+    ):
+        """
+        Adds multiple interactions at once.
+        'targets' is a sequence of variables (linear) or tuples of two variables (quadratic), as the target of add_interaction.
+        'names', 'coefficients', and 'scales' are sequences of the same length as 'targets', or a single value for all interactions.
+        'attributes' is a dict from an attribute key to a sequence of values (or a single value) for each interaction.
+        Arguments are validated once for all, and the interactions are appended to the internal arrays in bulk.
+        """
+        if attributes is None:
+            attributes = {}
+        if timestamp is None:
+            timestamp = current_time()
+
+        self._check_argument_type("targets", targets, (list, tuple, np.ndarray))
+        self._check_argument_type("attributes", attributes, dict)
+        self._check_argument_type("timestamp", timestamp, (int, float))
+        size = len(targets)
+        if size == 0:
+            return
 
-        # Expand existing attributes
-        for attr in self._interactions_attrs:
-            self._interactions_array[attr].append(np.nan)
+        coefficients = self._broadcast_argument("coefficients", coefficients, size, (numbers.Number, pyqubo.core.Express, pyqubo.core.Coefficient))
+        scales = self._broadcast_argument("scales", scales, size, (numbers.Number, pyqubo.core.Express))
+        attributes = {f"attributes.{k}": self._broadcast_argument(f"attributes.{k}", v, size, object) for k, v in attributes.items()}
 
-        # Set new attributes
-        for k, v in attributes.items():
-            attrs_key = f"attributes.{k}"
-            if attrs_key not in self._interactions_array:
-                self._interactions_array[attrs_key] = [np.nan] * (self._interactions_length + 1)
-                self._interactions_attrs.append(attrs_key)
-            self._interactions_array[attrs_key][-1] = v
+        bodies, keys, interacts, default_names = [], [], [], []
+        for target in targets:
+            if not target:
+                raise ValueError("'target' must be specified.")
+            interaction_info = self._get_interaction_info_from_target(target)
+            bodies.append(interaction_info["body"])
+            keys.append(interaction_info["key"])
+            interacts.append(interaction_info["interacts"])
+            default_names.append(interaction_info["name"])
+        self._warn_deleted_variables(keys)
+
+        if names is None:
+            internal_names = default_names
+        else:
+            internal_names = self._broadcast_argument("names", names, size, str)
+            # Automatically named by the default name if an empty name is given
+            internal_names = [name if name else default_name for name, default_name in zip(internal_names, default_names)]
+
+        if len(set(internal_names)) != size:
+            raise ValueError("Cannot add interactions with the same name at once.")
+        for internal_name in internal_names:
+            if self._has_name(internal_name):
+                if not self._is_removed(internal_name):
+                    raise ValueError(f"An interaction named '{internal_name}' already exists. Cannot add the same name.")
+                raise ValueError(f"An interaction named '{internal_name}' is already removed.")
+
+        start = self._interactions_array.append_rows(
+            bodies=bodies,
+            names=internal_names,
+            keys=keys,
+            interacts=interacts,
+            coefficients=coefficients,
+            scales=scales,
+            timestamps=timestamp,
+            attributes=attributes,
+        )
+        self._name_to_index.update(zip(internal_names, range(start, start + size)))
+        for idx, key in enumerate(keys, start):
+            self._add_to_label_to_rows(key, idx)
+        self._interactions_length += size
+        self._interactions_version += 1
 
-        self._interactions_length += 1
+    def _warn_deleted_variables(self, keys):
+        """
+        Warns if the interactions of the given keys interact with deleted variables,
+        since they are removed in the next conversion to a physical model.
+        """
+        if len(self._deleted) == 0:
+            return
+        deleted = {label for key in keys for label in ((key,) if isinstance(key, str) else key) if label in self._deleted}
+        if len(deleted) > 0:
+            warnings.warn(f"Variables {sorted(deleted)} are deleted, so interactions with them will be removed in the next conversion to a physical model.")
+
+    def _broadcast_argument(self, name, value, size, types):
+        """
+        Returns the given sequence after checking its length and the types of elements,
+        or a list repeating the given single value.
+        """
+        if isinstance(value, np.ndarray):
+            if value.ndim != 1 or len(value) != size:
+                raise ValueError(f"The length of '{name}' must be the same as the length of 'targets'.")
+            if (types is object) or (value.dtype.kind in "biuf"):
+                return value
+            value = value.tolist()
+        elif isinstance(value, (list, tuple)):
+            if len(value) != size:
+                raise ValueError(f"The length of '{name}' must be the same as the length of 'targets'.")
+        else:
+            if types is not object:
+                self._check_argument_type(name, value, types)
+            return [value] * size
+        if types is not object:
+            for v in value:
+                self._check_argument_type(name, v, types)
+        return value
 
     ################################
     # Update
@@ -243,21 +354,23 @@ class LogicalModel(AbstractModel):
         if self._is_removed(internal_name):
             raise ValueError(f"An interaction named '{internal_name}' is already removed.")
 
-        update_idx = self._interactions_array["name"].index(internal_name)
+        update_idx = self._name_to_index[internal_name]
 
         # update only properties which is given by arguments
+        self._invalidate_placeholder_cache(
+            self._interactions_array["coefficient"][update_idx] if coefficient is not None else None,
+            self._interactions_array["scale"][update_idx] if scale is not None else None,
+        )
         if coefficient is not None:
-            self._interactions_array["coefficient"][update_idx] = coefficient
+            self._interactions_array.set("coefficient", update_idx, coefficient)
         if scale is not None:
-            self._interactions_array["scale"][update_idx] = scale
+            self._interactions_array.set("scale", update_idx, scale)
         if attributes is not None:
             for k, v in attributes.items():
-                attrs_key = f"attributes.{k}"
-                if attrs_key not in self._interactions_array:
-                    self._interactions_array[attrs_key] = [np.nan] * self._interactions_length
-                self._interactions_array[attrs_key][update_idx] = v
+                self._interactions_array.set(f"attributes.{k}", update_idx, v)
         self._interactions_array["timestamp"][update_idx] = timestamp
         self._interactions_array["dirty"][update_idx] = True
+        self._interactions_version += 1
 
     ################################
     # Remove
@@ -270,12 +383,13 @@ class LogicalModel(AbstractModel):
         # if self._is_removed(internal_name):
         #     raise ValueError(f"An interaction named '{internal_name}' is already removed.")
 
-        remove_idx = self._interactions_array["name"].index(internal_name)
+        remove_idx = self._name_to_index[internal_name]
 
         # logically remove
         # This will be physically removed when it's converted to a physical model.
         self._interactions_array["removed"][remove_idx] = True
         self._interactions_array["dirty"][remove_idx] = True
+        self._interactions_version += 1
 
     ################################
     # Helper methods for add, update, remove, and select
@@ -335,17 +449,43 @@ class LogicalModel(AbstractModel):
         return internal_name
 
     def _has_name(self, internal_name):
-        return internal_name in self._interactions_array["name"]
+        return internal_name in self._name_to_index
 
     def _is_removed(self, internal_name):
-        idx = self._interactions_array["name"].index(internal_name)
+        idx = self._name_to_index[internal_name]
         return self._interactions_array["removed"][idx]
 
+    def _rebuild_name_to_index(self):
+        self._name_to_index = {name: idx for idx, name in enumerate(self._interactions_array["name"])}
+
+    def _add_to_label_to_rows(self, key, idx):
+        labels = (key,) if isinstance(key, str) else key
+        for label in labels:
+            self._label_to_rows.setdefault(label, set()).add(idx)
+
+    def _rebuild_label_to_rows(self):
+        labels = self._interactions_array.get_labels()
+        ids = np.concatenate([self._interactions_array.get_label_ids("key_0"), self._interactions_array.get_label_ids("key_1")])
+        rows = np.tile(np.arange(self._interactions_array.get_length()), 2)
+        rows = rows[ids >= 0]
+        ids = ids[ids >= 0]
+
+        # Group rows by label ids
+        order = np.argsort(ids, kind="stable")
+        uniques, starts = np.unique(ids[order], return_index=True)
+        rows = rows[order].tolist()
+        bounds = starts.tolist() + [len(rows)]
+        self._label_to_rows = {labels[i]: set(rows[start:end]) for i, start, end in zip(uniques.tolist(), bounds[:-1], bounds[1:])}
+
     def _update_interactions_dataframe_from_arrays(self):
         # Generate a DataFrame from the internal interaction arrays.
         # If we create new DataFrame every interaction update, computation time consumes a lot.
-        # We only generate a DataFrame just before we need it.
-        self._interactions = pd.DataFrame(self._interactions_array)
+        # We only generate a DataFrame just before we need it,
+        # and reuse it until the interaction arrays are modified.
+        if (self._interactions is not None) and (self._interactions_dataframe_version == self._interactions_version):
+            return
+        self._interactions = pd.DataFrame(self._interactions_array.to_dict())
+        self._interactions_dataframe_version = self._interactions_version
 
     ################################
     # Delete
@@ -356,7 +496,8 @@ class LogicalModel(AbstractModel):
             raise ValueError("'target' must be specified.")
         self._check_argument_type("target", target, (pyqubo.Spin, pyqubo.Binary))
 
-        # TODO: Delete variable physically
+        # The variable is kept as deleted, and its interactions are physically removed
+        # in the next conversion to a physical model
         self._deleted[target.label] = True
 
         # Deal with constraints
@@ -400,7 +541,7 @@ class LogicalModel(AbstractModel):
                 self.remove_interaction(name=s)
         elif value in [1, -1]:
             for s in selected:
-                idx = self._interactions_array["name"].index(s)
+                idx = self._name_to_index[s]
                 body = self._interactions_array["body"][idx]
                 # 1-body interaction will become an offset
                 if body == 1:
@@ -499,64 +640,33 @@ class LogicalModel(AbstractModel):
         if placeholder is None:
             placeholder = {}
         physical = PhysicalModel(mtype=self._mtype)
+        evaluated = {}
 
-        linear, quadratic = {}, {}
-        will_remove = []
-
-        # Save the model before merging constraints to restore it later
-        # original_variables = copy.deepcopy(self._variables)  # Variables will not be changed
-        original_offset = self._offset
-        original_deleted = copy.deepcopy(self._deleted)
-        original_fixed = copy.deepcopy(self._fixed)
-        # original_constraints = copy.deepcopy(self._constraints)  # Constraints will not be changed
-        original_interactions_array = copy.deepcopy(self._interactions_array)
-        original_interactions_attrs = copy.deepcopy(self._interactions_attrs)
-        original_interactions_length = self._interactions_length
-
-        # Resolve constraints, and convert them to the interactions
+        self._remove_interactions_of_deleted_variables()
+        if self._can_convert_incrementally():
+            # Apply only dirty (added, updated, and removed) interactions to the sums of the previous physical model
+            will_remove = self._apply_dirty_interactions(placeholder, evaluated)
+        else:
+            will_remove = self._apply_all_interactions(placeholder, evaluated)
+
+        # Resolve constraints into a separate buffer on top of the sums, so that this model itself is never modified
+        linear = dict(self._physical_sums[constants.INTERACTION_LINEAR])
+        quadratic = dict(self._physical_sums[constants.INTERACTION_QUADRATIC])
+        offset = self._evaluate_placeholder(self._offset, placeholder, evaluated)
+        variables = dict(self._variables)
+        deleted = dict(self._deleted)
         for label, constraint in self._constraints.items():
             constraint_model = constraint.to_model()
-            self.merge(constraint_model)
-
-        # group by key
-        for i in range(self._interactions_length):
-            if self._interactions_array["removed"][i]:
-                will_remove.append(self._interactions_array["name"][i])
-                continue
+            if constraint_model._mtype != self._mtype:
+                constraint_model._convert_mtype()
+            offset += constraint_model._add_interactions_to(linear, quadratic, placeholder)
+            for name, value in constraint_model._variables.items():
+                variables.setdefault(name, value)
+            deleted.update(constraint_model._deleted)
+        offset = float(offset)
 
-            # Resolve placeholders for coefficients and scales, using PyQUBO.
-            # Firstly resolve placeholders if the coefficient is already Coefficient type
-            coeff_i = self._interactions_array["coefficient"][i]
-            scale_i = self._interactions_array["scale"][i]
-            if isinstance(coeff_i, pyqubo.core.Coefficient):
-                coeff_i = coeff_i.evaluate(feed_dict=placeholder)
-
-            # Calculate coefficient with the placeholder
-            coeff_with_ph = coeff_i * scale_i
-            coeff_model = (coeff_with_ph + pyqubo.Binary("sawatabi-fake-variable")).compile()  # We need a variable for a valid model for pyqubo
-            coeff_ph_resolved = coeff_model.to_qubo(feed_dict=placeholder)
-            coeff = coeff_ph_resolved[1]  # We don't need the variable just prepared, extracting only offset
-
-            if self._interactions_array["body"][i] == constants.INTERACTION_LINEAR:
-                if self._interactions_array["key"][i] in linear:
-                    linear[self._interactions_array["key"][i]] += coeff
-                else:
-                    linear[self._interactions_array["key"][i]] = coeff
-
-            elif self._interactions_array["body"][i] == constants.INTERACTION_QUADRATIC:
-                if self._interactions_array["key"][i] in quadratic:
-                    quadratic[self._interactions_array["key"][i]] += coeff
-                else:
-                    quadratic[self._interactions_array["key"][i]] = coeff
-
-        # For offset as well
-        offset = self._offset
-        if isinstance(self._offset, pyqubo.core.Coefficient):
-            offset = self._offset.evaluate(feed_dict=placeholder)
-        # Calculate coefficient with the placeholder
-        offset_model = (offset + pyqubo.Binary("sawatabi-fake-variable")).compile()  # We need a variable for a valid model for pyqubo
-        offset_ph_resolved = offset_model.to_qubo(feed_dict=placeholder)
-        offset = offset_ph_resolved[1]  # We don't need the variable just prepared, extracting only offset
+        # Keep only the compiled evaluators which are still in use
+        self._placeholder_cache = {k: v for k, v in self._placeholder_cache.items() if k in evaluated}
 
         # set to physical
         for k, v in linear.items():
@@ -572,43 +682,231 @@ class LogicalModel(AbstractModel):
 
         # label_to_index / index_to_label
         current_index = 0
-        for val in self._variables.values():
+        for val in variables.values():
             flattened = list(Functions._flatten(val.bit_list))
             for v in flattened:
-                if (v.label not in self._deleted) and (v.label in physical._variables_set):
+                if (v.label not in deleted) and (v.label in physical._variables_set):
                     physical._label_to_index[v.label] = current_index
                     physical._index_to_label[current_index] = v.label
                     current_index += 1
+        unindexed = physical._unindexed_labels()
+        if len(unindexed) == 0:
+            physical._build_arrays()
+        else:
+            # The model can be solved only through BQM, which is built from the raw interactions
+            warnings.warn(
+                f"Variables {sorted(unindexed, key=str)} are not declared by variables() or are deleted, "
+                "so the physical model cannot be expressed by arrays."
+            )
 
         # save the last physical model
         self._previous_physical_model = physical
 
-        # Restore the model before adding constraints
-        # self._variables = original_variables  # Variables were not changed
-        self._offset = original_offset
-        self._deleted = original_deleted
-        self._fixed = original_fixed
-        # self._constraints = original_constraints  # Constraints were not changed
-        self._interactions_array = original_interactions_array
-        self._interactions_attrs = original_interactions_attrs
-        self._interactions_length = original_interactions_length
-
         # Remove interactions
-        # TODO: Physically remove the logically removed interactions
-        for rm in will_remove:
-            idx = self._interactions_array["name"].index(rm)
-            for k in self._interactions_array.keys():
-                self._interactions_array[k].pop(idx)
-            self._interactions_length -= 1
-
-        # Set dirty flag
-        for i in range(self._interactions_length):
-            # TODO: Calc difference from previous physical model by referencing dirty flags.
-            if self._interactions_array["dirty"][i]:
-                self._interactions_array["dirty"][i] = False
+        # Physically remove the logically removed interactions by compacting the arrays at once.
+        # Labels of deleted variables are dropped as well, since no interaction refers to them anymore.
+        if len(will_remove) > 0:
+            self._interactions_array.compress(~self._interactions_array["removed"])
+            self._interactions_length = self._interactions_array.get_length()
+            self._rebuild_name_to_index()
+            self._rebuild_label_to_rows()
+
+        # All interactions are written to the physical model, so clear dirty flags
+        self._interactions_array["dirty"][:] = False
+        self._interactions_version += 1
 
         return physical
 
+    def _remove_interactions_of_deleted_variables(self):
+        """
+        Logically removes interactions which interact with deleted variables.
+        All the rows of the deleted variables are collected by the label-to-rows index,
+        since interactions may remain without being dirty (e.g. when delete_variable fails halfway).
+        """
+        if len(self._deleted) == 0:
+            return
+        rows = set()
+        for label in self._deleted:
+            rows.update(self._label_to_rows.get(label, ()))
+        removed = self._interactions_array["removed"]
+        for i in sorted(rows):
+            if removed[i]:
+                continue
+            removed[i] = True
+            self._interactions_array["dirty"][i] = True
+            self._interactions_version += 1
+
+    def _can_convert_incrementally(self):
+        """
+        Returns True if the physical model can be updated from the previous one only by the dirty interactions.
+        A full rebuild is needed for the first conversion, or when the model type changed.
+        """
+        return (self._physical_sums is not None) and (self._previous_physical_model is not None) and (self._previous_physical_model.get_mtype() == self._mtype)
+
+    def _resolve_interactions(self, placeholder, evaluated):
+        """
+        Resolves coefficients multiplied by scales for all alive interactions.
+        Returns indices of the alive interactions, their values, and whether each of them is numeric.
+        """
+        # Numeric coefficients and scales are multiplied in bulk with NumPy,
+        # and PyQUBO is used only for the interactions which hold PyQUBO objects (placeholders).
+        alive = np.flatnonzero(~self._interactions_array["removed"])
+
+        coefficients = self._interactions_array["coefficient"]
+        scales = self._interactions_array["scale"]
+        is_numeric = (self._interactions_array.is_numeric("coefficient") & self._interactions_array.is_numeric("scale"))[alive]
+        values = np.zeros(len(alive), dtype=np.float64)
+        numeric = alive[is_numeric]
+        values[is_numeric] = coefficients[numeric].astype(np.float64) * scales[numeric].astype(np.float64)
+        for pos in np.flatnonzero(~is_numeric):
+            i = alive[pos]
+            values[pos] = self._evaluate_placeholder(coefficients[i], placeholder, evaluated) * self._evaluate_placeholder(scales[i], placeholder, evaluated)
+
+        return alive, values, is_numeric
+
+    def _apply_all_interactions(self, placeholder, evaluated):
+        """
+        Resolves all interactions into sums of coefficients grouped by keys, and returns names of removed interactions.
+        """
+        alive, values, is_numeric = self._resolve_interactions(placeholder, evaluated)
+        will_remove = self._interactions_array["name"][self._interactions_array["removed"]].tolist()
+
+        # group by key
+        # Interactions are grouped by interned label ids, and only the unique keys are decoded to labels.
+        labels = self._interactions_array.get_labels()
+        names = self._interactions_array["name"][alive]
+        bodies = self._interactions_array["body"][alive]
+        ids_0 = self._interactions_array.get_label_ids("key_0")[alive].astype(np.int64)
+        ids_1 = self._interactions_array.get_label_ids("key_1")[alive].astype(np.int64)
+        is_linear = bodies == constants.INTERACTION_LINEAR
+        is_quadratic = bodies == constants.INTERACTION_QUADRATIC
+        uniques, linear_sums, linear_counts = self._sum_by_keys(ids_0[is_linear], values[is_linear])
+        linear_keys = [labels[k] for k in uniques.tolist()]
+        uniques, quadratic_sums, quadratic_counts = self._sum_by_keys(ids_0[is_quadratic] * len(labels) + ids_1[is_quadratic], values[is_quadratic])
+        quadratic_keys = [(labels[k // len(labels)], labels[k % len(labels)]) for k in uniques.tolist()]
+
+        # Keep the sums and the contribution of each interaction, for the next incremental conversion
+        self._physical_sums = {
+            constants.INTERACTION_LINEAR: dict(zip(linear_keys, linear_sums.tolist())),
+            constants.INTERACTION_QUADRATIC: dict(zip(quadratic_keys, quadratic_sums.tolist())),
+        }
+        self._physical_counts = {
+            constants.INTERACTION_LINEAR: dict(zip(linear_keys, linear_counts.tolist())),
+            constants.INTERACTION_QUADRATIC: dict(zip(quadratic_keys, quadratic_counts.tolist())),
+        }
+        self._physical_applied = dict(zip(names.tolist(), values.tolist()))
+        self._physical_symbolic = set(names[~is_numeric].tolist())
+
+        return will_remove
+
+    def _add_interactions_to(self, linear, quadratic, placeholder):
+        """
+        Adds coefficients of all alive interactions to the given sums of linear and quadratic interactions,
+        without modifying this model. Returns the resolved offset value.
+        This is used to stream interactions of constraint models into the sums of a model.
+        """
+        evaluated = {}
+        alive, values, _ = self._resolve_interactions(placeholder, evaluated)
+        for i, value in zip(alive.tolist(), values.tolist()):
+            key = self._interactions_array.get_key(i)
+            if self._interactions_array["body"][i] == constants.INTERACTION_LINEAR:
+                linear[key] = linear.get(key, 0.0) + value
+            elif self._interactions_array["body"][i] == constants.INTERACTION_QUADRATIC:
+                quadratic[key] = quadratic.get(key, 0.0) + value
+        return self._evaluate_placeholder(self._offset, placeholder, evaluated)
+
+    def _apply_dirty_interactions(self, placeholder, evaluated):
+        """
+        Applies dirty interactions as deltas to the sums of coefficients grouped by keys, and returns names of removed interactions.
+        Interactions with placeholders are always re-evaluated because the given placeholder may be changed.
+        """
+        dirty = np.flatnonzero(self._interactions_array["dirty"]).tolist()
+        targets = set(dirty) | {self._name_to_index[name] for name in self._physical_symbolic}
+
+        will_remove = []
+        for i in sorted(targets):
+            name = self._interactions_array["name"][i]
+            body = int(self._interactions_array["body"][i])
+            key = self._interactions_array.get_key(i)
+            sums = self._physical_sums[body]
+            counts = self._physical_counts[body]
+
+            # Cancel the previous contribution of the interaction
+            if name in self._physical_applied:
+                sums[key] -= self._physical_applied.pop(name)
+                counts[key] -= 1
+                if counts[key] == 0:
+                    del sums[key]
+                    del counts[key]
+            self._physical_symbolic.discard(name)
+
+            if self._interactions_array["removed"][i]:
+                will_remove.append(name)
+                continue
+
+            # Apply the current contribution of the interaction
+            coefficient = self._interactions_array["coefficient"][i]
+            scale = self._interactions_array["scale"][i]
+            value = float(self._evaluate_placeholder(coefficient, placeholder, evaluated) * self._evaluate_placeholder(scale, placeholder, evaluated))
+            if not (isinstance(coefficient, numbers.Number) and isinstance(scale, numbers.Number)):
+                self._physical_symbolic.add(name)
+            sums[key] = sums.get(key, 0.0) + value
+            counts[key] = counts.get(key, 0) + 1
+            self._physical_applied[name] = value
+
+        return will_remove
+
+    def _evaluate_placeholder(self, value, placeholder, evaluated):
+        """
+        Returns a numeric value of the given coefficient, scale, or offset, resolving placeholders using PyQUBO.
+        Each distinct PyQUBO object is compiled only once and cached, so later calls only re-evaluate it with the given placeholder.
+        Values evaluated within a single conversion are memoized in 'evaluated'.
+        """
+        if isinstance(value, numbers.Number):
+            return value
+
+        key = id(value)
+        if key in evaluated:
+            return evaluated[key]
+
+        cached = self._placeholder_cache.get(key)
+        if (cached is None) or (cached[0] is not value):
+            cached = (value, self._compile_placeholder(value))
+            self._placeholder_cache[key] = cached
+
+        evaluator = cached[1]
+        if isinstance(evaluator, numbers.Number):
+            result = evaluator
+        else:
+            result = evaluator.evaluate(feed_dict=placeholder)
+        evaluated[key] = result
+        return result
+
+    @staticmethod
+    def _compile_placeholder(value):
+        """
+        Compiles the given PyQUBO object into an evaluator, which is a number or a pyqubo.core.Coefficient.
+        """
+        if isinstance(value, pyqubo.core.Coefficient):
+            return value
+        value_model = (value + pyqubo.Binary("sawatabi-fake-variable")).compile()  # We need a variable for a valid model for pyqubo
+        return value_model.compiled_qubo.offset  # We don't need the variable just prepared, extracting only offset
+
+    def _invalidate_placeholder_cache(self, *values):
+        for value in values:
+            if (value is not None) and (not isinstance(value, numbers.Number)):
+                self._placeholder_cache.pop(id(value), None)
+
+    @staticmethod
+    def _sum_by_keys(keys, values):
+        """
+        Returns unique keys, and sums and counts of the values grouped by the keys, in order of the first appearance of each key.
+        """
+        codes, uniques = pd.factorize(keys)
+        sums = np.bincount(codes, weights=values, minlength=len(uniques))
+        counts = np.bincount(codes, minlength=len(uniques))
+        return uniques, sums, counts
+
     def merge(self, other):
         self._check_argument_type("other", other, LogicalModel)
 
@@ -633,31 +931,26 @@ class LogicalModel(AbstractModel):
                 self.append(name=key, shape=shape_diff)
 
         # Merge interactions
-        merged_interactions_with_duplication = {k: [] for k in self._default_keys}
-        merged_attrs = list(set(self._interactions_attrs) | set(other._interactions_attrs))
-        for k in self._default_keys:
-            merged_interactions_with_duplication[k] = self._interactions_array[k] + other._interactions_array[k]
-        for attr in merged_attrs:
-            if (attr in self._interactions_attrs) and (attr in other._interactions_array):
-                merged_interactions_with_duplication[attr] = self._interactions_array[attr] + other._interactions_array[attr]
-            elif attr in self._interactions_attrs:
-                merged_interactions_with_duplication[attr] = self._interactions_array[attr] + ([np.nan] * other._interactions_length)
-            elif attr in other._interactions_attrs:
-                merged_interactions_with_duplication[attr] = ([np.nan] * self._interactions_length) + other._interactions_array[attr]
-        duplicate_names = list(set(self._interactions_array["name"]) & set(other._interactions_array["name"]))
+        duplicate_names = set(self._name_to_index.keys()) & set(other._name_to_index.keys())
+        length = self._interactions_length
+        self._interactions_array.extend(other._interactions_array)
+        self._interactions_length = length + other._interactions_length
 
         # Rename duplicate interaction names by adding suffix of model id
-        for idx, name in enumerate(merged_interactions_with_duplication["name"]):
+        names = self._interactions_array["name"]
+        for idx, name in enumerate(names):
             if name in duplicate_names:
-                if idx < self._interactions_length:
+                if idx < length:
                     model_id = id(self)
                 else:
                     model_id = id(other)
-                merged_interactions_with_duplication["name"][idx] = f"{name} ({model_id})"
+                names[idx] = f"{name} ({model_id})"
+        self._interactions_version += 1
 
-        self._interactions_array = merged_interactions_with_duplication
-        self._interactions_attrs = merged_attrs
-        self._interactions_length = self._interactions_length + other._interactions_length
+        self._rebuild_name_to_index()
+        self._rebuild_label_to_rows()
+        # Interactions may be renamed, so the model needs to be fully converted next time
+        self._physical_sums = None
 
         # Merge constraints
         # If both models have a constraint with the same label, cannnot merge currently
@@ -683,25 +976,24 @@ class LogicalModel(AbstractModel):
         vartype = self._modeltype_to_vartype(self._mtype)
         for name, variable in self._variables.items():
             self._variables[name] = pyqubo.Array.create(name, shape=variable.shape, vartype=vartype)
-        df = self.select_interaction(query="removed == False")
-        for index, interaction in df.iterrows():
-            interacts = interaction["interacts"]
-            if self._mtype == constants.MODEL_ISING:
-                if isinstance(interacts, tuple):
-                    self._interactions_array["interacts"][index] = (
-                        pyqubo.Spin(interaction["interacts"][0].label),
-                        pyqubo.Spin(interaction["interacts"][1].label),
-                    )
-                else:
-                    self._interactions_array["interacts"][index] = pyqubo.Spin(interaction["interacts"].label)
-            elif self._mtype == constants.MODEL_QUBO:
-                if isinstance(interacts, tuple):
-                    self._interactions_array["interacts"][index] = (
-                        pyqubo.Binary(interaction["interacts"][0].label),
-                        pyqubo.Binary(interaction["interacts"][1].label),
-                    )
-                else:
-                    self._interactions_array["interacts"][index] = pyqubo.Binary(interaction["interacts"].label)
+
+        # Replace variables in alive interactions, creating a new variable only once for each label
+        if self._mtype == constants.MODEL_ISING:
+            variable_class = pyqubo.Spin
+        elif self._mtype == constants.MODEL_QUBO:
+            variable_class = pyqubo.Binary
+        converted = {}
+        interacts = self._interactions_array["interacts"]
+        for i in np.flatnonzero(~self._interactions_array["removed"]).tolist():
+            targets = interacts[i] if isinstance(interacts[i], tuple) else (interacts[i],)
+            for t in targets:
+                if t.label not in converted:
+                    converted[t.label] = variable_class(t.label)
+            if isinstance(interacts[i], tuple):
+                interacts[i] = (converted[targets[0].label], converted[targets[1].label])
+            else:
+                interacts[i] = converted[targets[0].label]
+        self._interactions_version += 1
 
     def to_ising(self):
         """
@@ -713,28 +1005,10 @@ class LogicalModel(AbstractModel):
         if self._mtype != constants.MODEL_ISING:
             self._mtype = constants.MODEL_ISING
 
-            # Update variables from Spin to Binary
+            # Update variables from Binary to Spin
             self._update_variables_type()
 
-            # Update h_{i}
-            h_df = self.select_interaction(query="(body == 1) and (removed == False)")
-            for index, h in h_df.iterrows():
-                coeff = h["coefficient"]
-                self.update_interaction(name=h["name"], coefficient=coeff * 0.5)
-                self._offset += coeff * 0.5
-
-            # Update J_{ij}
-            J_df = self.select_interaction(query="(body == 2) and (removed == False)")
-            for _, J in J_df.iterrows():
-                coeff = J["coefficient"]
-                self.update_interaction(name=J["name"], coefficient=coeff * 0.25)
-                self.add_interaction(
-                    target=J["interacts"][0], name=f"{J['key_0']} from {J['name']} (mtype additional {current_time()})", coefficient=coeff * 0.25
-                )
-                self.add_interaction(
-                    target=J["interacts"][1], name=f"{J['key_1']} from {J['name']} (mtype additional {current_time()})", coefficient=coeff * 0.25
-                )
-                self._offset += coeff * 0.25
+            self._convert_interactions(linear_factor=0.5, quadratic_factor=0.25, induced_factor=0.25, linear_offset_factor=0.5, quadratic_offset_factor=0.25)
         else:
             warnings.warn("The model is already an Ising model.")
 
@@ -743,7 +1017,7 @@ class LogicalModel(AbstractModel):
         For h:
             hs = h*(2x-1) = 2hx-h
         For J:
-            Jst = J*(2x-1)*(2y-1) = 4Jxy_2Jx-2Jy+J
+            Jst = J*(2x-1)*(2y-1) = 4Jxy-2Jx-2Jy+J
         """
         if self._mtype != constants.MODEL_QUBO:
             self._mtype = constants.MODEL_QUBO
@@ -751,28 +1025,93 @@ class LogicalModel(AbstractModel):
             # Update variables from Spin to Binary
             self._update_variables_type()
 
-            # Update h_{i}
-            h_df = self.select_interaction(query="(body == 1) and (removed == False)")
-            for index, h in h_df.iterrows():
-                coeff = h["coefficient"]
-                self.update_interaction(name=h["name"], coefficient=coeff * 2.0)
-                self._offset -= coeff
-
-            # Update J_{ij}
-            J_df = self.select_interaction(query="(body == 2) and (removed == False)")
-            for _, J in J_df.iterrows():
-                coeff = J["coefficient"]
-                self.update_interaction(name=J["name"], coefficient=J["coefficient"] * 4.0)
-                self.add_interaction(
-                    target=J["interacts"][0], name=f"{J['key_0']} from {J['name']} (mtype additional {current_time()})", coefficient=-coeff * 2.0
-                )
-                self.add_interaction(
-                    target=J["interacts"][1], name=f"{J['key_1']} from {J['name']} (mtype additional {current_time()})", coefficient=-coeff * 2.0
-                )
-                self._offset += coeff
+            self._convert_interactions(linear_factor=2.0, quadratic_factor=4.0, induced_factor=-2.0, linear_offset_factor=-1.0, quadratic_offset_factor=1.0)
         else:
             warnings.warn("The model is already a QUBO model.")
 
+    def _convert_interactions(self, linear_factor, quadratic_factor, induced_factor, linear_offset_factor, quadratic_offset_factor):
+        """
+        Transforms coefficients of all alive interactions in bulk for a conversion of the model type.
+        Each quadratic interaction induces linear terms on its two variables, and they are summed up into
+        a linear interaction named "<label> (mtype additional)" for each variable, which is dropped when it becomes zero.
+        """
+        removed = self._interactions_array["removed"]
+        bodies = self._interactions_array["body"]
+        linear = np.flatnonzero((bodies == constants.INTERACTION_LINEAR) & ~removed)
+        quadratic = np.flatnonzero((bodies == constants.INTERACTION_QUADRATIC) & ~removed)
+
+        # Values (coefficients multiplied by scales) before the conversion.
+        # Coefficients or scales may be PyQUBO objects, then the object arrays are computed elementwise.
+        coefficients = self._interactions_array["coefficient"]
+        scales = self._interactions_array["scale"]
+        linear_values = coefficients[linear] * scales[linear]
+        quadratic_values = coefficients[quadratic] * scales[quadratic]
+
+        # Offset with one reduction
+        offset_terms = np.concatenate([linear_values * linear_offset_factor, quadratic_values * quadratic_offset_factor])
+        if len(offset_terms) > 0:
+            self._offset += offset_terms.sum()
+
+        # Transform coefficients in bulk
+        coefficients[linear] = coefficients[linear] * linear_factor
+        coefficients[quadratic] = coefficients[quadratic] * quadratic_factor
+        self._interactions_array["dirty"][linear] = True
+        self._interactions_array["dirty"][quadratic] = True
+        self._interactions_version += 1
+
+        # Sum up induced linear terms for each variable
+        labels = self._interactions_array.get_labels()
+        ids = np.concatenate([self._interactions_array.get_label_ids("key_0")[quadratic], self._interactions_array.get_label_ids("key_1")[quadratic]])
+        induced_values = np.concatenate([quadratic_values, quadratic_values]) * induced_factor
+        is_numeric = np.fromiter((isinstance(v, numbers.Number) for v in induced_values), dtype=bool, count=len(induced_values))
+        induced = np.bincount(ids[is_numeric], weights=induced_values[is_numeric].astype(np.float64), minlength=len(labels))
+        induced_rows = np.concatenate([quadratic, quadratic])
+
+        # Induced terms with PyQUBO objects cannot be summed up numerically, so they are kept per label as they are
+        symbolic_induced = {}
+        for pos in np.flatnonzero(~is_numeric).tolist():
+            label_id = int(ids[pos])
+            symbolic_induced[label_id] = symbolic_induced.get(label_id, 0.0) + induced_values[pos]
+
+        targets, names, new_coefficients = [], [], []
+        _, first_positions = np.unique(ids, return_index=True)
+        for pos in sorted(first_positions.tolist()):
+            label_id = int(ids[pos])
+            label = labels[label_id]
+            value = induced[label_id]
+            if label_id in symbolic_induced:
+                value = value + symbolic_induced[label_id]
+            # Induced terms are kept in an interaction of their own, so that interactions added by users are never touched
+            name = f"{label} (mtype additional)"
+            if self._has_name(name):
+                self._fold_into_additional_interaction(name, value)
+                continue
+            if isinstance(value, numbers.Number) and (value == 0.0):
+                continue
+            interacts = self._interactions_array["interacts"][induced_rows[pos]]
+            targets.append(interacts[0] if interacts[0].label == label else interacts[1])
+            names.append(name)
+            new_coefficients.append(value)
+        self.add_interactions(targets, names=names, coefficients=new_coefficients)
+
+    def _fold_into_additional_interaction(self, name, value):
+        """
+        Adds the value to the interaction added by a previous model type conversion.
+        The interaction is revived if it has been removed, and is removed if its coefficient becomes zero.
+        """
+        idx = self._name_to_index[name]
+        coefficients = self._interactions_array["coefficient"]
+        scales = self._interactions_array["scale"]
+        removed = self._interactions_array["removed"]
+        if removed[idx]:
+            coefficients[idx] = value
+        else:
+            coefficients[idx] = coefficients[idx] * scales[idx] + value
+        scales[idx] = 1.0
+        removed[idx] = isinstance(coefficients[idx], numbers.Number) and (coefficients[idx] == 0.0)
+        self._interactions_array["dirty"][idx] = True
+        self._interactions_version += 1
+
     ################################
     # Getters
     ################################
@@ -836,9 +1175,9 @@ class LogicalModel(AbstractModel):
         Returns a dict of attributes (keys and values) for the given variable or interaction.
         """
         internal_name = self._get_internal_name_from_target_and_name(target, name)
-        idx = self._interactions_array["name"].index(internal_name)
+        idx = self._name_to_index[internal_name]
         res = {}
-        for attr in self._interactions_attrs:
+        for attr in self._interactions_array.get_attribute_keys():
             res[attr] = self._interactions_array[attr][idx]
         return res
 
@@ -862,6 +1201,174 @@ class LogicalModel(AbstractModel):
         """
         return self._constraints[label]
 
+    ################################
+    # Serialization
+    ################################
+
+    _SERIALIZED_NUMERIC_KEYS = ["body", "timestamp", "dirty", "removed"]
+    _SERIALIZED_OBJECT_KEYS = ["name", "coefficient", "scale"]
+
+    def to_bytes(self, with_conversion_state=False):
+        """
+        Serializes the model into the sawatabi binary format.
+        If with_conversion_state is True, the state for the incremental conversion to a physical model
+        (sums of coefficients and the previous physical model) is serialized as well.
+        Otherwise, the first conversion after deserialization is a full one.
+        """
+        array = self._interactions_array
+        meta = {
+            "mtype": self._mtype,
+            "variables": [],
+            "deleted": list(self._deleted.keys()),
+            "fixed": list(self._fixed.keys()),
+            "attribute_keys": list(array.get_attribute_keys()),
+            "columns": {},
+        }
+        objects = {"variables": {}, "columns": {}}
+
+        # Variables created by pyqubo.Array.create are saved only by their shapes
+        for name, value in self._variables.items():
+            shape = self._created_array_shape(name, value)
+            meta["variables"].append([name, shape])
+            if shape is None:
+                objects["variables"][name] = value
+        if isinstance(self._offset, (int, float)):
+            meta["offset"] = self._offset
+        else:
+            objects["offset"] = self._offset
+        if len(self._constraints) > 0:
+            objects["constraints"] = self._constraints
+        if with_conversion_state and self._can_convert_incrementally():
+            objects["conversion_state"] = {
+                "sums": self._physical_sums,
+                "counts": self._physical_counts,
+                "applied": self._physical_applied,
+                "symbolic": self._physical_symbolic,
+                "previous_physical_model": self._previous_physical_model.to_bytes(),
+            }
+
+        labels_data, labels_offsets = ModelFormat.encode_strings(array.get_labels())
+        arrays = {
+            "labels_data": labels_data,
+            "labels_offsets": labels_offsets,
+            "key_0": array.get_label_ids("key_0"),
+            "key_1": array.get_label_ids("key_1"),
+        }
+        for k in self._SERIALIZED_NUMERIC_KEYS:
+            arrays[k] = array[k]
+
+        # Object columns are saved as typed arrays if possible, otherwise pickled
+        for k in self._SERIALIZED_OBJECT_KEYS + meta["attribute_keys"]:
+            column = array[k]
+            encoding = self._column_encoding(column)
+            meta["columns"][k] = encoding
+            if encoding == "str":
+                arrays[f"{k}.data"], arrays[f"{k}.offsets"] = ModelFormat.encode_strings(column.tolist())
+            elif encoding == "pickle":
+                objects["columns"][k] = column
+            else:
+                arrays[k] = column.astype(encoding)
+
+        return ModelFormat.pack(ModelFormat.KIND_LOGICAL, meta, arrays, objects)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Deserializes a model from the sawatabi binary format.
+        """
+        meta, arrays, objects = ModelFormat.unpack(data, ModelFormat.KIND_LOGICAL)
+
+        model = cls(mtype=meta["mtype"])
+        vartype = model._modeltype_to_vartype(model._mtype)
+        for name, shape in meta["variables"]:
+            if shape is None:
+                model._variables[name] = objects["variables"][name]
+            else:
+                model._variables[name] = pyqubo.Array.create(name, shape=tuple(shape), vartype=vartype)
+        model._offset = meta["offset"] if "offset" in meta else objects["offset"]
+        model._deleted = dict.fromkeys(meta["deleted"], True)
+        model._fixed = dict.fromkeys(meta["fixed"], True)
+        model._constraints = objects.get("constraints", {})
+
+        columns = {k: arrays[k] for k in cls._SERIALIZED_NUMERIC_KEYS + InteractionsArray._LABEL_KEYS}
+        for k, encoding in meta["columns"].items():
+            if encoding == "str":
+                column = np.empty(len(arrays["body"]), dtype=object)
+                column[:] = ModelFormat.decode_strings(arrays[f"{k}.data"], arrays[f"{k}.offsets"])
+            elif encoding == "pickle":
+                column = objects["columns"][k]
+            elif k in InteractionsArray._PROMOTABLE_KEYS:
+                column = arrays[k]
+            else:
+                column = arrays[k].astype(object)
+            columns[k] = column
+
+        # Variables which the interactions interact with are recreated from the labels
+        labels = ModelFormat.decode_strings(arrays["labels_data"], arrays["labels_offsets"])
+        variable = pyqubo.Spin if model._mtype == constants.MODEL_ISING else pyqubo.Binary
+        decoder = [variable(label) for label in labels]
+        interacts = np.empty(len(arrays["body"]), dtype=object)
+        for i, (id_0, id_1) in enumerate(zip(arrays["key_0"].tolist(), arrays["key_1"].tolist())):
+            interacts[i] = decoder[id_0] if id_1 == InteractionsArray._NO_LABEL else (decoder[id_0], decoder[id_1])
+        columns["interacts"] = interacts
+
+        model._interactions_array = InteractionsArray.from_columns(columns, labels, meta["attribute_keys"])
+        model._interactions_length = model._interactions_array.get_length()
+        model._rebuild_name_to_index()
+        model._rebuild_label_to_rows()
+
+        if "conversion_state" in objects:
+            state = objects["conversion_state"]
+            model._physical_sums = state["sums"]
+            model._physical_counts = state["counts"]
+            model._physical_applied = state["applied"]
+            model._physical_symbolic = state["symbolic"]
+            model._previous_physical_model = PhysicalModel.from_bytes(state["previous_physical_model"])
+        return model
+
+    def save(self, path):
+        """
+        Saves the model into a file in the sawatabi binary format.
+        """
+        ModelFormat.save(path, self.to_bytes())
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads a model from a file in the sawatabi binary format.
+        If mmap is True, numeric sections are read through np.memmap of the file.
+        """
+        return cls.from_bytes(ModelFormat.load(path, mmap=mmap))
+
+    def _created_array_shape(self, name, value):
+        """
+        Returns the shape of the variables if they are the same as pyqubo.Array.create makes, otherwise None.
+        """
+        if not isinstance(value, pyqubo.Array):
+            return None
+        variable = pyqubo.Spin if self._mtype == constants.MODEL_ISING else pyqubo.Binary
+        flattened = list(Functions._flatten(value.bit_list))
+        expected = (name + "".join(f"[{i}]" for i in index) for index in np.ndindex(*value.shape))
+        if (len(flattened) != int(np.prod(value.shape))) or not all(isinstance(v, variable) and (v.label == e) for v, e in zip(flattened, expected)):
+            return None
+        return list(value.shape)
+
+    @staticmethod
+    def _column_encoding(column):
+        """
+        Returns how the column is encoded: a NumPy dtype for numeric columns, "str" for strings, or "pickle" for the others.
+        """
+        if column.dtype != object:
+            return column.dtype.str
+        types = set(map(type, column.tolist()))
+        if types == {str}:
+            return "str"
+        if types == {float}:
+            return "float64"
+        if types == {int} and all(-(2 ** 63) <= v < 2 ** 63 for v in column.tolist()):
+            return "int64"
+        return "pickle"
+
     ################################
     # Built-in functions
     ################################
@@ -872,7 +1379,6 @@ class LogicalModel(AbstractModel):
             and (self._mtype == other._mtype)
             and (self._variables == other._variables)
             and (self._interactions_array == other._interactions_array)
-            and (self._interactions_attrs == other._interactions_attrs)
             and (self._interactions_length == other._interactions_length)
             and (self._constraints == other._constraints)
             and (self._deleted == other._deleted)
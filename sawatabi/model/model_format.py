@@ -0,0 +1,160 @@
+# Copyright 2021 Kotaro Terada
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import pickle
+import struct
+
+import numpy as np
+
+
+class ModelFormat:
+    """
+    Binary format of models.
+
+    The layout is:
+    - header: magic, format version, model kind, and the length of the table
+    - table: JSON of metadata and descriptors (dtype, shape, offset, and nbytes) of the sections
+    - sections: raw bytes of typed NumPy arrays, each aligned to SECTION_ALIGNMENT bytes
+
+    Python objects which cannot be expressed as typed arrays are pickled into the "objects" section.
+    Since sections are raw arrays, they can be read with zero copies from bytes or from a np.memmap of a file.
+    """
+
+    MAGIC = b"SAWATABI"
+    VERSION = 1
+    KIND_PHYSICAL = 1
+    KIND_LOGICAL = 2
+    SECTION_ALIGNMENT = 64
+
+    _HEADER = struct.Struct("<8sHHIQ")
+
+    ################################
+    # Pack / Unpack
+    ################################
+
+    @classmethod
+    def pack(cls, kind, meta, arrays, objects=None):
+        """
+        Packs metadata (JSON-serializable dict), a dict of NumPy arrays, and a dict of Python objects into bytes.
+        """
+        arrays = dict(arrays)
+        if objects:
+            arrays["objects"] = np.frombuffer(pickle.dumps(objects, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+
+        sections = {}
+        offset = 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            arrays[name] = array
+            sections[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset, "nbytes": array.nbytes}
+            offset = cls._align(offset + array.nbytes)
+
+        table = json.dumps({"meta": meta, "sections": sections}).encode("utf-8")
+        table_start, table_end = cls._HEADER.size, cls._HEADER.size + len(table)
+        data_start = cls._align(table_end)
+
+        buf = bytearray(data_start + offset)
+        cls._HEADER.pack_into(buf, 0, cls.MAGIC, cls.VERSION, kind, 0, len(table))
+        buf[table_start:table_end] = table
+        for name, section in sections.items():
+            start = data_start + section["offset"]
+            end = start + section["nbytes"]
+            buf[start:end] = arrays[name].tobytes()
+        return bytes(buf)
+
+    @classmethod
+    def unpack(cls, data, kind):
+        """
+        Unpacks bytes (or a uint8 array such as np.memmap) into a tuple of metadata, a dict of arrays, and a dict of objects.
+        Arrays are views of the given data.
+        """
+        if not isinstance(data, np.ndarray):
+            data = np.frombuffer(data, dtype=np.uint8)
+        if len(data) < cls._HEADER.size:
+            raise ValueError("Data is too short to be a sawatabi model.")
+
+        magic, version, actual_kind, _, table_length = cls._HEADER.unpack(data[: cls._HEADER.size].tobytes())
+        if magic != cls.MAGIC:
+            raise ValueError("Data is not a sawatabi model.")
+        if version > cls.VERSION:
+            raise ValueError(f"Format version {version} is not supported (supported up to {cls.VERSION}).")
+        if actual_kind != kind:
+            raise ValueError(f"Model kind mismatch: expected {kind}, but got {actual_kind}.")
+
+        table_start, table_end = cls._HEADER.size, cls._HEADER.size + table_length
+        table = json.loads(data[table_start:table_end].tobytes().decode("utf-8"))
+        data_start = cls._align(table_end)
+
+        arrays = {}
+        for name, section in table["sections"].items():
+            start = data_start + section["offset"]
+            end = start + section["nbytes"]
+            raw = data[start:end]
+            arrays[name] = raw.view(np.dtype(section["dtype"])).reshape(section["shape"])
+
+        objects = {}
+        if "objects" in arrays:
+            objects = pickle.loads(arrays.pop("objects").tobytes())
+        return table["meta"], arrays, objects
+
+    @classmethod
+    def _align(cls, offset):
+        return (offset + cls.SECTION_ALIGNMENT - 1) // cls.SECTION_ALIGNMENT * cls.SECTION_ALIGNMENT
+
+    ################################
+    # Files
+    ################################
+
+    @staticmethod
+    def save(path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    @staticmethod
+    def load(path, mmap=True):
+        """
+        Loads a file as a read-only uint8 np.memmap, or as bytes if mmap is False.
+        """
+        if mmap:
+            return np.memmap(path, dtype=np.uint8, mode="r")
+        with open(path, "rb") as f:
+            return f.read()
+
+    ################################
+    # Strings
+    ################################
+
+    @staticmethod
+    def encode_strings(strings):
+        """
+        Encodes a list of strings into a pair of concatenated UTF-8 bytes (uint8 array) and their offsets (int64 array).
+        """
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+    @staticmethod
+    def decode_strings(data, offsets):
+        """
+        Decodes a list of strings encoded by encode_strings.
+        """
+        raw = data.tobytes()
+        offsets = offsets.tolist()
+        text = raw.decode("utf-8")
+        if len(text) == len(raw):
+            # ASCII only, so byte offsets are also character offsets
+            return [text[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+        return [raw[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])]
@@ -15,29 +15,172 @@
 import pprint
 
 import dimod
+import numpy as np
 
 import sawatabi.constants as constants
 from sawatabi.model.abstract_model import AbstractModel
+from sawatabi.model.model_format import ModelFormat
 
 
 class PhysicalModel(AbstractModel):
     def __init__(self, mtype=""):
         super().__init__(mtype)
-        self._raw_interactions = {
+        # Raw interactions and the set of variables are accessed through properties,
+        # since they are decoded lazily from the arrays for a model loaded from the binary format.
+        self._raw_interactions_dicts = {
             constants.INTERACTION_LINEAR: {},  # linear (1-body)
             constants.INTERACTION_QUADRATIC: {},  # quadratic (2-body)
         }
+        self._variables_set_lazy = set()
         self._offset = 0.0
-        self._variables_set = set()
         self._label_to_index = {}
         self._index_to_label = {}
 
+        # Canonical compact form of the interactions, indexed by _label_to_index.
+        # - h: dense vector of linear coefficients
+        # - J: quadratic coefficients as COO (one entry per interaction) and
+        #      as CSR of the symmetric adjacency (both directions of each interaction)
+        # They are built once when the model is converted from a logical model, or lazily on the first access.
+        self._h = None
+        self._h_index = None
+        self._J_row = None
+        self._J_col = None
+        self._J_data = None
+        self._J_indptr = None
+        self._J_indices = None
+        self._J_csr_data = None
+
+        # BQMs converted from this model, keyed by sign
+        self._bqm_cache = {}
+
+    @property
+    def _raw_interactions(self):
+        if self._raw_interactions_dicts is None:
+            self._decode_raw_interactions()
+        return self._raw_interactions_dicts
+
+    @_raw_interactions.setter
+    def _raw_interactions(self, value):
+        self._raw_interactions_dicts = value
+        self._h = None
+        self._bqm_cache = {}
+
+    @property
+    def _variables_set(self):
+        if self._variables_set_lazy is None:
+            self._decode_raw_interactions()
+        return self._variables_set_lazy
+
+    @_variables_set.setter
+    def _variables_set(self, value):
+        self._variables_set_lazy = value
+
     ################################
     # Interaction
     ################################
 
     def add_interaction(self, name, body, coefficient):
         self._raw_interactions[body][name] = coefficient
+        self._h = None
+        self._bqm_cache = {}
+
+    def get_num_interactions(self):
+        """
+        Returns the number of (linear and quadratic) interactions, without decoding the raw interactions of a loaded model.
+        """
+        if self._raw_interactions_dicts is None:
+            return len(self._h_index) + len(self._J_row)
+        return len(self._raw_interactions_dicts[constants.INTERACTION_LINEAR]) + len(self._raw_interactions_dicts[constants.INTERACTION_QUADRATIC])
+
+    ################################
+    # Arrays
+    ################################
+
+    def _build_arrays(self):
+        """
+        Builds the canonical compact form of the interactions from the raw interactions.
+        """
+        num_variables = len(self._label_to_index)
+        linear = self._raw_interactions[constants.INTERACTION_LINEAR]
+        quadratic = self._raw_interactions[constants.INTERACTION_QUADRATIC]
+
+        h = np.zeros(num_variables, dtype=np.float64)
+        index = np.fromiter((self._label_to_index[k] for k in linear.keys()), dtype=np.int32, count=len(linear))
+        h[index] = np.fromiter(linear.values(), dtype=np.float64, count=len(linear))
+
+        row = np.fromiter((self._label_to_index[k[0]] for k in quadratic.keys()), dtype=np.int32, count=len(quadratic))
+        col = np.fromiter((self._label_to_index[k[1]] for k in quadratic.keys()), dtype=np.int32, count=len(quadratic))
+        data = np.fromiter(quadratic.values(), dtype=np.float64, count=len(quadratic))
+
+        self._h = h
+        self._h_index = index
+        self._J_row, self._J_col, self._J_data = row, col, data
+        self._build_adjacency()
+
+    def _build_adjacency(self):
+        """
+        Builds CSR of the symmetric adjacency from the COO arrays, sorted by (row, col).
+        """
+        num_variables = len(self._h)
+        sym_row = np.concatenate([self._J_row, self._J_col])
+        sym_col = np.concatenate([self._J_col, self._J_row])
+        order = np.lexsort((sym_col, sym_row))
+        indptr = np.zeros(num_variables + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sym_row, minlength=num_variables), out=indptr[1:])
+
+        self._J_indptr = indptr
+        self._J_indices = sym_col[order]
+        self._J_csr_data = np.concatenate([self._J_data, self._J_data])[order]
+
+    def _decode_raw_interactions(self):
+        """
+        Decodes the raw interactions and the set of variables from the arrays.
+        """
+        labels = np.empty(len(self._h), dtype=object)
+        labels[:] = [self._index_to_label[i] for i in range(len(self._h))]
+        h_index, row, col = self._h_index, self._J_row, self._J_col
+        self._raw_interactions_dicts = {
+            constants.INTERACTION_LINEAR: dict(zip(labels[h_index].tolist(), self._h[h_index].tolist())),
+            constants.INTERACTION_QUADRATIC: dict(zip(zip(labels[row].tolist(), labels[col].tolist()), self._J_data.tolist())),
+        }
+        self._variables_set_lazy = set(labels[np.unique(np.concatenate([h_index, row, col]))].tolist())
+
+    def _unindexed_labels(self):
+        """
+        Returns a set of labels in the interactions which have no index.
+        """
+        labels = set(self._raw_interactions[constants.INTERACTION_LINEAR].keys())
+        for k in self._raw_interactions[constants.INTERACTION_QUADRATIC].keys():
+            labels.update(k)
+        return labels.difference(self._label_to_index.keys())
+
+    def _ensure_arrays(self):
+        if self._h is None:
+            unindexed = self._unindexed_labels()
+            if len(unindexed) > 0:
+                raise ValueError(f"Variables {sorted(unindexed, key=str)} have no index, so the model cannot be expressed by arrays.")
+            self._build_arrays()
+
+    def get_h(self):
+        """
+        Returns the linear coefficients as a dense vector indexed by the variable index.
+        """
+        self._ensure_arrays()
+        return self._h
+
+    def get_J(self):
+        """
+        Returns the quadratic coefficients in COO format as a tuple of (row, col, data).
+        """
+        self._ensure_arrays()
+        return self._J_row, self._J_col, self._J_data
+
+    def get_adjacency(self):
+        """
+        Returns the symmetric adjacency of the quadratic coefficients in CSR format as a tuple of (indptr, indices, data).
+        """
+        self._ensure_arrays()
+        return self._J_indptr, self._J_indices, self._J_csr_data
 
     ################################
     # Offset
@@ -54,23 +197,74 @@ class PhysicalModel(AbstractModel):
     ################################
 
     def to_bqm(self, sign=-1.0):
+        """
+        Returns a dimod BQM of this model.
+        The BQM is converted once and cached until the model is modified, and a copy of it is returned.
+        """
+        return self._cached_bqm(sign).copy()
+
+    def _cached_bqm(self, sign=-1.0):
+        """
+        Returns the cached BQM of this model, which must not be modified by the caller.
+        """
         # Signs for BQM are opposite from our (sawatabi's) definition.
         # - BQM:      H =   sum( J_{ij} * x_i * x_j ) + sum( h_{i} * x_i )
         # - Sawatabi: H = - sum( J_{ij} * x_i * x_j ) - sum( h_{i} * x_i )
-        linear, quadratic = {}, {}
-        for k, v in self._raw_interactions[constants.INTERACTION_LINEAR].items():
-            linear[k] = sign * v
-        for k, v in self._raw_interactions[constants.INTERACTION_QUADRATIC].items():
-            quadratic[k] = sign * v
+        bqm = self._bqm_cache.get(sign)
+        if (bqm is not None) and (bqm.offset == self._offset):
+            return bqm
 
         if self.get_mtype() == constants.MODEL_ISING:
             vartype = dimod.SPIN
         elif self.get_mtype() == constants.MODEL_QUBO:
             vartype = dimod.BINARY
-        bqm = dimod.BinaryQuadraticModel(linear, quadratic, self._offset, vartype)
 
+        try:
+            self._ensure_arrays()
+        except ValueError:
+            # Some variables are not indexed (the model is not converted from a logical model), build from dicts instead
+            bqm = self._to_bqm_from_dicts(sign, vartype)
+        else:
+            order = self._bqm_variable_order()
+            inverse = np.empty(len(order), dtype=np.int32)
+            inverse[order] = np.arange(len(order), dtype=np.int32)
+            linear = sign * self._h[order]
+            quadratic = (inverse[self._J_row], inverse[self._J_col], sign * self._J_data)
+            variable_order = [self._index_to_label[i] for i in order.tolist()]
+            bqm = dimod.BinaryQuadraticModel.from_numpy_vectors(linear, quadratic, self._offset, vartype, variable_order=variable_order)
+
+        self._bqm_cache[sign] = bqm
         return bqm
 
+    def _bqm_variable_order(self):
+        """
+        Returns the variable indices in the same order as a BQM built from the raw interactions dicts,
+        i.e. variables in quadratic interactions first, then the others in linear interactions.
+        """
+        num_variables = len(self._h)
+        seen = np.zeros(num_variables, dtype=bool)
+
+        # Variables in quadratic interactions, in the order of the first appearance
+        appearance = np.column_stack([self._J_row, self._J_col]).ravel()
+        uniques, first = np.unique(appearance, return_index=True)
+        quadratic = uniques[np.argsort(first, kind="stable")]
+        seen[quadratic] = True
+
+        # Variables only in linear interactions, in the order of insertion
+        linear = self._h_index[~seen[self._h_index]]
+        seen[linear] = True
+
+        return np.concatenate([quadratic, linear, np.flatnonzero(~seen)]).astype(np.int32)
+
+    def _to_bqm_from_dicts(self, sign, vartype):
+        linear, quadratic = {}, {}
+        for k, v in self._raw_interactions[constants.INTERACTION_LINEAR].items():
+            linear[k] = sign * v
+        for k, v in self._raw_interactions[constants.INTERACTION_QUADRATIC].items():
+            quadratic[k] = sign * v
+
+        return dimod.BinaryQuadraticModel(linear, quadratic, self._offset, vartype)
+
     def to_polynomial(self):
         # For optigan, a variable identifier must be an integer.
         # Names for variables in the physical model is string, we need to convert them.
@@ -78,16 +272,117 @@ class PhysicalModel(AbstractModel):
         # Signs for Optigan are opposite from our (sawatabi's) definition.
         # - Optigan:  H =   sum( Q_{ij} * x_i * x_j ) + sum( Q_{i, i} * x_i )
         # - Sawatabi: H = - sum( J_{ij} * x_i * x_j ) - sum( h_{i} * x_i )
-        polynomial = []
-        for k, v in self._raw_interactions[constants.INTERACTION_LINEAR].items():
-            index = self._label_to_index[k]
-            polynomial.append([index, index, -1.0 * v])
-        for k, v in self._raw_interactions[constants.INTERACTION_QUADRATIC].items():
-            index = [self._label_to_index[k[0]], self._label_to_index[k[1]]]
-            polynomial.append([index[0], index[1], -1.0 * v])
+        polynomial = self.to_polynomial_array()
+        index = polynomial[:, :2].astype(np.int64)
+        polynomial = [[i, j, v] for i, j, v in zip(index[:, 0].tolist(), index[:, 1].tolist(), polynomial[:, 2].tolist())]
+
+        return polynomial
+
+    def to_polynomial_array(self):
+        """
+        Returns the polynomial as an (N, 3) float64 array whose rows are [i, j, Q_{ij}], in the same order as to_polynomial.
+        """
+        h = self.get_h()
+        row, col, data = self.get_J()
+        # Linear terms in the order of insertion, including explicit zeros
+        index = self._h_index
+
+        num_linear = len(index)
+        polynomial = np.empty((num_linear + len(row), 3), dtype=np.float64)
+        polynomial[:num_linear, 0] = index
+        polynomial[:num_linear, 1] = index
+        polynomial[:num_linear, 2] = -1.0 * h[index]
+        polynomial[num_linear:, 0] = row
+        polynomial[num_linear:, 1] = col
+        polynomial[num_linear:, 2] = -1.0 * data
 
         return polynomial
 
+    ################################
+    # Serialization
+    ################################
+
+    def to_bytes(self):
+        """
+        Serializes the model into the sawatabi binary format.
+        """
+        meta = {"mtype": self._mtype, "pickled": False}
+        try:
+            meta["offset"] = float(self._offset)
+            self._ensure_arrays()
+            labels = [self._index_to_label[i] for i in range(len(self._h))]
+            if not all(isinstance(label, str) for label in labels):
+                raise TypeError
+        except (ValueError, TypeError):
+            # The model cannot be expressed only by arrays of string-labeled variables, so fall back to pickle
+            meta["pickled"] = True
+            return ModelFormat.pack(ModelFormat.KIND_PHYSICAL, meta, {}, {"model": self})
+
+        labels_data, labels_offsets = ModelFormat.encode_strings(labels)
+        arrays = {
+            "labels_data": labels_data,
+            "labels_offsets": labels_offsets,
+            "h": self._h,
+            "h_index": self._h_index,
+            "J_row": self._J_row,
+            "J_col": self._J_col,
+            "J_data": self._J_data,
+            "J_indptr": self._J_indptr,
+            "J_indices": self._J_indices,
+            "J_csr_data": self._J_csr_data,
+        }
+        return ModelFormat.pack(ModelFormat.KIND_PHYSICAL, meta, arrays)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Deserializes a model from the sawatabi binary format.
+        Numeric arrays of the model are read-only views of the given data,
+        and the raw interactions are decoded from them only when they are accessed.
+        """
+        meta, arrays, objects = ModelFormat.unpack(data, ModelFormat.KIND_PHYSICAL)
+        if meta["pickled"]:
+            return objects["model"]
+
+        model = cls(mtype=meta["mtype"])
+        model._offset = meta["offset"]
+        labels = ModelFormat.decode_strings(arrays["labels_data"], arrays["labels_offsets"])
+        model._label_to_index = {label: i for i, label in enumerate(labels)}
+        model._index_to_label = dict(enumerate(labels))
+
+        model._h, model._h_index = arrays["h"], arrays["h_index"]
+        model._J_row, model._J_col, model._J_data = arrays["J_row"], arrays["J_col"], arrays["J_data"]
+        if "J_indptr" in arrays:
+            model._J_indptr, model._J_indices, model._J_csr_data = arrays["J_indptr"], arrays["J_indices"], arrays["J_csr_data"]
+        else:
+            model._build_adjacency()
+        model._raw_interactions_dicts = None
+        model._variables_set_lazy = None
+        return model
+
+    def save(self, path):
+        """
+        Saves the model into a file in the sawatabi binary format.
+        """
+        ModelFormat.save(path, self.to_bytes())
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads a model from a file in the sawatabi binary format.
+        If mmap is True, numeric arrays of the model are backed by a read-only np.memmap of the file.
+        """
+        return cls.from_bytes(ModelFormat.load(path, mmap=mmap))
+
+    @classmethod
+    def open_mmap(cls, path):
+        """
+        Opens a model in a file in the sawatabi binary format with memory mapping.
+        The index and coefficient arrays are not copied from the file, so processes which open the same file share its page cache.
+        Solvers consume the arrays directly, and the raw interactions are decoded only when they are accessed.
+        """
+        return cls.load(path, mmap=True)
+
     ################################
     # Built-in functions
     ################################
@@ -12,6 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import dimod
+import numpy as np
+
 from sawatabi.base_mixin import BaseMixin
 
 
@@ -21,3 +24,33 @@ class AbstractSolver(BaseMixin):
 
     def solve(self, model):
         raise NotImplementedError("#{self.class}##{__method__} must be implemented.")
+
+    @staticmethod
+    def _build_sampleset(model, samples, energies, vartype, info=None):
+        """
+        Builds a SampleSet from a (num_reads x num_variables) matrix of samples whose columns are in index order of the model.
+        The result is the same as dimod.SampleSet.from_samples(..., aggregate_samples=True, sort_labels=True) with a dict per read,
+        but labels are sorted and identical samples are aggregated on the matrix at once.
+        """
+        samples = np.asarray(samples, dtype=np.int8)
+        energies = np.asarray(energies, dtype=np.float64)
+        labels = [model._index_to_label[i] for i in range(samples.shape[1])]
+        try:
+            order = sorted(range(len(labels)), key=labels.__getitem__)
+        except TypeError:
+            # Unlike types are not sortable, keep the order as dimod does
+            order = list(range(len(labels)))
+        samples = samples[:, order]
+        labels = [labels[i] for i in order]
+
+        # Aggregate identical samples in order of their first appearance, as SampleSet.aggregate does
+        _, first, inverse = np.unique(samples, axis=0, return_index=True, return_inverse=True)
+        rank = np.argsort(first)
+        new_index = np.empty(len(rank), dtype=np.int64)
+        new_index[rank] = np.arange(len(rank))
+        num_occurrences = np.bincount(new_index[inverse.ravel()], minlength=len(rank))
+        first = first[rank]
+
+        return dimod.SampleSet.from_samples(
+            (samples[first], labels), vartype=vartype, energy=energies[first], info=info, num_occurrences=num_occurrences, sort_labels=False
+        )
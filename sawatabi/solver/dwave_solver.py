@@ -15,7 +15,6 @@
 from dwave.system.composites import EmbeddingComposite
 from dwave.system.samplers import DWaveSampler
 
-import sawatabi.constants as constants
 from sawatabi.model.physical_model import PhysicalModel
 from sawatabi.solver.abstract_solver import AbstractSolver
 
@@ -45,11 +44,11 @@ class DWaveSolver(AbstractSolver):
     def solve(self, model, **kwargs):
         self._check_argument_type("model", model, PhysicalModel)
 
-        if len(model._raw_interactions[constants.INTERACTION_LINEAR]) == 0 and len(model._raw_interactions[constants.INTERACTION_QUADRATIC]) == 0:
+        if model.get_num_interactions() == 0:
             raise ValueError("Model cannot be empty.")
 
         # Converts to BQM (model representation for D-Wave)
-        bqm = model.to_bqm()
+        bqm = model._cached_bqm()
 
         sampleset = self._composite.sample(bqm, **kwargs)
 
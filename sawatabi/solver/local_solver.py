@@ -17,7 +17,6 @@ import time
 import dimod
 import neal
 
-import sawatabi.constants as constants
 from sawatabi.model.physical_model import PhysicalModel
 from sawatabi.solver.abstract_solver import AbstractSolver
 
@@ -37,10 +36,10 @@ class LocalSolver(AbstractSolver):
     def solve(self, model, **kwargs):
         self._check_argument_type("model", model, PhysicalModel)
 
-        if len(model._raw_interactions[constants.INTERACTION_LINEAR]) == 0 and len(model._raw_interactions[constants.INTERACTION_QUADRATIC]) == 0:
+        if model.get_num_interactions() == 0:
             raise ValueError("Model cannot be empty.")
 
-        bqm = model.to_bqm()
+        bqm = model._cached_bqm()
 
         start_sec = time.perf_counter()
         if self._exact:
@@ -61,7 +60,7 @@ class LocalSolver(AbstractSolver):
     def default_beta_range(self, model):
         self._check_argument_type("model", model, PhysicalModel)
 
-        if len(model._raw_interactions[constants.INTERACTION_LINEAR]) == 0 and len(model._raw_interactions[constants.INTERACTION_QUADRATIC]) == 0:
+        if model.get_num_interactions() == 0:
             raise ValueError("Model cannot be empty.")
 
-        return neal.default_beta_range(model.to_bqm())
+        return neal.default_beta_range(model._cached_bqm())
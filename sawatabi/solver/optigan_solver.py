@@ -13,11 +13,12 @@
 # limitations under the License.
 
 import gzip
-import io
 import json
 import os.path
+import zlib
 
 import dimod
+import numpy as np
 import requests
 import yaml
 
@@ -44,17 +45,19 @@ class OptiganSolver(AbstractSolver):
             config = yaml.load(f, Loader=yaml.SafeLoader)
         return config
 
-    def solve(self, model, num_unit_steps=10, timeout=10000, duplicate=False, gzip_request=True, gzip_response=True):
+    def solve(self, model, num_unit_steps=10, timeout=10000, duplicate=False, gzip_request=False, gzip_response=True, stream_request=False):
         self._check_argument_type("model", model, PhysicalModel)
 
-        if len(model._raw_interactions[constants.INTERACTION_LINEAR]) == 0 and len(model._raw_interactions[constants.INTERACTION_QUADRATIC]) == 0:
+        if model.get_num_interactions() == 0:
             raise ValueError("Model cannot be empty.")
 
         if model.get_mtype() == constants.MODEL_ISING:
             raise ValueError("Ising model is not supported yet. Please try to convert the logical model to QUBO beforehand.")
 
         # Converts to polynomial (model representation for Optigan)
-        polynomial = model.to_polynomial()
+        polynomial = model.to_polynomial_array()
+        if not np.isfinite(polynomial[:, 2]).all():
+            raise ValueError("Coefficients of the model must be finite, nan and inf cannot be encoded into JSON.")
 
         if self._endpoint and self._token:
             endpoint = self._endpoint
@@ -71,7 +74,6 @@ class OptiganSolver(AbstractSolver):
         payload = {
             "num_unit_steps": num_unit_steps,
             "timeout": timeout,  # in milli seconds
-            "polynomial": polynomial,
         }
         if duplicate:
             payload["outputs"] = {
@@ -83,16 +85,24 @@ class OptiganSolver(AbstractSolver):
             headers["Accept-Encoding"] = "gzip"
             # Note: Decompress will be performed by the library.
 
-        if gzip_request:
+        headers["Content-Type"] = "application/json; charset=UTF-8"
+        if stream_request:
+            # Encode the payload into JSON chunk by chunk, so that the whole polynomial is never held as Python lists or a string
+            body = self._encode_payload(payload, polynomial)
+            if gzip_request:
+                # Compress request body
+                body = self._compress(body)
+                headers["Content-Encoding"] = "gzip"
+            # Pass the generator itself, so that the body is sent with chunked transfer encoding
+            response = requests.post(endpoint, headers=headers, data=body)
+        elif gzip_request:
             # Compress request body
-            buf = io.BytesIO()
-            with gzip.GzipFile(fileobj=buf, mode="wb") as f:
-                f.write(json.dumps(payload).encode("utf-8"))
+            body = gzip.compress(b"".join(self._encode_payload(payload, polynomial)))
             headers["Content-Encoding"] = "gzip"
-            response = requests.post(endpoint, headers=headers, data=buf.getvalue())
+            response = requests.post(endpoint, headers=headers, data=body)
         else:
             # Don't compress request body
-            headers["Content-Type"] = "application/json; charset=UTF-8"
+            payload["polynomial"] = model.to_polynomial()
             response = requests.post(endpoint, headers=headers, json=payload)
 
         if response.status_code != 200:
@@ -102,11 +112,40 @@ class OptiganSolver(AbstractSolver):
         result = response.json()
 
         # Create a sampleset object for return
-        samples = []
-        for spins in result["spins"]:
-            sample = dict(zip(list(model._index_to_label.values()), spins))
-            samples.append(sample)
-        sampleset = dimod.SampleSet.from_samples(samples, vartype=dimod.BINARY, energy=result["energies"], aggregate_samples=True, sort_labels=True)
-        sampleset._info = result
+        sampleset = self._build_sampleset(model, np.array(result["spins"], dtype=np.int8), result["energies"], dimod.BINARY, info=result)
 
         return sampleset
+
+    @staticmethod
+    def _encode_payload(payload, polynomial, chunk_size=65536):
+        """
+        Encodes the payload with the polynomial into JSON bytes chunk by chunk.
+        The output is the same as json.dumps of the payload with "polynomial" appended as a list of [i, j, Q_{ij}].
+        """
+        head = json.dumps(payload)
+        if len(payload) > 0:
+            head = head[:-1] + ', "polynomial": ['
+        else:
+            head = '{"polynomial": ['
+        yield head.encode("utf-8")
+
+        index = polynomial[:, :2].astype(np.int64)
+        for start in range(0, len(polynomial), chunk_size):
+            end = start + chunk_size
+            terms = map("[{}, {}, {!r}]".format, index[start:end, 0].tolist(), index[start:end, 1].tolist(), polynomial[start:end, 2].tolist())
+            chunk = ", ".join(terms)
+            if start > 0:
+                chunk = ", " + chunk
+            yield chunk.encode("utf-8")
+
+        yield b"]}"
+
+    @staticmethod
+    def _compress(chunks):
+        """
+        Compresses the chunks into gzip format in a streaming manner.
+        """
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            yield compressor.compress(chunk)
+        yield compressor.flush()
@@ -13,8 +13,10 @@
 # limitations under the License.
 
 # import logging
+import concurrent.futures
 import math
 import time
+from multiprocessing import shared_memory
 
 import dimod
 import numpy as np
@@ -27,11 +29,19 @@ from sawatabi.solver.abstract_solver import AbstractSolver
 
 
 class SawatabiSolver(AbstractSolver):
+    # The max number of entries of a lookup table of acceptance probabilities
+    EXP_TABLE_MAX_SIZE = 4096
+
     def __init__(self):
         self._model = None
-        self._original_bqm = None
-        self._bqm = None
+        self._vartype = None
         self._rng = None
+        self._color_classes = None
+        # The coloring of the interaction graph with the arrays it is computed from, kept across solves
+        self._color_cache = None
+        self._exp_levels = None
+        # The stop reason of the last read annealed by annealing()
+        self._stop_reason = None
         super().__init__()
 
     def solve(
@@ -46,19 +56,29 @@ class SawatabiSolver(AbstractSolver):
         pickup_mode=constants.PICKUP_MODE_RANDOM,
         seed=None,
         need_stats=False,
+        batch_reads=False,
+        num_workers=None,
+        parallel_tempering_options=None,
+        early_stopping_options=None,
+        time_limit=None,
     ):
         self._check_argument_type("model", model, PhysicalModel)
 
-        if len(model._raw_interactions[constants.INTERACTION_LINEAR]) == 0 and len(model._raw_interactions[constants.INTERACTION_QUADRATIC]) == 0:
+        if model.get_num_interactions() == 0:
             raise ValueError("Model cannot be empty.")
 
         if initial_states and (len(initial_states) != num_reads):
             raise ValueError("Length of initial_states must be the same as num_reads.")
 
-        allowed_pickup_mode = [constants.PICKUP_MODE_RANDOM, constants.PICKUP_MODE_SEQUENTIAL]
+        allowed_pickup_mode = [constants.PICKUP_MODE_RANDOM, constants.PICKUP_MODE_SEQUENTIAL, constants.PICKUP_MODE_COLORED]
         if pickup_mode not in allowed_pickup_mode:
             raise ValueError(f"pickup_mode must be one of {allowed_pickup_mode}")
 
+        if num_workers is not None:
+            self._check_argument_type("num_workers", num_workers, int)
+            if num_workers < 1:
+                raise ValueError("num_workers must be a positive integer.")
+
         if reverse_options:
             self._check_argument_type("reverse_options", reverse_options, dict)
             if "reverse_period" not in reverse_options:
@@ -66,19 +86,38 @@ class SawatabiSolver(AbstractSolver):
             if "reverse_temperature" not in reverse_options:
                 raise ValueError("reverse_options must contain 'reverse_temperature'")
 
+        if parallel_tempering_options:
+            self._check_argument_type("parallel_tempering_options", parallel_tempering_options, dict)
+            if reverse_options:
+                raise ValueError("parallel_tempering_options cannot be used with reverse_options.")
+            parallel_tempering_options = self._temperature_ladder(parallel_tempering_options)
+
+        if early_stopping_options:
+            self._check_argument_type("early_stopping_options", early_stopping_options, dict)
+            allowed_early_stopping_keys = ["zero_acceptance_sweeps", "stagnation_sweeps", "target_energy"]
+            for k, v in early_stopping_options.items():
+                if k not in allowed_early_stopping_keys:
+                    raise ValueError(f"early_stopping_options must consist of {allowed_early_stopping_keys}")
+                if (k != "target_energy") and ((not isinstance(v, int)) or (v < 1)):
+                    raise ValueError(f"'{k}' of early_stopping_options must be a positive integer.")
+
+        if time_limit is not None:
+            self._check_argument_type("time_limit", time_limit, (int, float))
+            if time_limit <= 0:
+                raise ValueError("time_limit must be positive.")
+
         # Use a rangom generator so that this random sequence is isolated
         if seed:
             self._rng = np.random.default_rng(seed)
         else:
             self._rng = np.random.default_rng()
 
-        bqm = model.to_bqm(sign=1.0)
-        self._original_bqm = bqm
+        self._model = model
+        self._vartype = dimod.SPIN if model.get_mtype() == constants.MODEL_ISING else dimod.BINARY
 
         # To Ising model for SawatabiSolver annealing process
-        if bqm.vartype is not dimod.SPIN:
-            bqm = bqm.change_vartype(dimod.SPIN, inplace=False)
-
+        self._build_ising_arrays(model)
+        if self._vartype is not dimod.SPIN:
             # Convert initial states as well
             if initial_states:
                 for i, initial_state in enumerate(initial_states):
@@ -86,81 +125,427 @@ class SawatabiSolver(AbstractSolver):
                         if v == 0:
                             initial_states[i][k] = -1
 
-        self._model = model
-        self._bqm = bqm
-
-        # For speed up, store coefficients into a list (array)
-        self._bqm_linear = [0.0 for _ in range(self._bqm.num_variables)]
-        for label, coeff in self._bqm.linear.items():
-            index = self._model._label_to_index[label]
-            self._bqm_linear[index] = coeff
-        self._bqm_adj = [{} for _ in range(self._bqm.num_variables)]
-        for label, adj in self._bqm.adj.items():
-            index = self._model._label_to_index[label]
-            adj_dict = {}
-            for alabel, coeff in adj.items():
-                aindex = self._model._label_to_index[alabel]
-                adj_dict[aindex] = coeff
-            self._bqm_adj[index] = adj_dict
+        initial_spins = None
+        if initial_states:
+            initial_spins = np.ones(shape=(num_reads, len(self._h)), dtype=int)
+            for r, initial_state in enumerate(initial_states):
+                for v, idx in model._label_to_index.items():
+                    initial_spins[r, idx] = initial_state[v]
 
         start_sec = time.perf_counter()
 
-        samples = []
+        # The deadline is in wall-clock time so that worker processes can share it
+        deadline = None
+        if time_limit is not None:
+            deadline = time.time() + time_limit
+
+        options = {
+            "num_sweeps": num_sweeps,
+            "cooling_rate": cooling_rate,
+            "initial_temperature": initial_temperature,
+            "reverse_options": reverse_options,
+            "pickup_mode": pickup_mode,
+            "parallel_tempering_options": parallel_tempering_options,
+            "early_stopping_options": early_stopping_options,
+            "deadline": deadline,
+        }
+        if num_workers and (num_workers > 1) and (num_reads > 1):
+            spins, energies, stats = self._anneal_reads_in_parallel(num_workers, seed, num_reads, initial_spins, batch_reads, options)
+        else:
+            spins, energies, stats = self._anneal_reads(num_reads, initial_spins, batch_reads, options)
+
+        # Update the timing
+        execution_sec = time.perf_counter() - start_sec
+
+        # These samples are in the Ising (SPIN) format, and energies do not depend on the format
+        if self._vartype is not dimod.SPIN:
+            spins = (spins + 1) // 2
+        info = {
+            "timing": {
+                "execution_sec": execution_sec,
+            },
+            # In order of the reads
+            "stop_reasons": [s["stop_reason"] for s in stats],
+            "num_sweeps_used": [len(s["energy_history"]) for s in stats],
+        }
+        sampleset = self._build_sampleset(model, spins, energies, self._vartype, info=info)
+        if not need_stats:
+            return sampleset
+        return sampleset, stats
+
+    @staticmethod
+    def _temperature_ladder(parallel_tempering_options):
+        """
+        Validates options of parallel tempering, and returns them with the ladder of temperatures in ascending order.
+        The ladder is given as 'temperatures', or as 'num_replicas' temperatures spaced geometrically between 'min_temperature' and 'max_temperature'.
+        """
+        if "temperatures" in parallel_tempering_options:
+            temperatures = sorted(parallel_tempering_options["temperatures"])
+        elif all(k in parallel_tempering_options for k in ["num_replicas", "min_temperature", "max_temperature"]):
+            temperatures = np.geomspace(
+                parallel_tempering_options["min_temperature"], parallel_tempering_options["max_temperature"], parallel_tempering_options["num_replicas"]
+            ).tolist()
+        else:
+            raise ValueError("parallel_tempering_options must contain 'temperatures', or 'num_replicas', 'min_temperature', and 'max_temperature'")
+        if (len(temperatures) < 2) or (temperatures[0] <= 0):
+            raise ValueError("Temperatures of parallel tempering must be at least two positive values.")
+
+        swap_interval = parallel_tempering_options.get("swap_interval", 1)
+        if (not isinstance(swap_interval, int)) or (swap_interval < 1):
+            raise ValueError("'swap_interval' of parallel_tempering_options must be a positive integer.")
+
+        return {"temperatures": temperatures, "swap_interval": swap_interval}
+
+    def _build_ising_arrays(self, model):
+        """
+        Builds the Ising (SPIN) form of the model in arrays: linear coefficients h, CSR of the symmetric adjacency J, and offset.
+        The signs follow BQM (sign=1.0), the same as model.to_bqm(sign=1.0).change_vartype(dimod.SPIN).
+        """
+        h = model.get_h()
+        indptr, indices, data = model.get_adjacency()
+        offset = model.get_offset()
+        self._original_offset = offset
+
+        if self._vartype is not dimod.SPIN:
+            # Convert with dimod so that the linear coefficients and offset are exactly the same as the BQM's,
+            # quadratic coefficients are just quartered: x = (s + 1) / 2
+            bqm = model._cached_bqm(sign=1.0).change_vartype(dimod.SPIN, inplace=False)
+            labels = [model._index_to_label[i] for i in range(len(h))]
+            h, _, offset = bqm.to_numpy_vectors(variable_order=labels)
+            data = data / 4.0
+
+        self._h = h
+        self._J_indptr, self._J_indices, self._J_data = indptr, indices, data
+        self._J_rows = np.repeat(np.arange(len(h)), np.diff(indptr))
+        self._offset = offset
+        self._exp_levels = self._exp_table_levels()
+
+    def _exp_table_levels(self):
+        """
+        Returns all possible positive energy differences of a flip in ascending order when they are on a grid, or None otherwise.
+        This is the case when the coefficients are small integers (or quarters of them, for QUBO models converted to Ising).
+        Acceptance probabilities can then be looked up from a table per temperature instead of calling exp for each move.
+        """
+        num_variables = len(self._h)
+        for scale in [1, 2, 4]:
+            if np.array_equal(self._h * scale, np.round(self._h * scale)) and np.array_equal(self._J_data * scale, np.round(self._J_data * scale)):
+                break
+        else:
+            return None
+
+        # Energy differences are multiples of the unit, and bounded by the largest local field
+        unit = 2.0 / scale
+        max_field = np.abs(self._h) + np.bincount(self._J_rows, weights=np.abs(self._J_data), minlength=num_variables)
+        size = int(np.round(2.0 * max_field.max() / unit)) + 1 if num_variables > 0 else 0
+        if (size > self.EXP_TABLE_MAX_SIZE) or (size > num_variables):
+            # Building a table per temperature would cost more than it saves
+            return None
+        return unit * np.arange(size)
+
+    def _exp_table(self, temperature):
+        """
+        Returns a table of acceptance probabilities exp(-diff / temperature) for each of self._exp_levels,
+        as a (number of temperatures x number of levels) matrix, or None if the model is not on a grid.
+        """
+        if self._exp_levels is None:
+            return None
+        return np.exp(-self._exp_levels / np.reshape(temperature, (-1, 1)))
+
+    def _acceptance_probabilities(self, diff, temperature, exp_table):
+        """
+        Returns acceptance probabilities of moves whose energy differences are diff, (num_rows) or (num_rows x num_spins).
+        temperature is a scalar, or an array of the temperature of each row in the same number of dimensions as diff.
+        """
+        uphill = np.maximum(diff, 0.0)
+        if exp_table is None:
+            return np.exp(-uphill / temperature)
+
+        # Energy differences are exact multiples of the unit, so they are converted to indices without rounding
+        levels = (uphill * (1.0 / self._exp_levels[1])).astype(np.intp) if len(self._exp_levels) > 1 else np.zeros(uphill.shape, dtype=np.intp)
+        if len(exp_table) == 1:
+            return exp_table[0][levels]
+        rows = np.arange(len(diff)) if diff.ndim == 1 else np.arange(len(diff))[:, np.newaxis]
+        return exp_table[rows, levels]
+
+    def _update_color_classes(self):
+        """
+        Updates the color classes for the current arrays.
+        The graph is colored again only when its structure is changed, and the classes are rebuilt only when the coefficients are changed.
+        """
+        indptr, indices, data = self._J_indptr, self._J_indices, self._J_data
+        cache = self._color_cache
+        if (cache is None) or (not self._same_array(cache["indptr"], indptr)) or (not self._same_array(cache["indices"], indices)):
+            cache = {"indptr": indptr, "indices": indices, "data": None, "colors": self._color_variables()}
+            self._color_cache = cache
+        if not self._same_array(cache["data"], data):
+            cache["data"] = data
+            self._color_classes = self._build_color_classes(cache["colors"])
+
+    @staticmethod
+    def _same_array(a, b):
+        return (a is b) or ((a is not None) and (b is not None) and np.array_equal(a, b))
+
+    def _color_variables(self):
+        """
+        Greedily colors the interaction graph (largest degree first), so that no two spins in a color class share a coupling.
+        Returns the color of each variable.
+        """
+        num_variables = len(self._h)
+        indptr = self._J_indptr
+        degrees = np.diff(indptr)
+
+        colors = np.full(num_variables, -1, dtype=np.int64)
+        indptr_list = indptr.tolist()
+        for v in np.argsort(-degrees, kind="stable").tolist():
+            start, end = indptr_list[v], indptr_list[v + 1]
+            neighbor_colors = colors[self._J_indices[start:end]]
+            # One more color than neighbors is always enough
+            used = np.zeros(len(neighbor_colors) + 1, dtype=bool)
+            used[neighbor_colors[(0 <= neighbor_colors) & (neighbor_colors < len(used))]] = True
+            colors[v] = int(np.argmin(used))
+        return colors
+
+    def _build_color_classes(self, colors):
+        """
+        Returns a list of color classes, each of which is a tuple of
+        the variable indices, and the columns, coefficients, and owners (positions in the variable indices) of their couplings.
+        """
+        indptr = self._J_indptr
+        degrees = np.diff(indptr)
+        color_classes = []
+        for color in range(int(colors.max()) + 1):
+            vertices = np.flatnonzero(colors == color)
+            counts = degrees[vertices]
+            owners = np.repeat(np.arange(len(vertices)), counts)
+            edges = indptr[vertices][owners] + np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+            color_classes.append((vertices, self._J_indices[edges], self._J_data[edges], owners))
+        return color_classes
+
+    def _colored_sweep(self, x, field, temperature):
+        """
+        Updates all spins in each color class at once as a Metropolis step, which is valid since they share no coupling.
+        x and field are (num_reads x num_variables) matrices, and are updated in place.
+        temperature is a scalar, or an array of the temperature of each read.
+        Returns the energy differences and the numbers of acceptances of the reads.
+        """
+        num_reads, num_variables = x.shape
+        exp_table = self._exp_table(temperature)
+        temperature = np.reshape(temperature, (-1, 1))
+        energy_diffs = np.zeros(num_reads)
+        acceptances = np.zeros(num_reads, dtype=int)
+        read_offsets = np.arange(num_reads)[:, np.newaxis] * num_variables
+
+        for vertices, columns, data, owners in self._color_classes:
+            spins = x[:, vertices]
+            diff = 2.0 * spins * field[:, vertices]
+            accepted = (diff <= 0.0) | (self._rng.random(size=spins.shape) < self._acceptance_probabilities(diff, temperature, exp_table))
+
+            # Flip the accepted spins, and update local fields of the neighbors
+            flips = np.where(accepted, 2.0 * spins, 0.0)
+            x[:, vertices] = np.where(accepted, -spins, spins)
+            if len(columns) > 0:
+                contributions = (flips[:, owners] * data).ravel()
+                field -= np.bincount((read_offsets + columns).ravel(), weights=contributions, minlength=num_reads * num_variables).reshape(
+                    num_reads, num_variables
+                )
+            energy_diffs += np.where(accepted, diff, 0.0).sum(axis=1)
+            acceptances += accepted.sum(axis=1)
+
+        return energy_diffs, acceptances
+
+    def _anneal_reads(self, num_reads, initial_spins, batch_reads, options):
+        """
+        Anneals the reads in this process, and returns the spin matrix, and lists of energies and stats of the reads.
+        """
+        if options["pickup_mode"] == constants.PICKUP_MODE_COLORED:
+            self._update_color_classes()
+
+        if options["parallel_tempering_options"]:
+            return self.parallel_tempering(
+                num_reads=num_reads,
+                num_sweeps=options["num_sweeps"],
+                initial_states=initial_spins,
+                pickup_mode=options["pickup_mode"],
+                parallel_tempering_options=options["parallel_tempering_options"],
+                early_stopping_options=options["early_stopping_options"],
+                deadline=options["deadline"],
+            )
+
+        options = {k: v for k, v in options.items() if k != "parallel_tempering_options"}
+        if batch_reads:
+            # Anneal all reads at once
+            return self.annealing_batch(num_reads=num_reads, initial_states=initial_spins, **options)
+
+        spins = []
         energies = []
         stats = []
         for r in range(num_reads):
             initial_state_for_this_read = None
-            if initial_states:
-                initial_state_for_this_read = initial_states[r]
-            sample, energy, energy_hist, temperature_hist, acceptance_hist = self.annealing(
-                num_reads=num_reads,
-                num_sweeps=num_sweeps,
-                cooling_rate=cooling_rate,
-                initial_temperature=initial_temperature,
-                initial_state=initial_state_for_this_read,
-                reverse_options=reverse_options,
-                pickup_mode=pickup_mode,
+            if initial_spins is not None:
+                initial_state_for_this_read = initial_spins[r]
+            x, energy, energy_hist, temperature_hist, acceptance_hist, stop_reason = self._annealing(
+                num_reads=num_reads, initial_state=initial_state_for_this_read, **options
             )
-            # These samples and energies are in the Ising (SPIN) format
-            samples.append(sample)
+            spins.append(x)
             energies.append(energy)
             stats.append(
                 {
                     "energy_history": energy_hist,
                     "temperature_history": temperature_hist,
                     "acceptance_history": acceptance_hist,
+                    "stop_reason": stop_reason,
                 }
             )
+        return np.array(spins, dtype=int).reshape(num_reads, len(self._h)), energies, stats
 
-        # Update the timing
-        execution_sec = time.perf_counter() - start_sec
+    def _anneal_reads_in_parallel(self, num_workers, seed, num_reads, initial_spins, batch_reads, options):
+        """
+        Spreads the reads across worker processes, and merges the results in order of the reads.
+        The arrays of the model are shared with the workers through shared memory,
+        and each worker gets its own seed spawned from the given seed.
+        """
+        chunks = [chunk for chunk in np.array_split(np.arange(num_reads), min(num_workers, num_reads)) if len(chunk) > 0]
+        seeds = np.random.SeedSequence(seed if seed else None).spawn(len(chunks))
+
+        arrays = {"h": self._h, "J_indptr": self._J_indptr, "J_indices": self._J_indices, "J_data": self._J_data}
+        if options["pickup_mode"] == constants.PICKUP_MODE_COLORED:
+            # Color the graph once here, and share the colors with the workers
+            self._update_color_classes()
+            arrays["colors"] = self._color_cache["colors"]
+        blocks = {}
+        try:
+            specs = {}
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                blocks[name] = block
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                specs[name] = (block.name, array.shape, array.dtype.str)
+
+            with concurrent.futures.ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                futures = [
+                    executor.submit(
+                        _anneal_reads_in_worker,
+                        specs,
+                        self._offset,
+                        self._original_offset,
+                        child_seed,
+                        len(chunk),
+                        None if initial_spins is None else initial_spins[chunk],
+                        batch_reads,
+                        options,
+                    )
+                    for chunk, child_seed in zip(chunks, seeds)
+                ]
+                results = [future.result() for future in futures]
+        finally:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+
+        spins = np.concatenate([result[0] for result in results])
+        energies = [energy for result in results for energy in result[1]]
+        stats = [stat for result in results for stat in result[2]]
+        return spins, energies, stats
+
+    def _split_random_stream(self, size):
+        """
+        Returns a generator which yields the next `size` random values of self._rng, and skips self._rng ahead of them.
+        Values can then be drawn in chunks, while the random sequence stays the same as drawing them all at once.
+        """
+        state = self._rng.bit_generator.state
+        bit_generator = type(self._rng.bit_generator)()
+        bit_generator.state = state
+        self._rng.bit_generator.advance(size)
+
+        # Advancing drops a buffered 32-bit value, which should be kept as is
+        advanced_state = self._rng.bit_generator.state
+        advanced_state["has_uint32"], advanced_state["uinteger"] = state["has_uint32"], state["uinteger"]
+        self._rng.bit_generator.state = advanced_state
+        return np.random.Generator(bit_generator)
+
+    def annealing(
+        self,
+        num_reads,
+        num_sweeps,
+        cooling_rate,
+        initial_temperature,
+        initial_state,
+        reverse_options,
+        pickup_mode,
+        early_stopping_options=None,
+        deadline=None,
+    ):
+        """
+        Anneals a read, and returns the sample (a dict of labels and spins), the energy, and histories of the read.
+        initial_state is a dict of labels and spins, an array of spins (indexed by variable indices), or None for random spins.
+        The stop reason of the read is stored in self._stop_reason.
+        """
+        if isinstance(initial_state, dict):
+            x = np.ones(shape=(len(self._h)), dtype=int)
+            for v, idx in self._model._label_to_index.items():
+                x[idx] = initial_state[v]
+            initial_state = x
+
+        x, energy, energy_hist, temperature_hist, acceptance_hist, self._stop_reason = self._annealing(
+            num_reads=num_reads,
+            num_sweeps=num_sweeps,
+            cooling_rate=cooling_rate,
+            initial_temperature=initial_temperature,
+            initial_state=initial_state,
+            reverse_options=reverse_options,
+            pickup_mode=pickup_mode,
+            early_stopping_options=early_stopping_options,
+            deadline=deadline,
+        )
+        sample = dict(zip(list(self._model._index_to_label.values()), x))
+        return sample, energy, energy_hist, temperature_hist, acceptance_hist
 
-        sampleset = dimod.SampleSet.from_samples(samples, vartype=dimod.SPIN, energy=energies, aggregate_samples=True, sort_labels=True)
-        sampleset._info = {
-            "timing": {
-                "execution_sec": execution_sec,
-            },
-        }
+    def calc_energy_diff(self, idx, x):
+        """
+        Returns the energy difference gained after flipping the spin x[idx], calculated from its local field.
+        """
+        start, end = self._J_indptr[idx], self._J_indptr[idx + 1]
+        field = self._h[idx] + float(self._J_data[start:end] @ np.asarray(x)[self._J_indices[start:end]])
 
-        sampleset = sampleset.change_vartype(self._original_bqm.vartype, inplace=True)
-        if not need_stats:
-            return sampleset
-        return sampleset, stats
+        # If the spin flips from -1 to +1 (vice versa), the diff energy will be double of the local energy.
+        return 2.0 * x[idx] * field
+
+    def is_acceptable(self, diff, temperature):
+        """
+        Returns True if the flip is acceptable, False otherwise.
+        """
+        if diff <= 0.0:
+            return True
+        p = float(self._acceptance_probabilities(np.array([diff]), temperature, exp_table=None)[0])
+        return bool(self._rng.random() < p)
 
-    def annealing(self, num_reads, num_sweeps, cooling_rate, initial_temperature, initial_state, reverse_options, pickup_mode):
-        num_variables = self._bqm.num_variables
+    def _annealing(
+        self,
+        num_reads,
+        num_sweeps,
+        cooling_rate,
+        initial_temperature,
+        initial_state,
+        reverse_options,
+        pickup_mode,
+        early_stopping_options=None,
+        deadline=None,
+    ):
+        """
+        Anneals a read, and returns the spins (indexed by variable indices), the energy, histories, and the stop reason of the read.
+        initial_state is an array of spins, or None for random spins.
+        """
+        num_variables = len(self._h)
         if initial_state is None:
             x = ((self._rng.integers(2, size=num_variables) - 0.5) * 2).astype(int)  # -1 or +1
         else:
-            x = np.ones(shape=(num_variables), dtype=int)
-            for v in self._bqm.variables:
-                idx = self._model._label_to_index[v]
-                x[idx] = initial_state[v]
+            x = np.array(initial_state, dtype=int)
 
-        initial_sample = dict(zip(list(self._model._index_to_label.values()), x))
-        # logger.info(f"initial_spins: {initial_sample}")
-        initial_energy = self._bqm.energy(initial_sample) * -1.0  # Note that the signs of original bqm is opposite from ours
-        # logger.info(f"initial_energy: {initial_energy}")
+        # Local field of each spin: h_{i} + sum( J_{ij} * x_j ), which is updated on every flip
+        field = self._h + np.bincount(self._J_rows, weights=self._J_data * x[self._J_indices], minlength=num_variables)
+        # Note that the signs of original bqm is opposite from ours
+        initial_energy = -1.0 * float(x @ self._h + (x @ (field - self._h)) / 2.0 + self._offset)
 
         if not reverse_options:
             # Forward (normal) annealing
@@ -178,42 +563,143 @@ class SawatabiSolver(AbstractSolver):
         temperature_hist = []
         acceptance_hist = []
 
-        # Create a random values for accept beforehand for speed up
-        self._accept_randoms = self._rng.random(size=num_sweeps * num_variables)
-        self._accept_randoms_idx = -1
+        # Draw random values for accept in chunks, so that the memory is bounded by the number of variables
+        if pickup_mode != constants.PICKUP_MODE_COLORED:
+            accept_rng = self._split_random_stream(num_sweeps * num_variables)
+            accept_randoms = []
+            accept_randoms_idx = -1
+
+        exp_levels = None if self._exp_levels is None else self._exp_levels.tolist()
+
+        stopping_criteria = _StoppingCriteria(early_stopping_options, deadline, num_reads=1, num_sweeps=num_sweeps)
+        stop_reason = constants.STOP_REASON_NUM_SWEEPS
+
+        indptr = self._J_indptr.tolist()
+        indices = self._J_indices
+        data = self._J_data
 
         for sweep in range(num_sweeps):  # outer loop (=sweeps)
             # Normal annealing in the last half of period if reverse annealing is performed
             if reversing_phase and (reverse_options["reverse_period"] <= sweep):
                 reversing_phase = False
 
-            # logger.info(f"sweep: {sweep + 1}/{num_sweeps}  (temperature: {temperature}, reversing_phase: {reversing_phase})")
-
             energy_hist.append(energy)
             temperature_hist.append(temperature)
 
+            acceptances = 0
+            # Update spins (variables) in each color class at once
+            if pickup_mode == constants.PICKUP_MODE_COLORED:
+                energy_diffs, accepted = self._colored_sweep(x[np.newaxis, :], field[np.newaxis, :], temperature)
+                energy += float(energy_diffs[0])
+                acceptances += int(accepted[0])
+                pickups = []
             # Pick up a spin (variable) randomly
-            if pickup_mode == constants.PICKUP_MODE_RANDOM:
-                pickups = self._rng.permutation(num_variables)
+            elif pickup_mode == constants.PICKUP_MODE_RANDOM:
+                pickups = self._rng.permutation(num_variables).tolist()
             # Pick up a spin (variable) sequentially
             elif pickup_mode == constants.PICKUP_MODE_SEQUENTIAL:
-                pickups = np.arange(num_variables)
+                pickups = range(num_variables)
+
+            # Look up acceptance probabilities by energy differences if the model is on a grid
+            exp_table = None
+            if (exp_levels is not None) and (pickup_mode != constants.PICKUP_MODE_COLORED):
+                exp_table = dict(zip(exp_levels, np.exp(-self._exp_levels / temperature).tolist()))
+
+            for idx in pickups:  # inner loop
+                # `diff` represents an energy value gained after flipping.
+                # If the spin flips from -1 to +1 (vice versa), the diff energy will be double of the local energy.
+                spin = int(x[idx])
+                diff = 2.0 * spin * float(field[idx])
+
+                if diff > 0.0:
+                    accept_randoms_idx += 1
+                    if accept_randoms_idx == len(accept_randoms):
+                        accept_randoms = accept_rng.random(size=num_variables).tolist()
+                        accept_randoms_idx = 0
+                    probability = exp_table[diff] if exp_table else math.exp(-diff / temperature)  # Note: np.exp is slow here
+                    if accept_randoms[accept_randoms_idx] >= probability:
+                        continue
+
+                # Flip the spin, and update local fields of the neighbors
+                x[idx] = -spin
+                start, end = indptr[idx], indptr[idx + 1]
+                if start < end:
+                    field[indices[start:end]] -= (2.0 * spin) * data[start:end]
+                energy += diff
+                acceptances += 1
 
-            acceptances = 0
-            for inner, idx in enumerate(pickups):  # inner loop
-                # logger.debug(f"inner: {inner + 1}/{num_variables}  (pickuped: {idx})")
+            acceptance_hist.append(acceptances)
 
-                # `diff` represents an energy value gained after flipping
-                diff = self.calc_energy_diff(idx, x)
+            if reversing_phase:
+                reverse_target_temperature *= cooling_rate
+                temperature = reverse_options["reverse_temperature"] - reverse_target_temperature
+            else:
+                temperature *= cooling_rate
 
-                if self.is_acceptable(diff, temperature):
-                    x[idx] *= -1
-                    energy += diff
-                    acceptances += 1
-                    # logger.debug(f"Spin {self._model._index_to_label[idx]} was flipped to {x[idx]}")
-                # logger.debug(f"energy: {energy}")
+            reason = stopping_criteria.update(energy + self._original_offset * 2, acceptances, suspended=reversing_phase)
+            if reason:
+                stop_reason = reason
+                break
 
-            acceptance_hist.append(acceptances)
+        # Deal with offset
+        energy += self._original_offset * 2
+
+        return x, energy, energy_hist, temperature_hist, acceptance_hist, stop_reason
+
+    def annealing_batch(
+        self,
+        num_reads,
+        num_sweeps,
+        cooling_rate,
+        initial_temperature,
+        initial_states,
+        reverse_options,
+        pickup_mode,
+        early_stopping_options=None,
+        deadline=None,
+    ):
+        """
+        Anneals all reads at once as a (num_reads x num_variables) spin matrix.
+        Every read visits spins in the same order, and flips are accepted independently across reads.
+        initial_states is a matrix of spins, or None for random spins.
+        Early stopping applies when all reads meet a criterion.
+        Returns the spin matrix, and lists of energies and stats of the reads.
+        """
+        num_variables = len(self._h)
+        if initial_states is None:
+            x = ((self._rng.integers(2, size=(num_reads, num_variables)) - 0.5) * 2).astype(int)  # -1 or +1
+        else:
+            x = np.array(initial_states, dtype=int)
+        field, energy = self._batch_fields(x)
+
+        if not reverse_options:
+            # Forward (normal) annealing
+            temperature = initial_temperature
+        else:
+            # Reverse annealing
+            temperature = 1e-9
+            reverse_target_temperature = reverse_options["reverse_temperature"]  # The max temperature when the phase is reverse annealing
+
+        reversing_phase = reverse_options is not None
+
+        energy_hist = np.empty((num_sweeps, num_reads))
+        temperature_hist = []
+        acceptance_hist = np.empty((num_sweeps, num_reads), dtype=int)
+
+        stopping_criteria = _StoppingCriteria(early_stopping_options, deadline, num_reads=num_reads, num_sweeps=num_sweeps)
+        stop_reason = constants.STOP_REASON_NUM_SWEEPS
+        num_sweeps_used = num_sweeps
+
+        for sweep in range(num_sweeps):  # outer loop (=sweeps)
+            # Normal annealing in the last half of period if reverse annealing is performed
+            if reversing_phase and (reverse_options["reverse_period"] <= sweep):
+                reversing_phase = False
+
+            energy_hist[sweep] = energy
+            temperature_hist.append(temperature)
+
+            energy_diffs, acceptance_hist[sweep] = self._batch_sweep(x, field, temperature, pickup_mode)
+            energy = energy + energy_diffs
 
             if reversing_phase:
                 reverse_target_temperature *= cooling_rate
@@ -221,37 +707,250 @@ class SawatabiSolver(AbstractSolver):
             else:
                 temperature *= cooling_rate
 
-        sample = dict(zip(list(self._model._index_to_label.values()), x))
-
-        # Check energy if needed
-        # recalc_energy = self._bqm.energy(sample) * -1.0
-        # assert math.isclose(energy, recalc_energy, rel_tol=1e-9, abs_tol=1e-9)
+            reason = stopping_criteria.update(energy + self._original_offset * 2, acceptance_hist[sweep], suspended=reversing_phase)
+            if reason:
+                stop_reason = reason
+                num_sweeps_used = sweep + 1
+                break
 
         # Deal with offset
-        energy += self._original_bqm.offset * 2
+        energies = (energy + self._original_offset * 2).tolist()
+
+        stats = [
+            {
+                "energy_history": energy_hist[:num_sweeps_used, r].tolist(),
+                "temperature_history": list(temperature_hist),
+                "acceptance_history": acceptance_hist[:num_sweeps_used, r].tolist(),
+                "stop_reason": stop_reason,
+            }
+            for r in range(num_reads)
+        ]
+        return x, energies, stats
+
+    def parallel_tempering(self, num_reads, num_sweeps, initial_states, pickup_mode, parallel_tempering_options, early_stopping_options=None, deadline=None):
+        """
+        Runs replica exchange Monte Carlo: each read has replicas at a fixed ladder of temperatures (in ascending order),
+        and all replicas of all reads are swept at once as a (num_reads * num_replicas x num_variables) spin matrix.
+        Every swap_interval sweeps, replicas at neighboring temperatures exchange their states by the Metropolis criterion,
+        alternating between even and odd pairs.
+        Early stopping applies to the replicas at the lowest temperature, when those of all reads meet a criterion.
+        Returns the spin matrix of the replicas at the lowest temperature, and lists of energies and stats of the reads.
+        """
+        temperatures = np.array(parallel_tempering_options["temperatures"], dtype=float)
+        swap_interval = parallel_tempering_options["swap_interval"]
+        num_replicas = len(temperatures)
+        num_rows = num_reads * num_replicas
+        num_variables = len(self._h)
+
+        # Replicas of each read start from the same initial state
+        if initial_states is None:
+            x = ((self._rng.integers(2, size=(num_rows, num_variables)) - 0.5) * 2).astype(int)  # -1 or +1
+        else:
+            x = np.repeat(np.array(initial_states, dtype=int), num_replicas, axis=0)
+        field, energy = self._batch_fields(x)
+        row_temperatures = np.tile(temperatures, num_reads)
+        betas = 1.0 / temperatures
 
-        return sample, energy, energy_hist, temperature_hist, acceptance_hist
+        energy_hist = np.empty((num_sweeps, num_reads))
+        acceptance_hist = np.empty((num_sweeps, num_reads), dtype=int)
+        swap_attempts = np.zeros((num_reads, num_replicas - 1), dtype=int)
+        swap_acceptances = np.zeros((num_reads, num_replicas - 1), dtype=int)
+        num_swaps = 0
 
-    def calc_energy_diff(self, idx, x):
-        # h_{i}
-        diff = x[idx] * self._bqm_linear[idx]
+        stopping_criteria = _StoppingCriteria(early_stopping_options, deadline, num_reads=num_reads, num_sweeps=num_sweeps)
+        stop_reason = constants.STOP_REASON_NUM_SWEEPS
+        num_sweeps_used = num_sweeps
+
+        for sweep in range(num_sweeps):  # outer loop (=sweeps)
+            energy_hist[sweep] = energy[::num_replicas]
+
+            energy_diffs, acceptances = self._batch_sweep(x, field, row_temperatures, pickup_mode)
+            energy = energy + energy_diffs
+            acceptance_hist[sweep] = acceptances[::num_replicas]
+
+            reason = stopping_criteria.update(energy[::num_replicas] + self._original_offset * 2, acceptance_hist[sweep])
+            if reason:
+                stop_reason = reason
+                num_sweeps_used = sweep + 1
+                break
+
+            if (sweep + 1) % swap_interval != 0:
+                continue
+
+            # Exchange replicas at neighboring temperatures (k, k+1), for even k and odd k alternately
+            pairs = np.arange(num_swaps % 2, num_replicas - 1, 2)
+            num_swaps += 1
+            if len(pairs) == 0:
+                continue
+            replica_energy = energy.reshape(num_reads, num_replicas)
+            delta = (betas[pairs] - betas[pairs + 1]) * (replica_energy[:, pairs] - replica_energy[:, pairs + 1])
+            swapped = (delta >= 0.0) | (self._rng.random(size=delta.shape) < np.exp(np.minimum(delta, 0.0)))
+            swap_attempts[:, pairs] += 1
+            swap_acceptances[:, pairs] += swapped
+            if not swapped.any():
+                continue
+
+            reads, swapped_pairs = np.nonzero(swapped)
+            lower = reads * num_replicas + pairs[swapped_pairs]
+            order = np.arange(num_rows)
+            order[lower], order[lower + 1] = lower + 1, lower
+            x, field, energy = x[order], field[order], energy[order]
 
-        # J_{ij}
-        for aidx, j in self._bqm_adj[idx].items():
-            diff += x[idx] * x[aidx] * j
+        # Deal with offset
+        energies = (energy[::num_replicas] + self._original_offset * 2).tolist()
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            swap_acceptance_rates = np.where(swap_attempts > 0, swap_acceptances / swap_attempts, 0.0)
+        stats = [
+            {
+                "energy_history": energy_hist[:num_sweeps_used, r].tolist(),
+                "temperature_history": [float(temperatures[0])] * num_sweeps_used,
+                "acceptance_history": acceptance_hist[:num_sweeps_used, r].tolist(),
+                "temperatures": temperatures.tolist(),
+                "swap_attempts": swap_attempts[r].tolist(),
+                "swap_acceptances": swap_acceptances[r].tolist(),
+                "swap_acceptance_rates": swap_acceptance_rates[r].tolist(),
+                "stop_reason": stop_reason,
+            }
+            for r in range(num_reads)
+        ]
+        return x[::num_replicas], energies, stats
+
+    def _batch_fields(self, x):
+        """
+        Calculates the local fields of each spin, and the energy of each row of a spin matrix.
+        """
+        num_rows, num_variables = x.shape
 
-        # Now the calculated diff is the local energy at x[idx].
-        # If the spin flips from -1 to +1 (vice versa), the diff energy will be double.
-        return 2.0 * diff
+        # Local fields of each spin of each row: h_{i} + sum( J_{ij} * x_j )
+        flat_rows = (np.arange(num_rows)[:, np.newaxis] * num_variables + self._J_rows).ravel()
+        contributions = (x[:, self._J_indices] * self._J_data).ravel()
+        field = self._h + np.bincount(flat_rows, weights=contributions, minlength=num_rows * num_variables).reshape(num_rows, num_variables)
+        # Note that the signs of original bqm is opposite from ours
+        energy = -1.0 * (x @ self._h + np.einsum("ij,ij->i", x, field - self._h) / 2.0 + self._offset)
+        return field, energy
 
-    def is_acceptable(self, diff, temperature):
+    def _batch_sweep(self, x, field, temperature, pickup_mode):
         """
-        Returns True if the flip is acceptable, False otherwise.
+        Sweeps all spins of each row of a spin matrix once.
+        temperature is a scalar, or an array of the temperature of each row.
+        x and field are updated in place. Returns the energy differences and the numbers of acceptances of the rows.
         """
-        if diff <= 0.0:
-            return True
-        p = math.exp(-diff / temperature)  # Note: np.exp is slow here
-        self._accept_randoms_idx += 1
-        if self._accept_randoms[self._accept_randoms_idx] < p:
-            return True
-        return False
+        if pickup_mode == constants.PICKUP_MODE_COLORED:
+            # Update spins (variables) in each color class at once
+            return self._colored_sweep(x, field, temperature)
+
+        num_rows, num_variables = x.shape
+
+        # Pick up a spin (variable) randomly, in the same order for all rows
+        if pickup_mode == constants.PICKUP_MODE_RANDOM:
+            pickups = self._rng.permutation(num_variables)
+        # Pick up a spin (variable) sequentially
+        elif pickup_mode == constants.PICKUP_MODE_SEQUENTIAL:
+            pickups = np.arange(num_variables)
+
+        indptr = self._J_indptr.tolist()
+        indices = self._J_indices
+        data = self._J_data
+
+        accept_randoms = self._rng.random(size=(num_variables, num_rows))
+        exp_table = self._exp_table(temperature)
+        energy_diffs = np.zeros(num_rows)
+        acceptances = np.zeros(num_rows, dtype=int)
+        for inner, idx in enumerate(pickups.tolist()):  # inner loop
+            spins = x[:, idx]
+            diff = 2.0 * spins * field[:, idx]
+            accepted = (diff <= 0.0) | (accept_randoms[inner] < self._acceptance_probabilities(diff, temperature, exp_table))
+            if not accepted.any():
+                continue
+
+            # Flip the accepted spins, and update local fields of the neighbors
+            flips = np.where(accepted, 2.0 * spins, 0.0)
+            x[:, idx] = np.where(accepted, -spins, spins)
+            start, end = indptr[idx], indptr[idx + 1]
+            if start < end:
+                field[:, indices[start:end]] -= flips[:, np.newaxis] * data[start:end]
+            energy_diffs += np.where(accepted, diff, 0.0)
+            acceptances += accepted
+
+        return energy_diffs, acceptances
+
+
+class _StoppingCriteria:
+    """
+    Tracks energies and acceptances of reads after each sweep, and tells the reason to stop if all reads meet a criterion:
+    - target_energy: the energy reaches the target or lower
+    - zero_acceptance_sweeps: no flip is accepted for the number of consecutive sweeps
+    - stagnation_sweeps: the lowest energy is not updated for the number of consecutive sweeps
+    - time_limit: the deadline (in wall-clock time) has passed
+    Criteria on convergence (zero_acceptance_sweeps and stagnation_sweeps) are counted only in the second half of the sweeps,
+    since energies fluctuate and rarely improve while the temperature is still high.
+    """
+
+    def __init__(self, early_stopping_options, deadline, num_reads, num_sweeps):
+        early_stopping_options = early_stopping_options or {}
+        self._target_energy = early_stopping_options.get("target_energy")
+        self._zero_acceptance_sweeps = early_stopping_options.get("zero_acceptance_sweeps")
+        self._stagnation_sweeps = early_stopping_options.get("stagnation_sweeps")
+        self._deadline = deadline
+        self._warmup_sweeps = num_sweeps // 2
+        self._sweeps = 0
+
+        self._zero_acceptance_count = np.zeros(num_reads, dtype=int)
+        self._stagnation_count = np.zeros(num_reads, dtype=int)
+        self._lowest_energy = np.full(num_reads, np.inf)
+
+    def update(self, energy, acceptances, suspended=False):
+        """
+        Updates the criteria with energies (including the offset) and the numbers of acceptances of the reads in a sweep,
+        and returns the stop reason, or None to continue.
+        Criteria on convergence are suspended while the temperature is raised in reverse annealing.
+        """
+        energy = np.atleast_1d(energy)
+        acceptances = np.atleast_1d(acceptances)
+        self._sweeps += 1
+
+        self._zero_acceptance_count = np.where(acceptances == 0, self._zero_acceptance_count + 1, 0)
+        self._stagnation_count = np.where(energy < self._lowest_energy, 0, self._stagnation_count + 1)
+        self._lowest_energy = np.minimum(self._lowest_energy, energy)
+
+        if suspended or (self._sweeps <= self._warmup_sweeps):
+            self._zero_acceptance_count[:] = 0
+            self._stagnation_count[:] = 0
+
+        if (self._target_energy is not None) and np.all(energy <= self._target_energy):
+            return constants.STOP_REASON_TARGET_ENERGY
+        if self._zero_acceptance_sweeps and np.all(self._zero_acceptance_count >= self._zero_acceptance_sweeps):
+            return constants.STOP_REASON_ZERO_ACCEPTANCE
+        if self._stagnation_sweeps and np.all(self._stagnation_count >= self._stagnation_sweeps):
+            return constants.STOP_REASON_STAGNATION
+        if (self._deadline is not None) and (time.time() >= self._deadline):
+            return constants.STOP_REASON_TIME_LIMIT
+        return None
+
+
+def _anneal_reads_in_worker(specs, offset, original_offset, seed, num_reads, initial_spins, batch_reads, options):
+    """
+    Anneals the reads in a worker process with the model arrays in shared memory.
+    """
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in specs.values()]
+    try:
+        solver = SawatabiSolver()
+        arrays = {name: np.ndarray(shape, dtype=dtype, buffer=block.buf) for (name, (_, shape, dtype)), block in zip(specs.items(), blocks)}
+        solver._h = arrays["h"]
+        solver._J_indptr, solver._J_indices, solver._J_data = arrays["J_indptr"], arrays["J_indices"], arrays["J_data"]
+        solver._J_rows = np.repeat(np.arange(len(solver._h)), np.diff(solver._J_indptr))
+        solver._offset = offset
+        solver._original_offset = original_offset
+        solver._exp_levels = solver._exp_table_levels()
+        if "colors" in arrays:
+            solver._color_cache = {"indptr": solver._J_indptr, "indices": solver._J_indices, "data": None, "colors": arrays["colors"]}
+        solver._rng = np.random.default_rng(seed)
+        result = solver._anneal_reads(num_reads, initial_spins, batch_reads, options)
+
+        # Release views of the shared memory before closing it
+        del solver, arrays
+        return result
+    finally:
+        for block in blocks:
+            block.close()
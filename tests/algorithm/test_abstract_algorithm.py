@@ -0,0 +1,149 @@
+# Copyright 2021 Kotaro Terada
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import inspect
+
+import dimod
+import pytest
+
+from sample.algorithm import npp_window
+from sawatabi.algorithm import IO, AbstractAlgorithm, Window
+from sawatabi.model import LogicalModel
+from sawatabi.solver import LocalSolver, SawatabiSolver
+
+
+@pytest.fixture
+def prev_sampleset():
+    samples = [{"x[0]": 1, "x[1]": -1, "x[2]": 1}, {"x[0]": -1, "x[1]": -1, "x[2]": -1}]
+    return dimod.SampleSet.from_samples(samples, vartype=dimod.SPIN, energy=[-2.0, -1.0])
+
+
+def _physical_model(mtype, size):
+    model = LogicalModel(mtype=mtype)
+    x = model.variables("x", shape=(size,))
+    for i in range(size - 1):
+        model.add_interaction((x[i], x[i + 1]), coefficient=1.0)
+    return model.to_physical()
+
+
+def test_initial_states_from_sampleset(prev_sampleset):
+    physical = _physical_model("ising", 4)
+    initial_states = AbstractAlgorithm.initial_states_from_sampleset(prev_sampleset, physical, num_reads=3, default=-1)
+
+    # The best samples in order of energy, repeated to num_reads, and new variables are set to default
+    assert initial_states == [
+        {"x[0]": 1, "x[1]": -1, "x[2]": 1, "x[3]": -1},
+        {"x[0]": -1, "x[1]": -1, "x[2]": -1, "x[3]": -1},
+        {"x[0]": 1, "x[1]": -1, "x[2]": 1, "x[3]": -1},
+    ]
+
+
+def test_initial_states_from_sampleset_qubo(prev_sampleset):
+    physical = _physical_model("qubo", 2)
+    initial_states = AbstractAlgorithm.initial_states_from_sampleset(prev_sampleset, physical)
+
+    # Variables which are no longer in the model are dropped, and values are converted to the vartype of the model
+    assert initial_states == [{"x[0]": 1, "x[1]": 0}]
+
+
+def test_initial_states_from_sampleset_random(prev_sampleset):
+    physical = _physical_model("ising", 50)
+    initial_states = AbstractAlgorithm.initial_states_from_sampleset(prev_sampleset, physical, num_reads=2, seed=12345)
+    assert initial_states == AbstractAlgorithm.initial_states_from_sampleset(prev_sampleset, physical, num_reads=2, seed=12345)
+
+    new_values = [initial_states[0][f"x[{i}]"] for i in range(3, 50)]
+    assert set(new_values) == {-1, 1}
+
+
+def test_initial_states_from_sampleset_fails(prev_sampleset):
+    physical = _physical_model("ising", 4)
+
+    with pytest.raises(TypeError):
+        AbstractAlgorithm.initial_states_from_sampleset(prev_sampleset, "invalid type")
+
+    with pytest.raises(ValueError):
+        AbstractAlgorithm.initial_states_from_sampleset(prev_sampleset, physical, num_reads=0)
+
+    with pytest.raises(ValueError):
+        AbstractAlgorithm.initial_states_from_sampleset(prev_sampleset, physical, default=0)
+
+    with pytest.raises(ValueError):
+        AbstractAlgorithm.initial_states_from_sampleset(prev_sampleset.truncate(0), physical)
+
+
+@pytest.mark.parametrize("solver", [SawatabiSolver(), LocalSolver(exact=False)])
+def test_warm_start_solve_fn(prev_sampleset, solver):
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(4,))
+    for i in range(3):
+        model.add_interaction((x[i], x[i + 1]), coefficient=-1.0)
+    solve_fn = AbstractAlgorithm.warm_start_solve_fn(solver_options={"num_reads": 2, "num_sweeps": 20, "seed": 12345}, default=1)
+
+    # Without the previous sampleset, it is solved normally
+    sampleset = solve_fn(solver, model, None, [], [], [])
+    assert sum(sampleset.record.num_occurrences) == 2
+
+    sampleset = solve_fn(solver, model, prev_sampleset, [], [], [])
+    assert sum(sampleset.record.num_occurrences) == 2
+    # Antiferromagnetic chain: spins alternate
+    assert sampleset.first.energy == -3.0
+
+
+def test_warm_start_solve_fn_default_reverse_options(prev_sampleset, mocker):
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(4,))
+    for i in range(3):
+        model.add_interaction((x[i], x[i + 1]), coefficient=-1.0)
+    solver = SawatabiSolver()
+    spy = mocker.spy(solver, "solve")
+    solve_fn = AbstractAlgorithm.warm_start_solve_fn(solver_options={"seed": 12345}, default=1)
+    solve_fn(solver, model, prev_sampleset, [], [], [])
+
+    # Derived from the defaults of SawatabiSolver.solve
+    defaults = inspect.signature(SawatabiSolver.solve).parameters
+    expected = {"reverse_period": defaults["num_sweeps"].default // 10, "reverse_temperature": defaults["initial_temperature"].default / 10.0}
+    assert spy.call_args.kwargs["reverse_options"] == expected
+
+
+def test_warm_start_solve_fn_fails():
+    with pytest.raises(TypeError):
+        AbstractAlgorithm.warm_start_solve_fn(solver_options=[1])
+
+    with pytest.raises(TypeError):
+        AbstractAlgorithm.warm_start_solve_fn(reverse_options=[1])
+
+
+def test_warm_start_solve_fn_in_pipeline(capfd):
+    algorithm_options = {"window.size": 30, "window.period": 5, "input.reassign_timestamp": True}
+
+    pipeline = Window.create_pipeline(
+        algorithm_options=algorithm_options,
+        input_fn=IO.read_from_text_as_number(path="tests/algorithm/numbers_10.txt"),
+        map_fn=npp_window.npp_mapping,
+        solve_fn=AbstractAlgorithm.warm_start_solve_fn(
+            solver_options={"num_reads": 1, "num_sweeps": 100, "seed": 12345}, reverse_options={"reverse_period": 10, "reverse_temperature": 1000.0}
+        ),
+        unmap_fn=npp_window.npp_unmapping,
+        output_fn=IO.write_to_stdout(),
+        solver=SawatabiSolver(),
+        initial_mtype="ising",
+        pipeline_args=["--runner=DirectRunner"],
+    )
+
+    with pytest.warns(UserWarning):
+        result = pipeline.run()  # noqa: F841
+
+    out, err = capfd.readouterr()
+    assert out.count("SOLUTION ==>") > 1
+    assert "Failed" not in out
@@ -0,0 +1,51 @@
+# Copyright 2021 Kotaro Terada
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from apache_beam import coders
+
+from sawatabi.algorithm import LogicalModelCoder
+from sawatabi.model import LogicalModel
+
+
+def test_logical_model_coder():
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(3,))
+    model.add_interaction((x[0], x[1]), coefficient=1.0, attributes={"n": 1})
+
+    coder = LogicalModelCoder()
+    assert coder.decode(coder.encode(model)) == model
+
+
+def test_logical_model_coder_with_conversion_state(mocker):
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(3,))
+    model.add_interaction(x[0], coefficient=1.0)
+    model.add_interaction((x[0], x[1]), coefficient=2.0)
+    model.to_physical()
+
+    coder = LogicalModelCoder()
+    decoded = coder.decode(coder.encode(model))
+    assert decoded._can_convert_incrementally()
+
+    # The decoded model is converted incrementally, into the same physical model as the original one
+    spy = mocker.spy(decoded, "_apply_dirty_interactions")
+    for m in [model, decoded]:
+        m.update_interaction(x[0], coefficient=3.0)
+        m.add_interaction((x[1], x[2]), coefficient=4.0)
+    assert decoded.to_physical() == model.to_physical()
+    assert spy.call_count == 1
+
+
+def test_logical_model_coder_registered():
+    assert isinstance(coders.registry.get_coder(LogicalModel), LogicalModelCoder)
@@ -0,0 +1,132 @@
+# Copyright 2021 Kotaro Terada
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pickle
+
+import numpy as np
+import pyqubo
+import pytest
+
+import sawatabi.constants as constants
+from sawatabi.model.interactions_array import InteractionsArray
+
+
+@pytest.fixture
+def array():
+    array = InteractionsArray()
+    x = pyqubo.Array.create("x", shape=(3,), vartype="SPIN")
+    array.append(body=constants.INTERACTION_LINEAR, name="x[0]", key="x[0]", interacts=x[0], coefficient=1.0, scale=1.0, timestamp=100)
+    array.append(
+        body=constants.INTERACTION_QUADRATIC,
+        name="x[0]*x[1]",
+        key=("x[0]", "x[1]"),
+        interacts=(x[0], x[1]),
+        coefficient=2.0,
+        scale=0.5,
+        timestamp=200,
+        attributes={"attributes.foo": "bar"},
+    )
+    return array
+
+
+def test_interactions_array_columns(array):
+    assert array.get_length() == 2
+    assert len(array) == len(InteractionsArray.DEFAULT_KEYS) + 1
+    assert list(array.keys()) == InteractionsArray.DEFAULT_KEYS + ["attributes.foo"]
+
+    assert array["body"].dtype == np.int8
+    assert array["coefficient"].dtype == np.float64
+    assert array["removed"].dtype == bool
+    assert array["name"].tolist() == ["x[0]", "x[0]*x[1]"]
+    assert array["key"].tolist() == ["x[0]", ("x[0]", "x[1]")]
+    assert array["key_0"].tolist() == ["x[0]", "x[0]"]
+    assert array["key_1"][0] is np.nan
+    assert array["key_1"][1] == "x[1]"
+    assert array["attributes.foo"][0] is np.nan
+    assert array["attributes.foo"][1] == "bar"
+
+    # Labels are interned
+    assert array.get_labels() == ["x[0]", "x[1]"]
+    assert array.get_label_ids("key_1").tolist() == [-1, 1]
+
+
+def test_interactions_array_write_through(array):
+    array["scale"][:] = 3.0
+    array["dirty"][0] = False
+    assert array["scale"].tolist() == [3.0, 3.0]
+    assert array["dirty"].tolist() == [False, True]
+
+    with pytest.raises(KeyError):
+        array.set("key_0", 0, "x[2]")
+
+
+def test_interactions_array_promote_to_object(array):
+    a = pyqubo.Placeholder("a")
+    array.set("coefficient", 1, a)
+    assert array["coefficient"].dtype == object
+    assert array["coefficient"][0] == 1.0
+    assert array["coefficient"][1] is a
+    assert array.is_numeric("coefficient").tolist() == [True, False]
+    assert array.is_numeric("scale").tolist() == [True, True]
+
+
+def test_interactions_array_grow_and_compress(array):
+    x = pyqubo.Array.create("x", shape=(100,), vartype="SPIN")
+    for i in range(2, 100):
+        array.append(body=constants.INTERACTION_LINEAR, name=f"x[{i}]", key=f"x[{i}]", interacts=x[i], coefficient=i, scale=1.0, timestamp=0)
+    assert array.get_length() == 100
+    assert array["attributes.foo"][99] is np.nan
+
+    array["removed"][::2] = True
+    array.compress(~array["removed"])
+    assert array.get_length() == 50
+    assert array["name"][0] == "x[0]*x[1]"
+    assert array["coefficient"][-1] == 99.0
+
+    # Labels which are no longer referenced are dropped
+    assert array.get_labels() == ["x[0]", "x[1]"] + [f"x[{i}]" for i in range(3, 100, 2)]
+    assert array["key"][0] == ("x[0]", "x[1]")
+    assert array["key"][1] == "x[3]"
+
+
+def test_interactions_array_extend(array):
+    other = InteractionsArray()
+    y = pyqubo.Array.create("y", shape=(2,), vartype="SPIN")
+    other.append(
+        body=constants.INTERACTION_QUADRATIC,
+        name="y[0]*y[1]",
+        key=("y[0]", "y[1]"),
+        interacts=(y[0], y[1]),
+        coefficient=pyqubo.Placeholder("b"),
+        scale=1.0,
+        timestamp=300,
+        attributes={"attributes.baz": 1},
+    )
+    array.extend(other)
+
+    assert array.get_length() == 3
+    assert array["key"][2] == ("y[0]", "y[1]")
+    assert array["coefficient"].dtype == object
+    assert array["attributes.foo"][2] is np.nan
+    assert array["attributes.baz"][0] is np.nan
+    assert array["attributes.baz"][2] == 1
+
+
+def test_interactions_array_pickle(array):
+    restored = pickle.loads(pickle.dumps(array))
+    assert restored == array
+    assert restored._capacity == 2
+
+    restored["coefficient"][0] = 5.0
+    assert restored != array
@@ -424,6 +424,68 @@ def test_logical_model_get_attributes(ising):
         ising.get_attribute(name="x[1]", key="attributes.foofoo")
 
 
+################################
+# Serialization
+################################
+
+
+def test_logical_model_to_bytes_and_from_bytes(ising):
+    x = ising.variables("x", shape=(4,))
+    y = ising.variables("y", shape=(2, 2))
+    ising.add_interaction(x[0], coefficient=1.0, attributes={"n": 1, "ts": 0.5})
+    ising.add_interaction((x[0], x[1]), coefficient=2.0, scale=0.5, attributes={"n": 2, "ts": 1.5})
+    ising.add_interaction(y[1, 1], name="my name", coefficient=3.0)
+    ising.delete_variable(x[3])
+    ising.add_constraint(NHotConstraint(variables=y[0], n=1, label="my constraint"))
+    ising.offset(4.0)
+    ising.to_physical()
+
+    restored = LogicalModel.from_bytes(ising.to_bytes())
+    assert restored == ising
+    assert restored.get_deleted_array() == ["x[3]"]
+    assert restored.get_attribute(x[0], key="attributes.n") == 1
+    assert restored._name_to_index == ising._name_to_index
+    assert restored._label_to_rows == ising._label_to_rows
+    assert restored.to_physical() == ising.to_physical()
+
+    # The restored model can be modified
+    restored.add_interaction(x[2], coefficient=5.0)
+    restored.remove_interaction(name="my name")
+    assert len(restored.select_interaction("removed == False")) == 3
+
+
+def test_logical_model_to_bytes_with_objects(qubo):
+    a = pyqubo.Placeholder("a")
+    x = qubo.variables(pyqubo.Array([pyqubo.Binary("x[0]"), pyqubo.Binary("z")]))
+    qubo.add_interaction(x[0], coefficient=a, attributes={"obj": (1, 2)})
+    qubo.add_interaction(x[1], coefficient=1.0)
+    qubo.offset(2 * a)
+
+    restored = LogicalModel.from_bytes(qubo.to_bytes())
+    assert restored == qubo
+    assert restored._interactions_array["coefficient"][0] == a
+    assert restored.to_physical(placeholder={"a": 3.0}) == qubo.to_physical(placeholder={"a": 3.0})
+
+
+def test_logical_model_save_and_load(ising, tmp_path):
+    x = ising.variables("x", shape=(2,))
+    ising.add_interaction((x[0], x[1]), coefficient=1.0)
+
+    path = str(tmp_path / "model.bin")
+    ising.save(path)
+    assert LogicalModel.load(path) == ising
+    assert LogicalModel.load(path, mmap=False) == ising
+
+
+def test_logical_model_from_bytes_invalid():
+    with pytest.raises(ValueError):
+        LogicalModel.from_bytes(b"invalid data")
+
+    physical = LogicalModel(mtype="ising").to_physical()
+    with pytest.raises(ValueError):
+        LogicalModel.from_bytes(physical.to_bytes())
+
+
 ################################
 # Built-in functions
 ################################
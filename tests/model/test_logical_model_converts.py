@@ -122,6 +122,62 @@ def test_logical_model_to_physical_with_remove(ising):
     assert len(ising._interactions[ising._interactions["name"] == "x[1]"]) == 0
 
 
+def test_logical_model_to_physical_incrementally(ising, mocker):
+    x = ising.variables("x", shape=(4,))
+    ising.add_interaction(x[0], coefficient=1.0)
+    ising.add_interaction(x[1], coefficient=2.0)
+    ising.add_interaction(x[1], name="another x[1]", coefficient=3.0)
+    ising.add_interaction((x[0], x[1]), coefficient=4.0)
+    ising.to_physical()
+
+    spy = mocker.spy(ising, "_apply_dirty_interactions")
+    ising.update_interaction(x[0], coefficient=10.0)
+    ising.remove_interaction(name="another x[1]")
+    ising.remove_interaction((x[0], x[1]))
+    ising.add_interaction((x[2], x[3]), coefficient=5.0, scale=2.0)
+    physical = ising.to_physical()
+
+    assert spy.call_count == 1
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[0]": 10.0, "x[1]": 2.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("x[2]", "x[3]"): 10.0}
+    assert physical._label_to_index == {"x[0]": 0, "x[1]": 1, "x[2]": 2, "x[3]": 3}
+    assert ising._interactions_length == 3
+
+    # Changing the model type needs a full rebuild
+    ising.to_qubo()
+    physical = ising.to_physical()
+    assert spy.call_count == 1
+    assert physical.get_mtype() == constants.MODEL_QUBO
+
+
+def test_logical_model_to_physical_with_constraint_incrementally(qubo, mocker):
+    x = qubo.variables("x", shape=(3,))
+    y = qubo.variables("y", shape=(2,))
+    qubo.add_interaction(x[0], coefficient=1.0)
+    qubo.add_constraint(NHotConstraint(y, n=1, strength=2.0))
+    physical = qubo.to_physical()
+
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[0]": 1.0, "y[0]": 2.0, "y[1]": 2.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("y[0]", "y[1]"): -4.0}
+    assert physical._label_to_index == {"x[0]": 0, "y[0]": 1, "y[1]": 2}
+
+    # The model itself is not modified by the constraints
+    assert qubo._interactions_length == 1
+    assert qubo._interactions_array["name"].tolist() == ["x[0]"]
+    assert qubo.get_offset() == 0.0
+
+    spy = mocker.spy(qubo, "_apply_dirty_interactions")
+    qubo.add_interaction(y[0], coefficient=3.0)
+    qubo.get_constraints_by_label("Default N-hot Constraint").add_variable(x[2])
+    physical = qubo.to_physical()
+
+    assert spy.call_count == 1
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[0]": 1.0, "y[0]": 5.0, "y[1]": 2.0, "x[2]": 2.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("y[0]", "y[1]"): -4.0, ("x[2]", "y[0]"): -4.0, ("x[2]", "y[1]"): -4.0}
+    assert physical._label_to_index == {"x[0]": 0, "x[2]": 1, "y[0]": 2, "y[1]": 3}
+    assert qubo._interactions_length == 2
+
+
 @pytest.mark.parametrize("n,s", [(1, 2), (1, 3), (2, 3), (1, 4), (2, 4), (10, 100)])
 def test_logical_model_to_physical_with_n_hot_constraint_qubo(n, s):
     # n out of s variables should be 1
@@ -220,6 +276,45 @@ def test_logical_model_to_physical_with_placeholder_ising(ising):
     assert physical._offset == 10.0
 
 
+def test_logical_model_to_physical_with_numeric_and_placeholder_mixed(ising):
+    x = ising.variables("x", shape=(3,))
+    ising.add_interaction(x[0], coefficient=2, scale=np.float64(1.5))
+    ising.add_interaction(x[0], name="x[0]-2", coefficient=pyqubo.Placeholder("a"), scale=2.0)
+    ising.add_interaction((x[0], x[1]), coefficient=np.int64(-3))
+    ising.add_interaction((x[1], x[0]), name="x[0]*x[1]-2", coefficient=1.0, scale=pyqubo.Placeholder("b"))
+    ising.add_interaction((x[1], x[2]), coefficient=4.0, scale=0.5)
+    ising._offset = 1
+
+    physical = ising.to_physical(placeholder={"a": 10.0, "b": 5.0})
+
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[0]": 23.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("x[0]", "x[1]"): 2.0, ("x[1]", "x[2]"): 2.0}
+    assert physical.get_offset() == 1.0
+
+
+def test_logical_model_to_physical_with_placeholder_cache(ising, mocker):
+    x = ising.variables("x", shape=(3,))
+    strength = pyqubo.Placeholder("A")
+    ising.add_interaction(x[0], coefficient=1.0, scale=strength)
+    ising.add_interaction(x[1], coefficient=2.0, scale=strength)
+    ising.add_interaction((x[0], x[1]), coefficient=pyqubo.Placeholder("B") * 3)
+
+    spy = mocker.spy(LogicalModel, "_compile_placeholder")
+    for a in [1.0, 2.0, 3.0]:
+        physical = ising.to_physical(placeholder={"A": a, "B": a * 10})
+        assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[0]": a, "x[1]": 2.0 * a}
+        assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("x[0]", "x[1]"): a * 30}
+
+    # Each distinct PyQUBO object is compiled only once through the sweep
+    assert spy.call_count == 2
+
+    # Updating an interaction invalidates the cache
+    ising.update_interaction(x[1], scale=5.0)
+    physical = ising.to_physical(placeholder={"A": 1.0, "B": 1.0})
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[0]": 1.0, "x[1]": 10.0}
+    assert spy.call_count == 3
+
+
 def test_logical_model_to_physical_with_placeholder_qubo(qubo):
     # Note: This test is needed to test a PhysicalModel whose offset is pyqubo.core.Coefficient
     a = qubo.variables("a", shape=(4,))
@@ -289,6 +384,101 @@ def test_logical_model_to_physical_with_deleted_variables(ising):
     assert len(physical._index_to_label) == 6
 
 
+def test_logical_model_to_physical_with_interactions_of_deleted_variables(ising):
+    x = ising.variables("x", shape=(3,))
+    ising.add_interaction(x[0], coefficient=1.0)
+    ising.add_interaction((x[0], x[1]), coefficient=2.0)
+    ising.delete_variable(x[0])
+    ising.to_physical()
+    assert ising._interactions_length == 0
+    assert "x[0]" not in ising._label_to_rows
+    assert "x[0]" not in ising._interactions_array.get_labels()
+
+    # Interactions added after the variable is deleted are removed as well, with a warning
+    ising.add_interaction(x[2], coefficient=3.0)
+    with pytest.warns(UserWarning, match=r"\['x\[0\]'\] are deleted"):
+        ising.add_interactions([(x[0], x[2]), (x[1], x[2])], coefficients=[4.0, 5.0])
+    with pytest.warns(UserWarning, match=r"\['x\[0\]'\] are deleted"):
+        ising.add_interaction(x[0], coefficient=6.0)
+    physical = ising.to_physical()
+
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[2]": 3.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("x[1]", "x[2]"): 5.0}
+    assert physical._label_to_index == {"x[1]": 0, "x[2]": 1}
+    assert ising._interactions_array["name"].tolist() == ["x[2]", "x[1]*x[2]"]
+    assert ising._interactions_array.get_labels() == ["x[2]", "x[1]"]
+    assert ising.get_deleted_size() == 1
+
+
+def test_logical_model_to_physical_with_undeclared_variables(ising):
+    x = ising.variables("x", shape=(2,))
+    ising.add_interaction(x[0], coefficient=1.0)
+    ising.add_interaction(pyqubo.Spin("z"), coefficient=2.0)
+    with pytest.warns(UserWarning, match=r"\['z'\]"):
+        physical = ising.to_physical()
+
+    assert physical._raw_interactions == {constants.INTERACTION_LINEAR: {"x[0]": 1.0, "z": 2.0}, constants.INTERACTION_QUADRATIC: {}}
+    assert physical._label_to_index == {"x[0]": 0}
+    assert physical.to_bqm().linear == {"x[0]": -1.0, "z": -2.0}
+
+    # Arrays are not available, with a clear error
+    with pytest.raises(ValueError, match="no index"):
+        physical.get_h()
+    with pytest.raises(ValueError, match="no index"):
+        physical.to_polynomial_array()
+
+
+def test_logical_model_to_physical_after_partially_failed_delete_variable(qubo):
+    x = qubo.variables("x", shape=(3,))
+    qubo.add_constraint(NHotConstraint(variables=[x[1], x[2]], n=1, label="b"))
+    qubo.add_constraint(NHotConstraint(variables=[x[0], x[1]], n=1, label="a"))
+    with pytest.raises(ValueError):
+        qubo.delete_variable(x[0])
+
+    # The variable is marked as deleted, but it still remains in the constraint "a"
+    with pytest.warns(UserWarning, match=r"\['x\[0\]'\]"):
+        physical = qubo.to_physical()
+
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[1]": 2.0, "x[2]": 1.0, "x[0]": 1.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("x[1]", "x[2]"): -2.0, ("x[0]", "x[1]"): -2.0}
+    assert "x[0]" not in physical._label_to_index
+    assert physical.to_bqm().linear == {"x[1]": -2.0, "x[2]": -1.0, "x[0]": -1.0}
+
+
+def test_logical_model_to_physical_incrementally_with_deleted_variables(mocker):
+    def build():
+        model = LogicalModel(mtype="qubo")
+        x = model.variables("x", shape=(3,))
+        model.add_interaction(x[0], coefficient=1.0)
+        model.add_interaction(x[1], coefficient=2.0)
+        model.add_interaction((x[0], x[1]), coefficient=3.0)
+        model.add_interaction((x[1], x[2]), coefficient=4.0)
+        model.add_constraint(NHotConstraint(variables=[x[1], x[2]], n=1, label="n-hot"))
+        return model, x
+
+    incremental, x = build()
+    incremental.to_physical()
+    spy = mocker.spy(incremental, "_apply_dirty_interactions")
+    # delete_variable fails at the constraint before removing the interactions of the variable,
+    # so the interactions are not dirty but must be removed in the next conversion
+    with pytest.raises(ValueError):
+        incremental.delete_variable(x[0])
+    physical = incremental.to_physical()
+    assert spy.call_count == 1
+
+    rebuilt, x = build()
+    with pytest.raises(ValueError):
+        rebuilt.delete_variable(x[0])
+    expected = rebuilt.to_physical()
+
+    assert physical._raw_interactions == expected._raw_interactions
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[1]": 3.0, "x[2]": 1.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("x[1]", "x[2]"): 2.0}
+    assert physical._label_to_index == expected._label_to_index
+    assert physical.get_offset() == expected.get_offset()
+    assert incremental._interactions_array["name"].tolist() == rebuilt._interactions_array["name"].tolist()
+
+
 def test_logical_model_to_physical_with_fixed_variables(ising):
     x = ising.variables("x", shape=(2,))
     ising.add_interaction(x[0], coefficient=100.0)
@@ -347,6 +537,7 @@ def test_logical_model_convert_model_type(qubo):
     assert isinstance(qubo.get_variables()["y"][0, 0], pyqubo.Spin)
 
     # - Check interactions
+    # Induced linear terms are summed up into an additional interaction for each variable.
     assert len(qubo._interactions_array["name"]) == 7
     assert qubo._interactions_length == 7
 
@@ -360,10 +551,11 @@ def test_logical_model_convert_model_type(qubo):
     assert qubo._interactions_array["removed"][3]
     assert qubo._interactions_array["name"][4] == "y[1][1]"
     assert qubo._interactions_array["coefficient"][4] == -11.0
-    assert "x[1] from x[1]*x[2] (mtype additional" in qubo._interactions_array["name"][5]
+    assert qubo._interactions_array["name"][5] == "x[1] (mtype additional)"
     assert qubo._interactions_array["coefficient"][5] == 3.0
-    assert "x[2] from x[1]*x[2] (mtype additional" in qubo._interactions_array["name"][6]
+    assert qubo._interactions_array["name"][6] == "x[2] (mtype additional)"
     assert qubo._interactions_array["coefficient"][6] == 3.0
+    assert isinstance(qubo._interactions_array["interacts"][6], pyqubo.Spin)
 
     # - Check offset
     assert qubo.get_offset() == 2.5
@@ -395,8 +587,9 @@ def test_logical_model_convert_model_type(qubo):
     assert isinstance(qubo.get_variables()["y"][0, 0], pyqubo.Binary)
 
     # - Check interactions
-    assert len(qubo._interactions_array["name"]) == 8
-    assert qubo._interactions_length == 8
+    # The additional interactions become zero, and are dropped
+    assert len(qubo._interactions_array["name"]) == 6
+    assert qubo._interactions_length == 6
 
     assert qubo._interactions_array["name"][0] == "x[0]"
     assert qubo._interactions_array["coefficient"][0] == 10.0
@@ -406,14 +599,10 @@ def test_logical_model_convert_model_type(qubo):
     assert qubo._interactions_array["coefficient"][2] == 12.0
     assert qubo._interactions_array["name"][3] == "y[1][1]"
     assert qubo._interactions_array["coefficient"][3] == -22.0
-    assert "x[1] from x[1]*x[2] (mtype additional" in qubo._interactions_array["name"][4]
-    assert qubo._interactions_array["coefficient"][4] == 6.0
-    assert "x[2] from x[1]*x[2] (mtype additional" in qubo._interactions_array["name"][5]
-    assert qubo._interactions_array["coefficient"][5] == 6.0
-    assert "x[1] from x[1]*x[2] (mtype additional" in qubo._interactions_array["name"][6]
-    assert qubo._interactions_array["coefficient"][6] == -6.0
-    assert "x[2] from x[1]*x[2] (mtype additional" in qubo._interactions_array["name"][7]
-    assert qubo._interactions_array["coefficient"][7] == -6.0
+    assert qubo._interactions_array["name"][4] == "x[1] (mtype additional)"
+    assert qubo._interactions_array["removed"][4]
+    assert qubo._interactions_array["name"][5] == "x[2] (mtype additional)"
+    assert qubo._interactions_array["removed"][5]
 
     # - Check offset
     assert qubo.get_offset() == 0.0
@@ -428,6 +617,7 @@ def test_logical_model_convert_model_type(qubo):
     assert physical_qubo._raw_interactions[constants.INTERACTION_LINEAR]["x[1]"] == 11.0
     assert physical_qubo._raw_interactions[constants.INTERACTION_LINEAR]["y[1][1]"] == -22.0
     assert physical_qubo._raw_interactions[constants.INTERACTION_QUADRATIC][("x[1]", "x[2]")] == 12.0
+    assert qubo._interactions_array["name"].tolist() == ["x[0]", "x[1]", "x[1]*x[2]", "y[1][1]"]
 
     with pytest.warns(UserWarning):
         qubo.to_qubo()
@@ -444,6 +634,53 @@ def test_logical_model_convert_model_type(qubo):
     assert qubo._mtype == constants.MODEL_QUBO
 
 
+def test_logical_model_convert_model_type_with_scale_and_placeholder(qubo):
+    x = qubo.variables("x", shape=(3,))
+    qubo.add_interaction(x[0], coefficient=4.0, scale=0.5)
+    qubo.add_interaction((x[0], x[1]), coefficient=8.0, scale=0.5)
+    qubo.add_interaction((x[1], x[2]), coefficient=pyqubo.Placeholder("a"))
+    qubo.to_ising()
+
+    # Values are coefficients multiplied by scales
+    additional = ["x[0] (mtype additional)", "x[1] (mtype additional)", "x[2] (mtype additional)"]
+    assert qubo._interactions_array["name"].tolist() == ["x[0]", "x[0]*x[1]", "x[1]*x[2]"] + additional
+    assert qubo._interactions_array["coefficient"][0] == 2.0
+    assert qubo._interactions_array["coefficient"][1] == 2.0
+    assert qubo._interactions_array["coefficient"][3] == 1.0
+    physical = qubo.to_physical(placeholder={"a": 4.0})
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[0]": 2.0, "x[1]": 2.0, "x[2]": 1.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("x[0]", "x[1]"): 1.0, ("x[1]", "x[2]"): 1.0}
+    assert physical.get_offset() == 1.0 + 1.0 + 1.0
+
+
+def test_logical_model_add_and_update_interaction_after_convert_model_type(qubo):
+    x = qubo.variables("x", shape=(3,))
+    qubo.add_interaction(x[1], coefficient=1.0)
+    qubo.add_interaction((x[0], x[1]), coefficient=4.0)
+
+    # Interactions named after the variables are still available after the conversion
+    qubo.to_ising()
+    qubo.add_interaction(x[0], coefficient=2.0)
+    qubo.update_interaction(x[1], coefficient=3.0)
+    physical = qubo.to_physical()
+
+    # Induced terms in the additional interactions are not overwritten by the update
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[1]": 4.0, "x[0]": 3.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("x[0]", "x[1]"): 1.0}
+    assert qubo.get_offset() == 1.5
+
+    qubo.to_qubo()
+    qubo.add_interaction(x[2], coefficient=5.0)
+    qubo.update_interaction(x[0], coefficient=1.0)
+    physical = qubo.to_physical()
+
+    # The additional interactions become zero, and are dropped
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[1]": 6.0, "x[0]": 1.0, "x[2]": 5.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("x[0]", "x[1]"): 4.0}
+    assert qubo.get_offset() == -4.5
+    assert qubo._interactions_array["name"].tolist() == ["x[1]", "x[0]*x[1]", "x[0]", "x[2]"]
+
+
 @pytest.fixture
 def ising_x22():
     model = LogicalModel(mtype="ising")
@@ -108,6 +108,30 @@ def test_logical_model_select_interactions_by_variable(ising):
     assert selected[1] == "x[0][0]*x[0][1]"
 
 
+def test_logical_model_select_with_cached_dataframe(ising, mocker):
+    x = ising.variables("x", shape=(2,))
+    ising.add_interaction(x[0], coefficient=10.0)
+    ising.add_interaction((x[0], x[1]), coefficient=20.0)
+
+    spy = mocker.spy(pd, "DataFrame")
+    ising.select_interaction("body == 1")
+    ising.select_interactions_by_variable(x[0])
+    str(ising)
+    repr(ising)
+    assert spy.call_count == 1
+
+    # The DataFrame is regenerated after the interactions are modified
+    ising.update_interaction(x[0], coefficient=30.0)
+    assert ising.select_interaction("body == 1")["coefficient"].values[0] == 30.0
+    assert spy.call_count == 2
+
+    ising.remove_interaction(x[0])
+    assert ising.select_interaction("body == 1")["removed"].values[0]
+    ising.to_physical()
+    assert len(ising.select_interaction("body == 1")) == 0
+    assert spy.call_count == 4
+
+
 ################################
 # Add
 ################################
@@ -251,6 +275,86 @@ def test_logical_model_add_duplicate_invalid(ising):
         ising.add_interaction(x[1], name="my name", coefficient=2.0)
 
 
+def test_logical_model_add_interactions(ising):
+    x = ising.variables("x", shape=(3,))
+    ising.add_interaction(x[0], coefficient=1.0, attributes={"foo": "bar"})
+    ising.add_interactions(
+        [x[1], (x[1], x[0]), (x[1], x[2])],
+        names=["", "my name", ""],
+        coefficients=np.array([2.0, 3.0, 4.0]),
+        scales=0.5,
+        attributes={"n": ["a", "b", "c"], "ts": 10},
+        timestamp=12345,
+    )
+    ising._update_interactions_dataframe_from_arrays()  # Update the interactions DataFrame for debug
+
+    assert ising._interactions_length == 4
+    assert ising._interactions["name"].tolist() == ["x[0]", "x[1]", "my name", "x[1]*x[2]"]
+    assert ising._interactions["key"].tolist() == ["x[0]", "x[1]", ("x[0]", "x[1]"), ("x[1]", "x[2]")]
+    assert ising._interactions["body"].tolist() == [1, 1, 2, 2]
+    assert ising._interactions["coefficient"].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert ising._interactions["scale"].tolist() == [1.0, 0.5, 0.5, 0.5]
+    assert ising._interactions["timestamp"].tolist()[1:] == [12345, 12345, 12345]
+    assert ising._interactions["dirty"].all()
+    attributes = ising.get_attributes(name="my name")
+    assert np.isnan(attributes["attributes.foo"])
+    assert attributes["attributes.n"] == "b"
+    assert attributes["attributes.ts"] == 10
+    assert ising.get_attribute(x[0], key="attributes.foo") == "bar"
+    assert np.isnan(ising.get_attribute(x[0], key="attributes.n"))
+
+    # Added interactions can be updated and removed by their names
+    ising.update_interaction(name="my name", coefficient=-3.0)
+    ising.remove_interaction((x[1], x[2]))
+    physical = ising.to_physical()
+    assert physical._raw_interactions[constants.INTERACTION_LINEAR] == {"x[0]": 1.0, "x[1]": 1.0}
+    assert physical._raw_interactions[constants.INTERACTION_QUADRATIC] == {("x[0]", "x[1]"): -1.5}
+
+    # Nothing happens for empty targets
+    ising.add_interactions([])
+    assert ising._interactions_length == 3
+
+
+def test_logical_model_add_interactions_invalid(ising):
+    x = ising.variables("x", shape=(3,))
+    ising.add_interaction(x[0], coefficient=1.0)
+
+    with pytest.raises(TypeError):
+        ising.add_interactions(x[1])
+
+    with pytest.raises(TypeError):
+        ising.add_interactions([x[1], "invalid type"])
+
+    with pytest.raises(ValueError):
+        ising.add_interactions([x[1], (x[2], x[2])])
+
+    with pytest.raises(ValueError):
+        ising.add_interactions([x[1], x[2]], coefficients=[1.0, 2.0, 3.0])
+
+    with pytest.raises(TypeError):
+        ising.add_interactions([x[1], x[2]], coefficients=[1.0, "invalid type"])
+
+    with pytest.raises(TypeError):
+        ising.add_interactions([x[1], x[2]], scales="invalid type")
+
+    with pytest.raises(ValueError):
+        ising.add_interactions([x[1], x[2]], attributes={"foo": ["a"]})
+
+    with pytest.raises(TypeError):
+        ising.add_interactions([x[1], x[2]], timestamp="invalid type")
+
+    # Duplicated in the given targets
+    with pytest.raises(ValueError):
+        ising.add_interactions([x[1], x[1]])
+
+    # Already added
+    with pytest.raises(ValueError):
+        ising.add_interactions([x[1], x[0]])
+
+    # Nothing is added by the invalid calls
+    assert ising._interactions_length == 1
+
+
 ################################
 # Update
 ################################
@@ -466,6 +570,22 @@ def test_logical_model_remove_by_name(ising):
     assert ising.select_interaction("name == 'my name'")["removed"].values[0]
 
 
+def test_logical_model_name_to_index(ising):
+    x = ising.variables("x", shape=(4,))
+    for i in range(4):
+        ising.add_interaction(x[i], coefficient=float(i))
+    assert ising._name_to_index == {"x[0]": 0, "x[1]": 1, "x[2]": 2, "x[3]": 3}
+
+    ising.remove_interaction(x[0])
+    ising.remove_interaction(x[2])
+    ising.to_physical()
+    assert ising._name_to_index == {"x[1]": 0, "x[3]": 1}
+
+    ising.update_interaction(x[3], coefficient=30.0)
+    assert ising.select_interaction("name == 'x[3]'")["coefficient"].values[0] == 30.0
+    assert ising.get_attributes(x[1]) == {}
+
+
 def test_logical_model_remove_invalid(ising):
     x = ising.variables("x", shape=(3,))
     ising.add_interaction(x[0], coefficient=1.0)
@@ -529,6 +649,28 @@ def test_logical_model_delete(ising):
     assert ising.get_all_size() == 2 * 3 * 4 + 5 * 6
 
 
+def test_logical_model_label_to_rows(ising):
+    x = ising.variables("x", shape=(4,))
+    ising.add_interaction(x[0], coefficient=1.0)
+    ising.add_interaction((x[0], x[1]), coefficient=2.0)
+    ising.add_interactions([(x[1], x[2]), (x[2], x[3])], coefficients=3.0)
+    assert ising._label_to_rows == {"x[0]": {0, 1}, "x[1]": {1, 2}, "x[2]": {2, 3}, "x[3]": {3}}
+
+    # Logically removed interactions remain until they are physically removed
+    ising.delete_variable(x[1])
+    assert ising._label_to_rows == {"x[0]": {0, 1}, "x[1]": {1, 2}, "x[2]": {2, 3}, "x[3]": {3}}
+    assert ising.select_interactions_by_variable(x[1]).tolist() == ["x[0]*x[1]", "x[1]*x[2]"]
+
+    ising.to_physical()
+    assert ising._label_to_rows == {"x[0]": {0}, "x[2]": {1}, "x[3]": {1}}
+    assert ising.select_interactions_by_variable(x[1]).tolist() == []
+    assert ising.select_interactions_by_variable(x[2]).tolist() == ["x[2]*x[3]"]
+
+    # Fixing a variable follows the index as well
+    ising.fix_variable(x[3], 1)
+    assert ising.select_interactions_by_variable(x[2]).tolist() == ["x[2]*x[3]", "x[2] (before fixed: x[2]*x[3])"]
+
+
 def test_logical_model_delete_dealing_with_nhot_constraints_qubo():
     model = LogicalModel(mtype="qubo")
     x = model.variables("x", shape=(4,))
@@ -0,0 +1,60 @@
+# Copyright 2021 Kotaro Terada
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from sawatabi.model.model_format import ModelFormat
+
+
+def test_model_format_pack_and_unpack():
+    arrays = {
+        "a": np.arange(5, dtype=np.int8),
+        "b": np.array([[1.0, 2.0, 3.0]]),
+        "c": np.empty(0, dtype=np.int32),
+    }
+    data = ModelFormat.pack(ModelFormat.KIND_LOGICAL, {"foo": "bar"}, arrays, {"obj": (1, "x")})
+    assert data[:8] == ModelFormat.MAGIC
+
+    meta, unpacked, objects = ModelFormat.unpack(data, ModelFormat.KIND_LOGICAL)
+    assert meta == {"foo": "bar"}
+    assert objects == {"obj": (1, "x")}
+    for k, v in arrays.items():
+        assert unpacked[k].dtype == v.dtype
+        assert np.array_equal(unpacked[k], v)
+        # Sections are aligned views of the data
+        assert unpacked[k].ctypes.data % 8 == 0 or len(v) == 0
+        assert not unpacked[k].flags.writeable
+
+
+def test_model_format_unpack_invalid():
+    data = ModelFormat.pack(ModelFormat.KIND_PHYSICAL, {}, {})
+    with pytest.raises(ValueError):
+        ModelFormat.unpack(data, ModelFormat.KIND_LOGICAL)
+    with pytest.raises(ValueError):
+        ModelFormat.unpack(b"x" * 24, ModelFormat.KIND_PHYSICAL)
+    with pytest.raises(ValueError):
+        ModelFormat.unpack(b"x", ModelFormat.KIND_PHYSICAL)
+
+    # Newer versions are not supported
+    newer = bytearray(data)
+    newer[8] = ModelFormat.VERSION + 1
+    with pytest.raises(ValueError):
+        ModelFormat.unpack(bytes(newer), ModelFormat.KIND_PHYSICAL)
+
+
+@pytest.mark.parametrize("strings", [[], ["x[0]", "", "y[1][2]"], ["あ", "x", "変数[0]"]])
+def test_model_format_strings(strings):
+    data, offsets = ModelFormat.encode_strings(strings)
+    assert ModelFormat.decode_strings(data, offsets) == strings
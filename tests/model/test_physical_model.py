@@ -12,9 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import dimod
+import numpy as np
 import pytest
 
+import sawatabi.constants as constants
 from sawatabi.model import LogicalModel, PhysicalModel
+from sawatabi.solver import LocalSolver
 
 
 @pytest.fixture
@@ -56,6 +60,48 @@ def test_physical_model_constructor(mtype):
     assert model._mtype == mtype
 
 
+################################
+# Arrays
+################################
+
+
+def test_physical_model_arrays(ising):
+    # Arrays are built in to_physical
+    assert ising._h is not None
+    assert ising.get_h().dtype == np.float64
+    assert ising.get_h().tolist() == [1.0, 2.0]
+
+    row, col, data = ising.get_J()
+    assert row.dtype == np.int32
+    assert (row.tolist(), col.tolist(), data.tolist()) == ([0], [1], [3.0])
+
+    indptr, indices, csr_data = ising.get_adjacency()
+    assert indptr.tolist() == [0, 1, 2]
+    assert indices.tolist() == [1, 0]
+    assert csr_data.tolist() == [3.0, 3.0]
+
+
+def test_physical_model_arrays_lazily_built():
+    model = PhysicalModel(mtype="ising")
+    model.add_interaction("a", body=1, coefficient=1.0)
+    model.add_interaction(("a", "b"), body=2, coefficient=2.0)
+    model.add_interaction(("b", "c"), body=2, coefficient=3.0)
+    model._label_to_index = {"a": 0, "b": 1, "c": 2}
+    model._index_to_label = {0: "a", 1: "b", 2: "c"}
+    assert model._h is None
+
+    assert model.get_h().tolist() == [1.0, 0.0, 0.0]
+    indptr, indices, csr_data = model.get_adjacency()
+    assert indptr.tolist() == [0, 1, 3, 4]
+    assert indices.tolist() == [1, 0, 2, 1]
+    assert csr_data.tolist() == [2.0, 2.0, 3.0, 3.0]
+
+    # Adding an interaction invalidates the arrays
+    model.add_interaction("c", body=1, coefficient=4.0)
+    assert model._h is None
+    assert model.get_h().tolist() == [1.0, 0.0, 4.0]
+
+
 ################################
 # Converts to another model
 ################################
@@ -85,6 +131,79 @@ def test_convert_to_bqm_qubo(qubo):
     assert bqm_qubo[1] == 0.0
 
 
+@pytest.mark.parametrize("mtype", ["ising", "qubo"])
+def test_convert_to_bqm_same_as_from_dicts(mtype):
+    model = LogicalModel(mtype=mtype)
+    x = model.variables(name="x", shape=(4,))
+    model.add_interaction((x[3], x[1]), coefficient=1.0)
+    model.add_interaction(x[2], coefficient=2.0)
+    model.add_interaction((x[0], x[1]), coefficient=3.0)
+    model.add_interaction(x[1], coefficient=4.0)
+    model.add_interaction(x[3], coefficient=5.0)
+    physical = model.to_physical()
+
+    vartype = dimod.SPIN if mtype == "ising" else dimod.BINARY
+    for sign in [-1.0, 1.0]:
+        bqm = physical.to_bqm(sign=sign)
+        expected = physical._to_bqm_from_dicts(sign, vartype)
+        assert bqm == expected
+        assert list(bqm.variables) == list(expected.variables)
+
+
+def test_convert_to_bqm_cached():
+    model = LogicalModel(mtype="ising")
+    x = model.variables(name="x", shape=(2,))
+    model.add_interaction(x[0], coefficient=1.0)
+    physical = model.to_physical()
+
+    bqm = physical._cached_bqm()
+    assert physical._cached_bqm() is bqm
+    assert physical._cached_bqm(sign=1.0) is not bqm
+
+    # A copy of the cached BQM is returned
+    assert physical.to_bqm() is not bqm
+    assert physical.to_bqm() == bqm
+
+    # The cache is cleared when the model is modified
+    physical.add_interaction("x[1]", body=1, coefficient=2.0)
+    physical._label_to_index["x[1]"] = 1
+    physical._index_to_label[1] = "x[1]"
+    updated = physical._cached_bqm()
+    assert updated is not bqm
+    assert updated.linear["x[1]"] == -2.0
+
+    # The cache is cleared when the offset is modified as well
+    physical._offset = 3.0
+    assert physical.to_bqm().offset == 3.0
+
+
+def test_convert_to_bqm_modified_by_caller():
+    model = LogicalModel(mtype="ising")
+    x = model.variables(name="x", shape=(2,))
+    model.add_interaction(x[0], coefficient=1.0)
+    model.add_interaction((x[0], x[1]), coefficient=-1.0)
+    physical = model.to_physical()
+
+    # Modifying the returned BQM does not affect the model
+    bqm = physical.to_bqm()
+    bqm.add_linear("x[1]", 100.0)
+    bqm.offset += 10.0
+    assert physical.to_bqm().linear["x[1]"] == 0.0
+    assert physical.to_bqm().offset == 0.0
+
+    sampleset = LocalSolver(exact=True).solve(physical)
+    assert sampleset.first.energy == -2.0
+
+
+def test_convert_to_bqm_without_index(simple):
+    # Variables are not indexed, so the BQM is built from dicts
+    simple.add_interaction("a", body=1, coefficient=1.0)
+    simple.add_interaction(("a", "b"), body=2, coefficient=2.0)
+    bqm = simple.to_bqm()
+    assert bqm.linear["a"] == -1.0
+    assert bqm.adj["a"]["b"] == -2.0
+
+
 def test_convert_to_polynomial(ising):
     assert ising._label_to_index["x[1]"] == 0
     assert ising._label_to_index["x[2]"] == 1
@@ -96,6 +215,87 @@ def test_convert_to_polynomial(ising):
     assert [1, 1, -2.0] in polynomial
     assert [0, 1, -3.0] in polynomial
     assert len(polynomial) == 3
+    assert all(isinstance(p[0], int) and isinstance(p[1], int) for p in polynomial)
+
+
+def test_convert_to_polynomial_array(ising):
+    polynomial = ising.to_polynomial_array()
+    assert polynomial.shape == (3, 3)
+    assert polynomial.dtype == np.float64
+    assert polynomial.tolist() == [[0.0, 0.0, -1.0], [1.0, 1.0, -2.0], [0.0, 1.0, -3.0]]
+
+
+def test_convert_to_polynomial_array_with_zero_and_unordered_linear(simple):
+    # Linear terms are inserted in a different order from the variable indices, including an explicit zero
+    simple.add_interaction("x[2]", body=constants.INTERACTION_LINEAR, coefficient=2.0)
+    simple.add_interaction("x[0]", body=constants.INTERACTION_LINEAR, coefficient=0.0)
+    simple.add_interaction("x[1]", body=constants.INTERACTION_LINEAR, coefficient=1.0)
+    simple.add_interaction(("x[1]", "x[2]"), body=constants.INTERACTION_QUADRATIC, coefficient=3.0)
+    simple.add_interaction(("x[0]", "x[1]"), body=constants.INTERACTION_QUADRATIC, coefficient=4.0)
+    for i in range(3):
+        simple._label_to_index[f"x[{i}]"] = i
+        simple._index_to_label[i] = f"x[{i}]"
+
+    polynomial = simple.to_polynomial_array()
+    assert polynomial.tolist() == [[2.0, 2.0, -2.0], [0.0, 0.0, -0.0], [1.0, 1.0, -1.0], [1.0, 2.0, -3.0], [0.0, 1.0, -4.0]]
+    assert simple.to_polynomial() == [[2, 2, -2.0], [0, 0, -0.0], [1, 1, -1.0], [1, 2, -3.0], [0, 1, -4.0]]
+
+
+################################
+# Serialization
+################################
+
+
+def test_physical_model_to_bytes_and_from_bytes(qubo):
+    restored = PhysicalModel.from_bytes(qubo.to_bytes())
+    assert restored == qubo
+    assert restored._variables_set == qubo._variables_set
+    assert restored.get_h().tolist() == qubo.get_h().tolist()
+    assert restored.get_adjacency()[1].tolist() == qubo.get_adjacency()[1].tolist()
+    assert restored.to_polynomial() == qubo.to_polynomial()
+
+
+def test_physical_model_to_bytes_with_pickle_fallback(simple):
+    # Variables are not indexed, so the model is pickled
+    simple.add_interaction("a", body=1, coefficient=1.0)
+    restored = PhysicalModel.from_bytes(simple.to_bytes())
+    assert restored == simple
+
+
+def test_physical_model_save_and_load(ising, tmp_path):
+    path = str(tmp_path / "model.bin")
+    ising.save(path)
+
+    loaded = PhysicalModel.load(path)
+    assert loaded == ising
+    assert isinstance(loaded.get_h(), np.memmap)
+    assert not loaded.get_h().flags.writeable
+    assert PhysicalModel.load(path, mmap=False) == ising
+
+
+def test_physical_model_open_mmap(qubo, tmp_path):
+    path = str(tmp_path / "model.bin")
+    qubo.save(path)
+
+    mapped = PhysicalModel.open_mmap(path)
+    assert isinstance(mapped.get_J()[2], np.memmap)
+    assert isinstance(mapped.get_adjacency()[0], np.memmap)
+    assert mapped.get_num_interactions() == 3
+
+    # Raw interactions are not decoded until they are accessed
+    assert mapped._raw_interactions_dicts is None
+    assert mapped.to_bqm() == qubo.to_bqm()
+    assert mapped.to_polynomial() == qubo.to_polynomial()
+    assert mapped._raw_interactions_dicts is None
+
+    assert mapped == qubo
+    assert mapped._raw_interactions_dicts is not None
+    assert mapped._variables_set == qubo._variables_set
+
+    # The mapped model can be modified after decoding
+    mapped.add_interaction("x[1]", body=1, coefficient=5.0)
+    assert mapped.get_h().tolist() == [5.0, 2.0]
+    assert mapped.get_num_interactions() == 3
 
 
 ################################
@@ -12,9 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import dimod
+import numpy as np
 import pytest
 
-from sawatabi.model import AbstractModel
+from sawatabi.model import AbstractModel, LogicalModel
 from sawatabi.solver import AbstractSolver
 
 ################################
@@ -28,3 +30,33 @@ def test_abstract_solver():
 
     with pytest.raises(NotImplementedError):
         solver.solve(model)
+
+
+@pytest.mark.parametrize("vartype,values", [(dimod.SPIN, [-1, 1]), (dimod.BINARY, [0, 1])])
+def test_abstract_solver_build_sampleset(vartype, values):
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(12,))
+    for i in range(11):
+        model.add_interaction((x[11 - i], x[10 - i]), coefficient=1.0)
+    physical = model.to_physical()
+
+    rng = np.random.default_rng(12345)
+    samples = rng.choice(values, size=(50, 12))
+    samples[rng.integers(50, size=20)] = samples[3]
+    _, first, inverse = np.unique(samples, axis=0, return_index=True, return_inverse=True)
+    energies = rng.integers(-5, 5, size=50).astype(float)[first][inverse.ravel()]
+
+    sampleset = AbstractSolver._build_sampleset(physical, samples, energies, vartype, info={"foo": "bar"})
+
+    # Same as building from a dict per read
+    labels = [physical._index_to_label[i] for i in range(12)]
+    expected = dimod.SampleSet.from_samples(
+        [dict(zip(labels, sample)) for sample in samples], vartype=vartype, energy=energies, aggregate_samples=True, sort_labels=True
+    )
+    assert list(sampleset.variables) == list(expected.variables) == sorted(labels)
+    assert np.array_equal(sampleset.record.sample, expected.record.sample)
+    assert np.array_equal(sampleset.record.energy, expected.record.energy)
+    assert np.array_equal(sampleset.record.num_occurrences, expected.record.num_occurrences)
+    assert sampleset.record.sample.dtype == np.int8
+    assert sampleset.vartype == vartype
+    assert sampleset.info == {"foo": "bar"}
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import gzip
+import json
 import os
 
 import dimod
@@ -96,6 +98,78 @@ def test_optigan_solver_without_gzip(mocker, physical):
     assert isinstance(sampleset, dimod.SampleSet)
 
 
+def test_optigan_solver_request_body(mocker, physical):
+    solver = OptiganSolver(endpoint="http://0.0.0.0/method", token="xxxx")
+
+    response_mock = ResponseMock()
+    post = mocker.patch("requests.post", return_value=response_mock)
+
+    solver.solve(physical, num_unit_steps=20, duplicate=True)
+
+    # The body is sent as plain JSON by default
+    assert "data" not in post.call_args.kwargs
+    assert "Content-Encoding" not in post.call_args.kwargs["headers"]
+    payload = post.call_args.kwargs["json"]
+    assert payload["num_unit_steps"] == 20
+    assert payload["outputs"]["duplicate"]
+    assert payload["polynomial"] == physical.to_polynomial()
+
+
+@pytest.mark.parametrize("gzip_request, stream_request", [(True, False), (False, True), (True, True)])
+def test_optigan_solver_encoded_request_body(mocker, physical, gzip_request, stream_request):
+    solver = OptiganSolver(endpoint="http://0.0.0.0/method", token="xxxx")
+
+    response_mock = ResponseMock()
+    post = mocker.patch("requests.post", return_value=response_mock)
+
+    solver.solve(physical, num_unit_steps=20, duplicate=True, gzip_request=gzip_request, stream_request=stream_request)
+
+    data = post.call_args.kwargs["data"]
+    if stream_request:
+        # The body is streamed by a generator instead of the whole bytes
+        assert not isinstance(data, bytes)
+        data = b"".join(data)
+    else:
+        assert isinstance(data, bytes)
+    if gzip_request:
+        assert post.call_args.kwargs["headers"]["Content-Encoding"] == "gzip"
+        data = gzip.decompress(data)
+    payload = json.loads(data)
+    assert payload["num_unit_steps"] == 20
+    assert payload["outputs"]["duplicate"]
+    assert payload["polynomial"] == physical.to_polynomial()
+
+
+def test_optigan_solver_encode_payload():
+    polynomial = np.array([[0, 0, -1.0], [1, 1, 0.1], [0, 1, 2.5]])
+    payload = {"num_unit_steps": 10, "timeout": 10000}
+    expected = json.dumps({**payload, "polynomial": [[0, 0, -1.0], [1, 1, 0.1], [0, 1, 2.5]]}).encode("utf-8")
+
+    for chunk_size in [1, 2, 3, 65536]:
+        chunks = list(OptiganSolver._encode_payload(payload, polynomial, chunk_size=chunk_size))
+        assert b"".join(chunks) == expected
+        assert gzip.decompress(b"".join(OptiganSolver._compress(iter(chunks)))) == expected
+
+    empty = b"".join(OptiganSolver._encode_payload(payload, np.empty((0, 3))))
+    assert json.loads(empty)["polynomial"] == []
+
+
+@pytest.mark.parametrize("coefficient", [np.nan, np.inf, -np.inf])
+def test_optigan_solver_with_non_finite_coefficient(mocker, coefficient):
+    solver = OptiganSolver(endpoint="http://0.0.0.0/method", token="xxxx")
+    post = mocker.patch("requests.post")
+
+    model = LogicalModel(mtype="qubo")
+    x = model.variables("x", shape=(2,))
+    model.add_interaction(x[0], coefficient=1.0)
+    model.add_interaction((x[0], x[1]), coefficient=coefficient)
+    physical = model.to_physical()
+
+    with pytest.raises(ValueError):
+        solver.solve(physical)
+    post.assert_not_called()
+
+
 def test_optigan_solver_with_invalid_response(mocker, physical):
     directory = os.path.dirname(__file__)
     solver = OptiganSolver(config=f"{directory}/.optigan.yml")
@@ -20,6 +20,24 @@ from sawatabi.model.constraint import NHotConstraint
 from sawatabi.solver import SawatabiSolver
 
 
+def _random_model(size, mtype="ising", max_coefficient=5, density=1.0, linear=True):
+    """
+    Returns a logical model of `size` variables with random integer coefficients in [-max_coefficient, max_coefficient].
+    Each pair of variables interacts with probability `density`, and linear terms are added if `linear` is True.
+    """
+    rng = np.random.default_rng(0)
+    model = LogicalModel(mtype=mtype)
+    x = model.variables("x", shape=(size,))
+    for i in range(size):
+        if linear:
+            model.add_interaction(x[i], coefficient=float(rng.integers(-max_coefficient, max_coefficient + 1)))
+        for j in range(i + 1, size):
+            if (density < 1.0) and (rng.random() >= density):
+                continue
+            model.add_interaction((x[i], x[j]), coefficient=float(rng.integers(-max_coefficient, max_coefficient + 1)))
+    return model
+
+
 def test_sawatabi_solver_ising():
     model = LogicalModel(mtype="ising")
     s = model.variables("s", shape=(2,))
@@ -349,3 +367,484 @@ def test_sawatabi_solver_with_stats():
     assert stats[0]["acceptance_history"][-1] == 0
     assert stats[0]["energy_history"][-1] == -2.0
     assert stats[0]["temperature_history"] == [100.0, 50.0, 25.0, 12.5, 6.25, 3.125, 1.5625, 0.78125, 0.390625, 0.1953125]
+
+
+@pytest.mark.parametrize("mtype", ["ising", "qubo"])
+@pytest.mark.parametrize("pickup_mode", ["random", "sequential", "colored"])
+def test_sawatabi_solver_energy_consistency(mtype, pickup_mode):
+    # The energy tracked through the local fields should match the energy of the sample
+    model = _random_model(20, mtype=mtype)
+    physical = model.to_physical()
+
+    solver = SawatabiSolver()
+    sampleset = solver.solve(physical, num_reads=3, num_sweeps=50, pickup_mode=pickup_mode, seed=12345)
+
+    bqm = physical.to_bqm()
+    for sample, energy in sampleset.data(fields=["sample", "energy"]):
+        assert energy == bqm.energy(sample)
+
+
+def test_sawatabi_solver_annealing_and_energy_diff():
+    model = _random_model(20)
+    physical = model.to_physical()
+
+    solver = SawatabiSolver()
+    solver.solve(physical, num_reads=1, num_sweeps=10, seed=12345)
+
+    initial_state = {label: 1 for label in physical._label_to_index}
+    sample, energy, energy_hist, temperature_hist, acceptance_hist = solver.annealing(
+        num_reads=1,
+        num_sweeps=10,
+        cooling_rate=0.9,
+        initial_temperature=100.0,
+        initial_state=initial_state,
+        reverse_options=None,
+        pickup_mode="random",
+    )
+    assert set(sample.keys()) == set(physical._label_to_index.keys())
+    assert len(energy_hist) == len(temperature_hist) == len(acceptance_hist) == 10
+    assert solver._stop_reason == "num_sweeps"
+
+    # The energy difference of a flip matches the difference of the BQM energies
+    bqm = physical.to_bqm(sign=1.0)
+    spins = np.array([sample[physical._index_to_label[i]] for i in range(20)])
+    for idx in range(20):
+        flipped = spins.copy()
+        flipped[idx] *= -1
+        before = bqm.energy({physical._index_to_label[i]: s for i, s in enumerate(spins)})
+        after = bqm.energy({physical._index_to_label[i]: s for i, s in enumerate(flipped)})
+        assert solver.calc_energy_diff(idx, spins) == before - after
+
+    assert solver.is_acceptable(-1.0, 1e-9)
+    assert not solver.is_acceptable(1000.0, 1e-9)
+
+
+@pytest.mark.parametrize("mtype", ["ising", "qubo"])
+@pytest.mark.parametrize("pickup_mode", ["random", "sequential", "colored"])
+def test_sawatabi_solver_batch_reads(mtype, pickup_mode):
+    model = _random_model(20, mtype=mtype)
+    model.offset(3.0)
+    physical = model.to_physical()
+
+    solver = SawatabiSolver()
+    sampleset, stats = solver.solve(physical, num_reads=8, num_sweeps=50, pickup_mode=pickup_mode, seed=12345, need_stats=True, batch_reads=True)
+    assert sum(sampleset.record.num_occurrences) == 8
+    assert len(stats) == 8
+    assert len(stats[0]["energy_history"]) == 50
+    assert stats[0]["temperature_history"] == stats[7]["temperature_history"]
+
+    bqm = physical.to_bqm()
+    for sample, energy in sampleset.data(fields=["sample", "energy"]):
+        assert energy == bqm.energy(sample)
+
+
+def test_sawatabi_solver_batch_reads_with_initial_states():
+    model = LogicalModel(mtype="qubo")
+    x = model.variables("x", shape=(4,))
+    for i in range(4):
+        model.add_interaction(x[i], coefficient=-1.0)
+
+    solver = SawatabiSolver()
+    initial_states = [{"x[0]": 1, "x[1]": 0, "x[2]": 1, "x[3]": 0}, {"x[0]": 0, "x[1]": 0, "x[2]": 0, "x[3]": 1}]
+    sampleset, stats = solver.solve(
+        model.to_physical(), num_reads=2, num_sweeps=1, initial_temperature=1e-9, initial_states=initial_states, need_stats=True, batch_reads=True
+    )
+
+    # All spins go down to the ground state from the initial states
+    assert np.array_equal(sampleset.record[0].sample, [0, 0, 0, 0])
+    assert sampleset.record[0].num_occurrences == 2
+    assert [s["acceptance_history"] for s in stats] == [[2], [1]]
+
+
+def test_sawatabi_solver_batch_reads_reverse():
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(6,))
+    for i in range(6):
+        model.add_interaction(x[i], coefficient=10.0)
+
+    solver = SawatabiSolver()
+    reverse_options = {"reverse_period": 5, "reverse_temperature": 10.0}
+    sampleset, stats = solver.solve(
+        model.to_physical(), num_reads=3, num_sweeps=10, reverse_options=reverse_options, seed=12345, need_stats=True, batch_reads=True
+    )
+    assert stats[0]["temperature_history"][0] == 1e-9
+    assert sampleset.first.sample == {f"x[{i}]": 1 for i in range(6)}
+
+
+@pytest.mark.parametrize("mtype", ["ising", "qubo"])
+@pytest.mark.parametrize("batch_reads", [False, True])
+def test_sawatabi_solver_num_workers(mtype, batch_reads):
+    model = _random_model(20, mtype=mtype)
+    physical = model.to_physical()
+
+    solver = SawatabiSolver()
+    sampleset, stats = solver.solve(physical, num_reads=5, num_sweeps=50, seed=12345, need_stats=True, batch_reads=batch_reads, num_workers=2)
+    assert sampleset.record.num_occurrences.sum() == 5
+    assert len(stats) == 5
+    assert all(len(s["energy_history"]) == 50 for s in stats)
+
+    bqm = physical.to_bqm()
+    for sample, energy in sampleset.data(fields=["sample", "energy"]):
+        assert energy == bqm.energy(sample)
+
+    # Each worker derives its own seed from the given seed, so the results are reproducible
+    sampleset2, stats2 = solver.solve(physical, num_reads=5, num_sweeps=50, seed=12345, need_stats=True, batch_reads=batch_reads, num_workers=2)
+    assert np.array_equal(sampleset.record.energy, sampleset2.record.energy)
+    assert stats == stats2
+
+
+def test_sawatabi_solver_num_workers_with_initial_states():
+    model = LogicalModel(mtype="qubo")
+    x = model.variables("x", shape=(4,))
+    for i in range(4):
+        model.add_interaction(x[i], coefficient=-1.0)
+
+    solver = SawatabiSolver()
+    initial_states = [{"x[0]": 1, "x[1]": 0, "x[2]": 1, "x[3]": 0}, {"x[0]": 0, "x[1]": 0, "x[2]": 0, "x[3]": 1}, {"x[0]": 0, "x[1]": 0, "x[2]": 0, "x[3]": 0}]
+    sampleset, stats = solver.solve(
+        model.to_physical(), num_reads=3, num_sweeps=1, initial_temperature=1e-9, initial_states=initial_states, need_stats=True, num_workers=2
+    )
+
+    # Stats are merged in order of the reads
+    assert sampleset.record[0].num_occurrences == 3
+    assert [s["acceptance_history"] for s in stats] == [[2], [1], [0]]
+
+
+def test_sawatabi_solver_invalid_num_workers():
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(2,))
+    for i in range(2):
+        model.add_interaction(x[i], coefficient=-1.0)
+    solver = SawatabiSolver()
+
+    with pytest.raises(TypeError):
+        solver.solve(model.to_physical(), num_workers=1.5)
+
+    with pytest.raises(ValueError):
+        solver.solve(model.to_physical(), num_workers=0)
+
+
+def test_sawatabi_solver_colored():
+    # A 2D grid is colored like a checkerboard
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(6, 6))
+    for i in range(6):
+        for j in range(6):
+            if i < 5:
+                model.add_interaction((x[i, j], x[i + 1, j]), coefficient=1.0)
+            if j < 5:
+                model.add_interaction((x[i, j], x[i, j + 1]), coefficient=1.0)
+    physical = model.to_physical()
+
+    solver = SawatabiSolver()
+    sampleset, stats = solver.solve(physical, num_reads=2, num_sweeps=100, pickup_mode="colored", seed=12345, need_stats=True)
+    assert len(solver._color_classes) == 2
+
+    # No two spins in a color class share a coupling
+    indptr, indices, _ = physical.get_adjacency()
+    for vertices, columns, _, owners in solver._color_classes:
+        assert len(np.intersect1d(vertices, columns)) == 0
+        assert np.array_equal(np.sort(columns), np.sort(np.concatenate([indices[start:end] for start, end in zip(indptr[vertices], indptr[vertices + 1])])))
+        assert np.array_equal(vertices[owners], np.repeat(vertices, np.diff(indptr)[vertices]))
+
+    # The ferromagnetic ground state: all spins are aligned
+    assert sampleset.first.energy == -60.0
+    assert len(stats[0]["acceptance_history"]) == 100
+
+
+def test_sawatabi_solver_colored_cache(mocker):
+    model = LogicalModel(mtype="qubo")
+    x = model.variables("x", shape=(6,))
+    for i in range(5):
+        model.add_interaction((x[i], x[i + 1]), coefficient=1.0)
+
+    solver = SawatabiSolver()
+    spy = mocker.spy(solver, "_color_variables")
+    solver.solve(model.to_physical(), num_reads=2, num_sweeps=10, pickup_mode="colored", seed=12345)
+    assert spy.call_count == 1
+
+    # The coloring is reused for the same model, and for another model with the same structure
+    solver.solve(model.to_physical(), num_reads=2, num_sweeps=10, pickup_mode="colored", seed=12345)
+    model.update_interaction((x[0], x[1]), coefficient=-2.0)
+    physical = model.to_physical()
+    solver.solve(physical, num_reads=2, num_sweeps=10, pickup_mode="colored", seed=12345, num_workers=2)
+    assert spy.call_count == 1
+    # The classes are rebuilt with the updated coefficients
+    assert solver._color_classes[0][2].tolist() == [-0.5, 0.25, 0.25, 0.25, 0.25]
+
+    # The graph is colored again when the structure changes
+    model.add_interaction((x[0], x[5]), coefficient=1.0)
+    solver.solve(model.to_physical(), num_reads=2, num_sweeps=10, pickup_mode="colored", seed=12345)
+    assert spy.call_count == 2
+
+
+@pytest.mark.parametrize("mtype", ["ising", "qubo"])
+@pytest.mark.parametrize("pickup_mode", ["random", "colored"])
+def test_sawatabi_solver_parallel_tempering(mtype, pickup_mode):
+    model = _random_model(20, mtype=mtype)
+    physical = model.to_physical()
+
+    solver = SawatabiSolver()
+    parallel_tempering_options = {"temperatures": [10.0, 0.5, 2.0, 1.0], "swap_interval": 2}
+    sampleset, stats = solver.solve(
+        physical, num_reads=3, num_sweeps=50, pickup_mode=pickup_mode, seed=12345, need_stats=True, parallel_tempering_options=parallel_tempering_options
+    )
+    assert sampleset.record.num_occurrences.sum() == 3
+
+    bqm = physical.to_bqm()
+    for sample, energy in sampleset.data(fields=["sample", "energy"]):
+        assert energy == bqm.energy(sample)
+
+    assert len(stats) == 3
+    assert stats[0]["temperatures"] == [0.5, 1.0, 2.0, 10.0]
+    assert stats[0]["temperature_history"] == [0.5] * 50
+    assert len(stats[0]["energy_history"]) == 50
+    # Even pairs (0-1, 2-3) and the odd pair (1-2) are attempted alternately every two sweeps
+    assert stats[0]["swap_attempts"] == [13, 12, 13]
+    for s in stats:
+        assert all(0 <= a <= n for a, n in zip(s["swap_acceptances"], s["swap_attempts"]))
+        assert s["swap_acceptance_rates"] == [a / n for a, n in zip(s["swap_acceptances"], s["swap_attempts"])]
+
+
+def test_sawatabi_solver_parallel_tempering_geometric_ladder():
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(6,))
+    for i in range(6):
+        model.add_interaction(x[i], coefficient=10.0)
+
+    solver = SawatabiSolver()
+    parallel_tempering_options = {"num_replicas": 3, "min_temperature": 0.1, "max_temperature": 10.0}
+    initial_states = [{f"x[{i}]": -1 for i in range(6)}] * 2
+    sampleset, stats = solver.solve(
+        model.to_physical(), num_reads=2, num_sweeps=10, initial_states=initial_states, need_stats=True, parallel_tempering_options=parallel_tempering_options
+    )
+    assert np.allclose(stats[0]["temperatures"], [0.1, 1.0, 10.0])
+    assert sampleset.first.sample == {f"x[{i}]": 1 for i in range(6)}
+    assert sampleset.record[0].num_occurrences == 2
+
+
+def test_sawatabi_solver_invalid_parallel_tempering_options():
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(2,))
+    for i in range(2):
+        model.add_interaction(x[i], coefficient=-1.0)
+    solver = SawatabiSolver()
+
+    with pytest.raises(TypeError):
+        solver.solve(model.to_physical(), parallel_tempering_options=[1.0, 2.0])
+
+    with pytest.raises(ValueError):
+        solver.solve(model.to_physical(), parallel_tempering_options={"num_replicas": 4})
+
+    with pytest.raises(ValueError):
+        solver.solve(model.to_physical(), parallel_tempering_options={"temperatures": [1.0]})
+
+    with pytest.raises(ValueError):
+        solver.solve(model.to_physical(), parallel_tempering_options={"temperatures": [0.0, 1.0]})
+
+    with pytest.raises(ValueError):
+        solver.solve(model.to_physical(), parallel_tempering_options={"temperatures": [0.5, 1.0], "swap_interval": 0})
+
+    with pytest.raises(ValueError):
+        solver.solve(
+            model.to_physical(),
+            parallel_tempering_options={"temperatures": [0.5, 1.0]},
+            reverse_options={"reverse_period": 5, "reverse_temperature": 10.0},
+        )
+
+
+@pytest.mark.parametrize("mtype", ["ising", "qubo"])
+@pytest.mark.parametrize("pickup_mode", ["random", "colored"])
+@pytest.mark.parametrize("batch_reads", [False, True])
+def test_sawatabi_solver_exp_table(mtype, pickup_mode, batch_reads):
+    model = _random_model(40, mtype=mtype, max_coefficient=2, density=0.1)
+    physical = model.to_physical()
+
+    solver = SawatabiSolver()
+    sampleset, stats = solver.solve(physical, num_reads=2, num_sweeps=50, pickup_mode=pickup_mode, seed=12345, need_stats=True, batch_reads=batch_reads)
+    unit = 2.0 if mtype == "ising" else 0.5
+    assert solver._exp_levels[1] == unit
+    assert np.array_equal(solver._exp_levels, unit * np.arange(len(solver._exp_levels)))
+
+    # Looking up the table gives the same results as calculating exp
+    solver_without_table = SawatabiSolver()
+    solver_without_table.EXP_TABLE_MAX_SIZE = 0
+    sampleset_without_table, stats_without_table = solver_without_table.solve(
+        physical, num_reads=2, num_sweeps=50, pickup_mode=pickup_mode, seed=12345, need_stats=True, batch_reads=batch_reads
+    )
+    assert solver_without_table._exp_levels is None
+    assert np.array_equal(sampleset.record.energy, sampleset_without_table.record.energy)
+    assert stats == stats_without_table
+
+
+def test_sawatabi_solver_exp_table_not_on_grid():
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(10,))
+    for i in range(10):
+        model.add_interaction(x[i], coefficient=0.1 * i)
+    solver = SawatabiSolver()
+    solver.solve(model.to_physical(), num_sweeps=10, seed=12345)
+    assert solver._exp_levels is None
+
+
+def test_sawatabi_solver_split_random_stream():
+    solver = SawatabiSolver()
+    solver._rng = np.random.default_rng(12345)
+    expected = np.random.default_rng(12345)
+
+    # A buffered 32-bit value is kept
+    solver._rng.integers(2, size=3)
+    expected.integers(2, size=3)
+
+    accept_rng = solver._split_random_stream(100)
+    values = np.concatenate([accept_rng.random(size=30) for _ in range(4)])[:100]
+    assert np.array_equal(values, expected.random(size=100))
+    assert np.array_equal(solver._rng.permutation(10), expected.permutation(10))
+
+
+def test_sawatabi_solver_stop_reasons_without_early_stopping():
+    physical = _random_model(20, linear=False).to_physical()
+    solver = SawatabiSolver()
+    sampleset = solver.solve(physical, num_reads=2, num_sweeps=30, seed=12345)
+    assert sampleset.info["stop_reasons"] == ["num_sweeps", "num_sweeps"]
+    assert sampleset.info["num_sweeps_used"] == [30, 30]
+
+
+@pytest.mark.parametrize("batch_reads", [False, True])
+def test_sawatabi_solver_early_stopping_zero_acceptance(batch_reads):
+    physical = _random_model(20, linear=False).to_physical()
+    solver = SawatabiSolver()
+    early_stopping_options = {"zero_acceptance_sweeps": 5}
+    sampleset, stats = solver.solve(
+        physical, num_reads=2, num_sweeps=1000, seed=12345, need_stats=True, batch_reads=batch_reads, early_stopping_options=early_stopping_options
+    )
+    assert sampleset.info["stop_reasons"] == ["zero_acceptance", "zero_acceptance"]
+    for num_sweeps_used, s in zip(sampleset.info["num_sweeps_used"], stats):
+        assert num_sweeps_used < 1000
+        assert len(s["energy_history"]) == len(s["acceptance_history"]) == num_sweeps_used
+        assert s["acceptance_history"][-5:] == [0] * 5
+        assert s["stop_reason"] == "zero_acceptance"
+
+
+@pytest.mark.parametrize("batch_reads", [False, True])
+def test_sawatabi_solver_early_stopping_stagnation(batch_reads):
+    physical = _random_model(20, linear=False).to_physical()
+    solver = SawatabiSolver()
+    early_stopping_options = {"stagnation_sweeps": 20}
+    sampleset, stats = solver.solve(
+        physical, num_reads=2, num_sweeps=1000, seed=12345, need_stats=True, batch_reads=batch_reads, early_stopping_options=early_stopping_options
+    )
+    assert sampleset.info["stop_reasons"] == ["stagnation", "stagnation"]
+    for num_sweeps_used, s in zip(sampleset.info["num_sweeps_used"], stats):
+        assert num_sweeps_used < 1000
+        # The lowest energy is reached 20 sweeps before stopping
+        energies = s["energy_history"]
+        assert min(energies[-19:]) >= min(energies[:-19])
+
+
+@pytest.mark.parametrize("batch_reads", [False, True])
+def test_sawatabi_solver_early_stopping_not_in_hot_phase(batch_reads):
+    physical = _random_model(20, linear=False).to_physical()
+    solver = SawatabiSolver()
+    early_stopping_options = {"stagnation_sweeps": 5, "zero_acceptance_sweeps": 5}
+    sampleset, stats = solver.solve(
+        physical,
+        num_reads=2,
+        num_sweeps=100,
+        initial_temperature=100.0,
+        seed=12345,
+        need_stats=True,
+        batch_reads=batch_reads,
+        early_stopping_options=early_stopping_options,
+    )
+    # Convergence criteria are counted only in the second half of the sweeps
+    for num_sweeps_used in sampleset.info["num_sweeps_used"]:
+        assert num_sweeps_used > 50
+    for s in stats:
+        assert len(s["energy_history"]) > 50
+
+
+def test_sawatabi_solver_early_stopping_target_energy():
+    physical = _random_model(20, linear=False).to_physical()
+    solver = SawatabiSolver()
+    sampleset = solver.solve(physical, num_reads=1, num_sweeps=1000, seed=12345)
+    target_energy = sampleset.first.energy
+
+    early_stopping_options = {"target_energy": target_energy}
+    sampleset = solver.solve(physical, num_reads=1, num_sweeps=1000, seed=12345, early_stopping_options=early_stopping_options)
+    assert sampleset.info["stop_reasons"] == ["target_energy"]
+    assert sampleset.info["num_sweeps_used"][0] < 1000
+    assert sampleset.first.energy <= target_energy
+
+
+def test_sawatabi_solver_early_stopping_parallel_tempering():
+    physical = _random_model(20, linear=False).to_physical()
+    solver = SawatabiSolver()
+    parallel_tempering_options = {"temperatures": [0.5, 1.0, 2.0]}
+    sampleset, stats = solver.solve(
+        physical,
+        num_reads=2,
+        num_sweeps=1000,
+        seed=12345,
+        need_stats=True,
+        parallel_tempering_options=parallel_tempering_options,
+        early_stopping_options={"stagnation_sweeps": 20},
+    )
+    assert sampleset.info["stop_reasons"] == ["stagnation", "stagnation"]
+    assert len(stats[0]["temperature_history"]) == sampleset.info["num_sweeps_used"][0] < 1000
+
+
+def test_sawatabi_solver_early_stopping_reverse():
+    # Criteria on convergence are suspended while the temperature is raised
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(6,))
+    for i in range(6):
+        model.add_interaction(x[i], coefficient=10.0)
+
+    solver = SawatabiSolver()
+    reverse_options = {"reverse_period": 5, "reverse_temperature": 10.0}
+    initial_states = [{f"x[{i}]": 1 for i in range(6)}]
+    sampleset = solver.solve(
+        model.to_physical(),
+        num_reads=1,
+        num_sweeps=100,
+        initial_states=initial_states,
+        reverse_options=reverse_options,
+        seed=12345,
+        early_stopping_options={"zero_acceptance_sweeps": 3},
+    )
+    assert sampleset.info["stop_reasons"] == ["zero_acceptance"]
+    assert sampleset.info["num_sweeps_used"][0] >= 5 + 3
+
+
+@pytest.mark.parametrize("num_workers", [None, 2])
+def test_sawatabi_solver_time_limit(num_workers):
+    physical = _random_model(20, linear=False).to_physical()
+    solver = SawatabiSolver()
+    sampleset = solver.solve(physical, num_reads=2, num_sweeps=1000000, seed=12345, time_limit=0.5, num_workers=num_workers)
+    assert sampleset.info["stop_reasons"] == ["time_limit", "time_limit"]
+    assert all(n < 1000000 for n in sampleset.info["num_sweeps_used"])
+    assert sampleset.info["timing"]["execution_sec"] < 10.0
+
+
+def test_sawatabi_solver_invalid_early_stopping_options():
+    model = LogicalModel(mtype="ising")
+    x = model.variables("x", shape=(2,))
+    for i in range(2):
+        model.add_interaction(x[i], coefficient=-1.0)
+    solver = SawatabiSolver()
+
+    with pytest.raises(TypeError):
+        solver.solve(model.to_physical(), early_stopping_options=[5])
+
+    with pytest.raises(ValueError):
+        solver.solve(model.to_physical(), early_stopping_options={"invalid": 5})
+
+    with pytest.raises(ValueError):
+        solver.solve(model.to_physical(), early_stopping_options={"stagnation_sweeps": 0})
+
+    with pytest.raises(TypeError):
+        solver.solve(model.to_physical(), time_limit="1")
+
+    with pytest.raises(ValueError):
+        solver.solve(model.to_physical(), time_limit=0)